@@ -18,11 +18,13 @@ import json
 import os
 import sys
 import threading
-import time
 from contextlib import redirect_stdout
-from time import sleep
 
 from kruize.kruize import *
+from kruize.bulk_watcher import BulkJobError, BulkJobWatcher
+
+# Seconds between the progress dots printed while the job runs
+PROGRESS_INTERVAL = 60
 
 
 def generate_json(find_arr, json_file, filename, i):
@@ -37,42 +39,35 @@ def generate_json(find_arr, json_file, filename, i):
         file.write(data)
 
 
-def bulk_status(job_id):
-    global status
+# Prints to the log file
+def thread_print(*args, **kwargs):
+    with open(log_file, "a") as log:
+        print(*args, **kwargs, file=log)
 
-    def thread_print(*args, **kwargs):
-        with open(log_file, "a") as log:
-            print(*args, **kwargs, file=log)
+
+# Waits for the job with the watcher that saw it start, so that it keeps the rate observed since then
+def bulk_status(job_id, watcher):
+    global status
 
     # Get the bulk job status using the job id returned by Bulk API
     thread_print("\n#######################################")
     thread_print("Querying job status in a loop")
     thread_print("#######################################\n")
-    include = "summary,experiments"
-    response = get_bulk_job_status(job_id, include)
-    if not response.text.strip():
-        print(f"⚠️  Empty response from the server.")
+    try:
+        # Only the summary is polled while the job runs, the experiments are fetched once it is completed
+        job_status_json = watcher.wait()
+        job_status = job_status_json['summary']['status']
+        if job_status == "COMPLETED":
+            job_status_json = watcher.fetch_job_status()
+    except BulkJobError as e:
+        print(f"⚠️  Failed to get the bulk job status: {e}")
+        thread_print("Failed to get the bulk job status: ", e)
         status = False
         return
-    job_status_json = response.json()
-    job_status = job_status_json['summary']['status']
-
-    # Loop until job status is COMPLETED
-    while job_status != "COMPLETED":
-        response = get_bulk_job_status(job_id, include)
-        if not response.text.strip():
-            print("⚠️  Empty response from the server.")
-            status = False
-            return
-        job_status_json = response.json()
-        thread_print(
-            f"Experiments: processed / Total -  {job_status_json['summary']['processed_experiments']} / {job_status_json['summary']['total_experiments']}")
-        job_status = job_status_json['summary']['status']
-        if job_status == "FAILED":
-            thread_print("❌ Bulk Job FAILED due to this error: ", job_status_json['summary']['notifications'])
-            thread_print("Check job_status.json for the job status")
-            break
-        sleep(10)
+    thread_print(f"Job status polled {watcher.polls} times")
+    if job_status == "FAILED":
+        thread_print("❌ Bulk Job FAILED due to this error: ", job_status_json['summary']['notifications'])
+        thread_print("Check job_status.json for the job status")
 
     # Dump the job status json into a file
     with open('job_status.json', 'w') as f:
@@ -163,12 +158,13 @@ def main(argv):
             job_id = job_id_json['job_id']
     print("✅ Invoked job_id", job_id)
 
-    # Sleep for 10s initially to gather total experiments and failures
-    time.sleep(10)
-
-    include = "summary,experiments"
-    response = get_bulk_job_status(job_id, include)
-    job_status_json = response.json()
+    # Wait until the job has gathered the total experiments and failures
+    watcher = BulkJobWatcher(job_id, log=thread_print)
+    try:
+        job_status_json = watcher.wait_for_start()
+    except BulkJobError as e:
+        print(f"❌ Failed to get the bulk job status: {e}")
+        sys.exit(1)
     total_experiments = job_status_json['summary']['total_experiments']
     job_status = job_status_json['summary']['status']
     if job_status == "FAILED":
@@ -177,15 +173,16 @@ def main(argv):
         print("For detailed logs, look in kruize-bulk-demo.log")
         sys.exit(1)
     else:
-        thread = threading.Thread(target=bulk_status, args=(job_id,))  # , daemon=False)
+        thread = threading.Thread(target=bulk_status, args=(job_id, watcher))  # , daemon=False)
         thread.start()
         print(f"🔔 Bulk job experiment details are currently being updated in {log_file}.")
         # print("🔔 You can check job_status.log for ongoing updates as experiments are processed.")
         print(f"🔄 Processing {total_experiments} experiments. Please wait...", end="")
 
+        # Print a progress dot every PROGRESS_INTERVAL seconds, returns as soon as the job is done
         while thread.is_alive():
-            print(".", end="")
-            time.sleep(60)
+            print(".", end="", flush=True)
+            thread.join(PROGRESS_INTERVAL)
 
         if status:
             # print("✅ Completed!")
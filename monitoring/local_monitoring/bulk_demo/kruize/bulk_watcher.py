@@ -0,0 +1,147 @@
+"""
+Copyright (c) 2024, 2024 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import random
+import time
+
+import requests
+
+from .kruize import get_bulk_job_status
+
+# Bounds of the interval between two status polls of a running job, in seconds
+MIN_POLL_INTERVAL = 2
+MAX_POLL_INTERVAL = 30
+# Fraction of the interval added or removed at random so that watchers do not poll in step
+POLL_JITTER = 0.1
+# Growth of the interval while no progress is observed
+IDLE_BACKOFF_FACTOR = 1.5
+# Backoff after a failed poll: base * 2^(failures - 1), capped, and the no. of failures in a row tolerated
+ERROR_BACKOFF_BASE = 1
+MAX_ERROR_BACKOFF = 60
+MAX_POLL_ERRORS = 8
+
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+
+
+class BulkJobError(Exception):
+    pass
+
+
+class BulkJobWatcher:
+    """Watches a bulk job through GET /bulk until it completes or fails.
+
+    While the job runs only the summary is requested. The interval between
+    polls follows the processing rate observed across polls: half the
+    estimated time left, so polls get closer as the job nears completion,
+    and longer intervals while no experiment gets processed. A failed poll
+    is retried with exponential backoff and jitter, the watcher gives up
+    after MAX_POLL_ERRORS failures in a row. The experiments of the job are
+    fetched once, with fetch_job_status(), when it is done.
+    """
+
+    def __init__(self, job_id, min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL, max_errors=MAX_POLL_ERRORS,
+                 log=print, clock=time.monotonic, sleep=time.sleep):
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_errors = max_errors
+        self.log = log
+        self.clock = clock
+        self.sleep = sleep
+        self.interval = min_interval
+        # Experiments processed per second and the last (time, processed experiments) sample
+        self.rate = None
+        self.last_sample = None
+        self.polls = 0
+
+    # Returns the job status json of a GET /bulk call, raises BulkJobError if it failed
+    def get_job_status(self, include):
+        self.polls += 1
+        try:
+            response = get_bulk_job_status(self.job_id, include)
+        except requests.RequestException as e:
+            raise BulkJobError(e)
+        if response.status_code >= 300:
+            raise BulkJobError("Response status code = %s %s" % (response.status_code, response.text))
+        if not response.text.strip():
+            raise BulkJobError("Empty response from the server.")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise BulkJobError(e)
+
+    # Calls get_job_status until it succeeds, waiting longer after each failure
+    def get_job_status_with_retries(self, include):
+        errors = 0
+        while True:
+            try:
+                return self.get_job_status(include)
+            except BulkJobError as e:
+                errors += 1
+                if errors >= self.max_errors:
+                    raise
+                backoff = min(MAX_ERROR_BACKOFF, ERROR_BACKOFF_BASE * 2 ** (errors - 1))
+                backoff = random.uniform(backoff / 2, backoff)
+                self.log("⚠️  Failed to get the bulk job status (%s), retrying in %.1fs: %s" % (errors, backoff, e))
+                self.sleep(backoff)
+
+    def update_rate(self, summary):
+        now = self.clock()
+        processed = summary.get("processed_experiments") or 0
+        if self.last_sample is None or processed < self.last_sample[1]:
+            self.rate = None
+        elif processed == self.last_sample[1]:
+            # No progress, the sample is kept so that the next rate spans the idle time
+            self.rate = None
+            return
+        else:
+            rate = (processed - self.last_sample[1]) / max(now - self.last_sample[0], 1e-6)
+            self.rate = rate if self.rate is None else (self.rate + rate) / 2
+        self.last_sample = (now, processed)
+
+    # Returns the interval to wait before the next poll, from the rate at which the job processes experiments
+    def next_interval(self, summary):
+        self.update_rate(summary)
+        total = summary.get("total_experiments") or 0
+        processed = summary.get("processed_experiments") or 0
+        if self.rate:
+            self.interval = (total - processed) / self.rate / 2
+        else:
+            self.interval = self.interval * IDLE_BACKOFF_FACTOR
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval))
+        return self.interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+    # Polls the job summary until done(summary) is true, returns the last job status json
+    def poll_until(self, done):
+        while True:
+            job_status_json = self.get_job_status_with_retries("summary")
+            summary = job_status_json["summary"]
+            if done(summary):
+                return job_status_json
+            self.log(f"Experiments: processed / Total -  {summary.get('processed_experiments')} / {summary.get('total_experiments')}")
+            self.sleep(self.next_interval(summary))
+
+    # Waits until the job knows the no. of experiments to process
+    def wait_for_start(self):
+        return self.poll_until(lambda summary: summary.get("total_experiments") or summary["status"] in TERMINAL_STATUSES)
+
+    # Waits until the job completes or fails
+    def wait(self):
+        return self.poll_until(lambda summary: summary["status"] in TERMINAL_STATUSES)
+
+    # Returns the job status json with the summary and the experiments of the job
+    def fetch_job_status(self):
+        return self.get_job_status_with_retries("summary,experiments")
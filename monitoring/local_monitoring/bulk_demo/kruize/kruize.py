@@ -17,16 +17,78 @@ limitations under the License.
 import json
 import requests
 import subprocess
+from requests.adapters import HTTPAdapter
+
+# Connection pool settings for the shared Kruize session
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+# (connect, read) timeouts in seconds, per Kruize endpoint
+DEFAULT_TIMEOUT = (10, 60)
+ENDPOINT_TIMEOUTS = {
+    "/createMetricProfile": (10, 60),
+    "/createExperiment": (10, 60),
+    "/bulk": (10, 120),
+    "/updateRecommendations": (10, 300),
+    "/listRecommendations": (10, 120),
+    "/listExperiments": (10, 300),
+    "/dsmetadata": (10, 300),
+}
+
+
+class KruizeClient:
+    """Pooled, keep-alive HTTP session for the Kruize REST API.
+
+    All the API helpers in this module go through a single instance so that
+    repeated calls reuse TCP connections instead of opening one per request.
+    """
+
+    def __init__(self, base_url="", pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, timeouts=None):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        self.configure(pool_connections, pool_maxsize, timeouts)
+
+    def configure(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, timeouts=None):
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+    def url(self, endpoint):
+        return self.base_url + endpoint
+
+    def timeout(self, endpoint):
+        return self.timeouts.get(endpoint.split("?")[0], DEFAULT_TIMEOUT)
+
+    def request(self, method, endpoint, **kwargs):
+        kwargs.setdefault("timeout", self.timeout(endpoint))
+        return self.session.request(method, self.url(endpoint), **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def delete(self, endpoint, **kwargs):
+        return self.request("DELETE", endpoint, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+kruize_client = KruizeClient()
 
 
 def form_kruize_url(cluster_type, SERVER_IP=None):
-    global URL
     KIND_IP = "127.0.0.1"
     KRUIZE_PORT = 8080
 
     if SERVER_IP != None:
-        URL = "http://" + str(SERVER_IP)
-        print("\nKRUIZE AUTOTUNE URL = ", URL)
+        kruize_client.base_url = "http://" + str(SERVER_IP)
+        print("\nKRUIZE AUTOTUNE URL = ", kruize_client.base_url)
         return
 
     if (cluster_type == "minikube"):
@@ -38,11 +100,11 @@ def form_kruize_url(cluster_type, SERVER_IP=None):
 
         ip = subprocess.run(['minikube ip'], shell=True, stdout=subprocess.PIPE)
         SERVER_IP = ip.stdout.decode('utf-8').strip('\n')
-        URL = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
+        kruize_client.base_url = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
     elif (cluster_type == "kind"):
-        URL = "http://" + KIND_IP + ":" + str(KRUIZE_PORT)
+        kruize_client.base_url = "http://" + KIND_IP + ":" + str(KRUIZE_PORT)
     elif (cluster_type == "local"):
-        URL = "http://" + '127.0.0.1' + ":" + '8080'
+        kruize_client.base_url = "http://" + '127.0.0.1' + ":" + '8080'
     elif (cluster_type == "openshift"):
 
         subprocess.run(['oc expose svc/kruize -n openshift-tuning'], shell=True, stdout=subprocess.PIPE,
@@ -54,8 +116,8 @@ def form_kruize_url(cluster_type, SERVER_IP=None):
             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         SERVER_IP = ip.stdout.decode('utf-8').strip('\n')
         print("IP = ", SERVER_IP)
-        URL = "http://" + str(SERVER_IP)
-    print("\nKRUIZE URL = ", URL)
+        kruize_client.base_url = "http://" + str(SERVER_IP)
+    print("\nKRUIZE URL = ", kruize_client.base_url)
 
 
 # Description: This function creates a metric profile using the Kruize createMetricProfile API
@@ -65,10 +127,10 @@ def create_metric_profile(metric_profile_json_file):
     metric_profile_json = json.loads(json_file.read())
 
     # print("\nCreating metric profile...")
-    url = URL + "/createMetricProfile"
-    print("URL = ", url)
+    endpoint = "/createMetricProfile"
+    print("URL = ", kruize_client.url(endpoint))
 
-    response = requests.post(url, json=metric_profile_json)
+    response = kruize_client.post(endpoint, json=metric_profile_json)
     print("Response status code = ", response.status_code)
     print(response.text)
     return response
@@ -81,10 +143,10 @@ def bulk(bulk_json_file):
     bulk_json = json.loads(json_file.read())
 
     # print("\nInvoking bulk service...")
-    url = URL + "/bulk"
-    print("URL = ", url)
+    endpoint = "/bulk"
+    print("URL = ", kruize_client.url(endpoint))
 
-    response = requests.post(url, json=bulk_json)
+    response = kruize_client.post(endpoint, json=bulk_json)
     return response
 
 
@@ -100,8 +162,8 @@ def get_bulk_job_status(job_id, include=None, experimentName=None):
     if include:
         queryString = queryString + "include=%s" % (include)
 
-    url = URL + "/bulk%s" % (queryString)
-    response = requests.get(url, )
+    endpoint = "/bulk%s" % (queryString)
+    response = kruize_client.get(endpoint)
     return response
 
 
@@ -110,12 +172,12 @@ def get_bulk_job_status(job_id, include=None, experimentName=None):
 def list_recommendations(experiment_name=None, latest=None, monitoring_end_time=None):
     PARAMS = ""
     # print("\nListing the recommendations...")
-    url = URL + "/listRecommendations"
-    # print("URL = ", url)
+    endpoint = "/listRecommendations"
+    # print("URL = ", kruize_client.url(endpoint))
 
     if experiment_name == None:
         if latest == None and monitoring_end_time == None:
-            response = requests.get(url)
+            response = kruize_client.get(endpoint)
         elif latest != None:
             PARAMS = {'latest': latest}
         elif monitoring_end_time != None:
@@ -129,7 +191,7 @@ def list_recommendations(experiment_name=None, latest=None, monitoring_end_time=
             PARAMS = {'experiment_name': experiment_name, 'monitoring_end_time': monitoring_end_time}
 
     # print("PARAMS = ", PARAMS)
-    response = requests.get(url=url, params=PARAMS)
+    response = kruize_client.get(endpoint, params=PARAMS)
 
     # print("Response status code = ", response.status_code)
     # print("\n************************************************************")
@@ -151,15 +213,15 @@ def create_experiment(input_json_file, invalid_header=False):
     # read the json
     print("\nCreating the experiment...")
 
-    url = URL + "/createExperiment"
-    print("URL = ", url)
+    endpoint = "/createExperiment"
+    print("URL = ", kruize_client.url(endpoint))
 
     headers = {'content-type': 'application/xml'}
     if invalid_header:
         print("Invalid header")
-        response = requests.post(url, json=input_json, headers=headers)
+        response = kruize_client.post(endpoint, json=input_json, headers=headers)
     else:
-        response = requests.post(url, json=input_json)
+        response = kruize_client.post(endpoint, json=input_json)
 
     print("Response status code = ", response.status_code)
     try:
@@ -195,9 +257,9 @@ def update_recommendations(experiment_name, startTime, endTime):
     if startTime:
         queryString = queryString + "&interval_start_time=%s" % (startTime)
 
-    url = URL + "/updateRecommendations?%s" % (queryString)
-    print("URL = ", url)
-    response = requests.post(url, )
+    endpoint = "/updateRecommendations?%s" % (queryString)
+    print("URL = ", kruize_client.url(endpoint))
+    response = kruize_client.post(endpoint)
     print("Response status code = ", response.status_code)
     print(response.text)
     print("\n************************************************************")
@@ -211,8 +273,8 @@ def delete_experiment(input_json_file, invalid_header=False):
     input_json = json.loads(json_file.read())
 
     print("\nDeleting the experiment...")
-    url = URL + "/createExperiment"
-    print("URL = ", url)
+    endpoint = "/createExperiment"
+    print("URL = ", kruize_client.url(endpoint))
 
     experiment_name = input_json[0]['experiment_name']
 
@@ -223,9 +285,9 @@ def delete_experiment(input_json_file, invalid_header=False):
     headers = {'content-type': 'application/xml'}
     if invalid_header:
         print("Invalid header")
-        response = requests.delete(url, json=delete_json, headers=headers)
+        response = kruize_client.delete(endpoint, json=delete_json, headers=headers)
     else:
-        response = requests.delete(url, json=delete_json)
+        response = kruize_client.delete(endpoint, json=delete_json)
 
     print(response)
     print("Response status code = ", response.status_code)
@@ -249,11 +311,11 @@ def list_experiments(results=None, recommendations=None, latest=None, experiment
 
     query_string = "&".join(f"{key}={value}" for key, value in query_params.items())
 
-    url = URL + "/listExperiments"
+    endpoint = "/listExperiments"
     if query_string:
-        url += "?" + query_string
-    print("URL = ", url)
-    response = requests.get(url)
+        endpoint += "?" + query_string
+    print("URL = ", kruize_client.url(endpoint))
+    response = kruize_client.get(endpoint)
     print("Response status code = ", response.status_code)
     return response
 
@@ -269,11 +331,11 @@ def list_datasources(name=None):
 
     query_string = "&".join(f"{key}={value}" for key, value in query_params.items())
 
-    url = URL + "/datasources"
+    endpoint = "/datasources"
     if query_string:
-        url += "?" + query_string
-    print("URL = ", url)
-    response = requests.get(url)
+        endpoint += "?" + query_string
+    print("URL = ", kruize_client.url(endpoint))
+    response = kruize_client.get(endpoint)
 
     print("PARAMS = ", query_params)
     print("Response status code = ", response.status_code)
@@ -296,15 +358,15 @@ def import_metadata(input_json_file, invalid_header=False):
     # read the json
     print("\nImporting the metadata...")
 
-    url = URL + "/dsmetadata"
-    print("URL = ", url)
+    endpoint = "/dsmetadata"
+    print("URL = ", kruize_client.url(endpoint))
 
     headers = {'content-type': 'application/xml'}
     if invalid_header:
         print("Invalid header")
-        response = requests.post(url, json=input_json, headers=headers)
+        response = kruize_client.post(endpoint, json=input_json, headers=headers)
     else:
-        response = requests.post(url, json=input_json)
+        response = kruize_client.post(endpoint, json=input_json)
 
     print("Response status code = ", response.status_code)
     try:
@@ -335,15 +397,15 @@ def delete_metadata(input_json_file, invalid_header=False):
 
     print("\nDeleting the metadata...")
 
-    url = URL + "/dsmetadata"
-    print("URL = ", url)
+    endpoint = "/dsmetadata"
+    print("URL = ", kruize_client.url(endpoint))
 
     headers = {'content-type': 'application/xml'}
     if invalid_header:
         print("Invalid header")
-        response = requests.delete(url, json=input_json, headers=headers)
+        response = kruize_client.delete(endpoint, json=input_json, headers=headers)
     else:
-        response = requests.delete(url, json=input_json)
+        response = kruize_client.delete(endpoint, json=input_json)
 
     print(response)
     print("Response status code = ", response.status_code)
@@ -368,12 +430,12 @@ def list_metadata(datasource=None, cluster_name=None, namespace=None, verbose=No
 
     query_string = "&".join(f"{key}={value}" for key, value in query_params.items())
 
-    url = URL + "/dsmetadata"
+    endpoint = "/dsmetadata"
     if query_string:
-        url += "?" + query_string
-    print("URL = ", url)
+        endpoint += "?" + query_string
+    print("URL = ", kruize_client.url(endpoint))
     print("PARAMS = ", query_params)
-    response = requests.get(url)
+    response = kruize_client.get(endpoint)
 
     print("Response status code = ", response.status_code)
     if logging:
@@ -390,21 +452,21 @@ def delete_metric_profile(input_json_file, invalid_header=False):
     input_json = json.loads(json_file.read())
 
     print("\nDeleting the metric profile...")
-    url = URL + "/deleteMetricProfile"
+    endpoint = "/deleteMetricProfile"
 
     metric_profile_name = input_json['metadata']['name']
     query_string = f"name={metric_profile_name}"
 
     if query_string:
-        url += "?" + query_string
-    print("URL = ", url)
+        endpoint += "?" + query_string
+    print("URL = ", kruize_client.url(endpoint))
 
     headers = {'content-type': 'application/xml'}
     if invalid_header:
         print("Invalid header")
-        response = requests.delete(url, headers=headers)
+        response = kruize_client.delete(endpoint, headers=headers)
     else:
-        response = requests.delete(url)
+        response = kruize_client.delete(endpoint)
 
     print(response)
     print("Response status code = ", response.status_code)
@@ -425,12 +487,12 @@ def list_metric_profiles(name=None, verbose=None, logging=True):
 
     query_string = "&".join(f"{key}={value}" for key, value in query_params.items())
 
-    url = URL + "/listMetricProfiles"
+    endpoint = "/listMetricProfiles"
     if query_string:
-        url += "?" + query_string
-    print("URL = ", url)
+        endpoint += "?" + query_string
+    print("URL = ", kruize_client.url(endpoint))
     print("PARAMS = ", query_params)
-    response = requests.get(url)
+    response = kruize_client.get(endpoint)
 
     print("Response status code = ", response.status_code)
     if logging:
@@ -14,8 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-import copy
-import csv
+import asyncio
 import getopt
 import itertools
 import json
@@ -23,20 +22,100 @@ import sys
 import time
 from datetime import datetime
 
-from helpers.utils import create_json_from_csv, create_namespace_json_from_csv
+from helpers.utils import results_from_csv
 from kruize.kruize import *
+from kruize.kruize_async import AsyncKruizeClient
+from kruize.checkpoint import DEFAULT_CHECKPOINT_FILE, IngestCheckpoint
+from kruize.experiment_template import ExperimentTemplate
 
 
-def generate_json(find_arr, json_file, filename, i):
-    with open(json_file, 'r') as file:
-        data = file.read()
+# Renders the experiment json of the template with the strings to find suffixed by "_<i>"
+def generate_json(template, find_arr, i):
+    return template.render({find: find + "_" + str(i) for find in find_arr})
 
-    for find in find_arr:
-        replace = find + "_" + str(i)
-        data = data.replace(find, replace)
 
-    with open(filename, 'w') as file:
-        file.write(data)
+# updateResults API accepts at most 100 results in a single request
+MAX_RESULTS_PER_UPDATE = 100
+
+
+# Splits the iterable into lists of at most batch_size items
+def batched(iterable, batch_size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+# Returns the latest interval_end_time of the results in the format expected by updateRecommendations
+def max_interval_end_time(results):
+    max_time = max(datetime.strptime(item['interval_end_time'], "%Y-%m-%dT%H:%M:%S.%fZ") for item in results)
+    return max_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z"
+
+
+def replay_experiment(exp, num_entries, batch_size=1, checkpoint=None):
+    recommendations_json_arr = []
+    experiment_json = "./json_files/experiment_jsons/" + exp + ".json"
+    experiment_csv = "./csv_data/" + exp + ".csv"
+    json_data = json.load(open(experiment_json))
+    create_experiment(json_data)
+    experiment_name = json_data[0]['experiment_name']
+
+    experiment_type = json_data[0].get('experiment_type')
+    print(experiment_type)
+
+    results_iter = itertools.islice(results_from_csv(experiment_csv, experiment_type), num_entries)
+    if checkpoint is not None:
+        results_iter = checkpoint.pending(results_iter)
+    for results in batched(results_iter, batch_size):
+        response = update_results(results)
+        if checkpoint is not None:
+            checkpoint.acknowledge(results, response)
+        update_recommendations(experiment_name, max_interval_end_time(results))
+
+        reco = list_recommendations(experiment_name, rm=True)
+        recommendations_json_arr.append(reco)
+    return recommendations_json_arr
+
+
+def load_json(json_file):
+    with open(json_file) as f:
+        return json.load(f)
+
+
+# Same as replay_experiment, but the Kruize calls go through the async client so that
+# several experiments can be replayed together. Calls within an experiment stay in order.
+# Reading the files and saving the checkpoint run on worker threads to keep the event loop free.
+async def replay_experiment_async(client, exp, num_entries, batch_size=1, checkpoint=None):
+    recommendations_json_arr = []
+    experiment_json = "./json_files/experiment_jsons/" + exp + ".json"
+    experiment_csv = "./csv_data/" + exp + ".csv"
+    json_data = await asyncio.to_thread(load_json, experiment_json)
+    await client.create_experiment(json_data)
+    experiment_name = json_data[0]['experiment_name']
+
+    experiment_type = json_data[0].get('experiment_type')
+    print(experiment_type)
+
+    results_iter = itertools.islice(results_from_csv(experiment_csv, experiment_type), num_entries)
+    if checkpoint is not None:
+        results_iter = checkpoint.pending(results_iter)
+    batches = batched(results_iter, batch_size)
+    while results := await asyncio.to_thread(next, batches, None):
+        response = await client.update_results(results)
+        if checkpoint is not None:
+            await asyncio.to_thread(checkpoint.acknowledge, results, response)
+        await client.update_recommendations(experiment_name, max_interval_end_time(results))
+
+        reco = await client.list_recommendations(experiment_name, rm=True)
+        recommendations_json_arr.append(reco)
+    return recommendations_json_arr
+
+
+async def replay_experiments_concurrently(experiments_list, num_entries, concurrency, batch_size=1, checkpoint=None):
+    client = AsyncKruizeClient(concurrency)
+    results = await asyncio.gather(
+        *(replay_experiment_async(client, exp, num_entries, batch_size, checkpoint) for exp in experiments_list))
+    # Keep the recommendations in experiments_list order
+    return [reco for exp_recos in results for reco in exp_recos]
 
 
 def print_experiment_list(container_experiments: list, namespace_experiments: list, gpu_experiments: list):
@@ -62,6 +141,11 @@ def main(argv):
     create_exp_json_file = "./json_files/create_exp.json"
     find = []
     num_entries = 97
+    num_exps = 1
+    concurrency = 1
+    batch_size = 1
+    resume = False
+    checkpoint_file = None
 
     json_data = json.load(open(create_exp_json_file))
 
@@ -72,9 +156,9 @@ def main(argv):
     print(find)
 
     try:
-        opts, args = getopt.getopt(argv, "h:c:d:")
+        opts, args = getopt.getopt(argv, "h:c:d:", ["concurrency=", "batch-size=", "resume", "checkpoint=", "num-exps="])
     except getopt.GetoptError:
-        print("demo.py -c <cluster type>")
+        print("demo.py -c <cluster type> [--concurrency <no. of experiments in parallel>] [--batch-size <results per updateResults, max 100>] [--resume] [--checkpoint <checkpoint file>] [--num-exps <no. of experiments to create from the experiment json>]")
         sys.exit(2)
     for opt, arg in opts:
         if opt == '-h':
@@ -85,8 +169,28 @@ def main(argv):
         elif opt == '-d' and arg is not None:
             num_entries = int(arg) * 96
             num_entries += 1
-
-    print("demo.py -c %s" % (cluster_type))
+        elif opt == '--concurrency':
+            concurrency = int(arg)
+        elif opt == '--batch-size':
+            batch_size = int(arg)
+        elif opt == '--resume':
+            resume = True
+        elif opt == '--checkpoint':
+            checkpoint_file = arg
+        elif opt == '--num-exps':
+            num_exps = int(arg)
+
+    if batch_size > MAX_RESULTS_PER_UPDATE:
+        print("Batch size %s exceeds the updateResults limit, using %s" % (batch_size, MAX_RESULTS_PER_UPDATE))
+        batch_size = MAX_RESULTS_PER_UPDATE
+
+    print("demo.py -c %s --concurrency %s --batch-size %s" % (cluster_type, concurrency, batch_size))
+
+    # Record the results acknowledged by Kruize, to skip them if the replay is resumed. Only kept when asked for,
+    # a plain replay doesn't write a checkpoint file.
+    checkpoint = None
+    if resume or checkpoint_file is not None:
+        checkpoint = IngestCheckpoint(checkpoint_file or DEFAULT_CHECKPOINT_FILE, resume)
 
     # Form the kruize url
     form_kruize_url(cluster_type)
@@ -109,60 +213,20 @@ def main(argv):
 
     experiments_list = container_experiments + namespace_experiments + gpu_experiments
 
-    for exp in experiments_list:
-        experiment_json = "./json_files/experiment_jsons/" + exp + ".json"
-        experiment_csv = "./csv_data/" + exp + ".csv"
-        create_experiment(experiment_json)
-        json_data = json.load(open(experiment_json))
-        experiment_name = json_data[0]['experiment_name']
-
-        experiment_type = json_data[0].get('experiment_type')
-        print(experiment_type)
-
-        with open(experiment_csv, 'r') as csv_file:
-            reader = csv.reader(csv_file)
-            header = next(reader)
-
-            limited_reader = itertools.islice(reader, num_entries)
-            for row in limited_reader:
-                if not any(row):
-                    continue
-                with open('intermediate.csv', mode='w', newline='') as outfile:
-                    writer = csv.writer(outfile)
-                    writer.writerow(header)
-                    writer.writerow(row)
-
-                # Convert the results csv to json
-                resultsjson_file = "./json_files/experiment_jsons/results.json"
-
-                if experiment_type == "namespace":
-                    create_namespace_json_from_csv("./intermediate.csv", resultsjson_file)
-                else:
-                    create_json_from_csv("./intermediate.csv", resultsjson_file)
-
-                update_results(resultsjson_file)
-
-                resultsjson = json.load(open(resultsjson_file))
-                for item in resultsjson:
-                    item['interval_start_time'] = datetime.strptime(item['interval_start_time'],
-                                                                    "%Y-%m-%dT%H:%M:%S.%fZ")
-                    item['interval_end_time'] = datetime.strptime(item['interval_end_time'], "%Y-%m-%dT%H:%M:%S.%fZ")
-                max_time = max(resultsjson, key=lambda x: x['interval_end_time'])['interval_end_time']
-                update_recommendations(experiment_name, max_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z")
-
-                reco = list_recommendations(experiment_name,rm=True)
-                recommendations_json_arr.append(reco)
+    if concurrency > 1:
+        recommendations_json_arr.extend(
+            asyncio.run(replay_experiments_concurrently(experiments_list, num_entries, concurrency, batch_size, checkpoint)))
+    else:
+        for exp in experiments_list:
+            recommendations_json_arr.extend(replay_experiment(exp, num_entries, batch_size, checkpoint))
 
     # Create experiments using the specified json
-    num_exps = 1
+    template = ExperimentTemplate(create_exp_json_file, find)
     for i in range(num_exps):
-        tmp_create_exp_json_file = "/tmp/create_exp.json"
-        generate_json(find, create_exp_json_file, tmp_create_exp_json_file, i)
-        create_experiment(tmp_create_exp_json_file)
+        json_data = generate_json(template, find, i)
+        create_experiment(json_data)
 
         if i == 0:
-            json_data = json.load(open(tmp_create_exp_json_file))
-
             experiment_name = json_data[0]['experiment_name']
             deployment_name = json_data[0]['kubernetes_objects'][0]['name']
             namespace = json_data[0]['kubernetes_objects'][0]['namespace']
@@ -186,27 +250,13 @@ def main(argv):
         json_parsed = json.loads(json_data)
         bulk_payload.append(json_parsed[0])
 
-    # Define the batch size
-    batch_size = 100
-
-    # Loop to fetch elements in batches
-    current_index = 0
-    while current_index < len(bulk_payload):
-        # Get the current batch
-        batch = bulk_payload[current_index:current_index + batch_size]
-
-        file_path = './resource_usage_metrics_data/result_%s_to_%s.json' % (current_index, batch_size)
-        with open(file_path, 'w') as json_file:
-            json.dump(batch, json_file)
-        update_results(file_path)
-        batch_deep_copy = copy.deepcopy(batch)
-        for item in batch_deep_copy:
-            item['interval_start_time'] = datetime.strptime(item['interval_start_time'], "%Y-%m-%dT%H:%M:%S.%fZ")
-            item['interval_end_time'] = datetime.strptime(item['interval_end_time'], "%Y-%m-%dT%H:%M:%S.%fZ")
-        max_time = max(batch_deep_copy, key=lambda x: x['interval_end_time'])['interval_end_time']
-        update_recommendations(experiment_name, max_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z")
-        # Update the current index for the next batch
-        current_index += batch_size
+    if checkpoint is not None:
+        bulk_payload = list(checkpoint.pending(bulk_payload))
+    for batch in batched(bulk_payload, MAX_RESULTS_PER_UPDATE):
+        response = update_results(batch)
+        if checkpoint is not None:
+            checkpoint.acknowledge(batch, response)
+        update_recommendations(experiment_name, max_interval_end_time(batch))
     # Sleep
     time.sleep(1)
     reco = list_recommendations(experiment_name,rm=True)
@@ -0,0 +1,67 @@
+import csv
+import sys
+import getopt
+import timeit
+
+from utils import convert_date_format, DateFormatter
+
+# Description: Micro-benchmark of the timestamp conversion done while converting a results csv,
+# comparing convert_date_format with the memoized DateFormatter on the csv timestamps
+def read_timestamps(csv_file):
+    timestamps = []
+    with open(csv_file, "r") as f:
+        for row in csv.DictReader(f):
+            for column in ("interval_start", "interval_end", "start_timestamp", "end_timestamp"):
+                if row.get(column):
+                    timestamps.append(row[column])
+    return timestamps
+
+
+def bench(timestamps, iterations):
+    def reference():
+        return [convert_date_format(timestamp) for timestamp in timestamps]
+
+    def memoized():
+        # A fresh formatter per run, as results_from_csv uses one per file
+        return DateFormatter().convert_column(timestamps)
+
+    if reference() != memoized():
+        print("DateFormatter output differs from convert_date_format")
+        sys.exit(1)
+
+    reference_time = min(timeit.repeat(reference, number=1, repeat=iterations))
+    memoized_time = min(timeit.repeat(memoized, number=1, repeat=iterations))
+    print("timestamps           : " + str(len(timestamps)) + " (" + str(len(set(timestamps))) + " distinct)")
+    print("convert_date_format  : %.4f s" % reference_time)
+    print("DateFormatter        : %.4f s" % memoized_time)
+    print("speedup              : %.1fx" % (reference_time / memoized_time))
+
+
+def main(argv):
+    csv_file = "../csv_data/tfb-qrh_deployment_tfb-tests.csv"
+    iterations = 5
+
+    try:
+        opts, args = getopt.getopt(argv, "h:c:n:")
+    except getopt.GetoptError:
+        print("bench_convert_date.py -c <csv file> -n <iterations>")
+        sys.exit(2)
+
+    for opt, arg in opts:
+        if opt == '-h':
+            print("bench_convert_date.py -c <csv file> -n <iterations>")
+            sys.exit()
+        elif opt == '-c':
+            csv_file = arg
+        elif opt == '-n':
+            iterations = int(arg)
+
+    timestamps = read_timestamps(csv_file)
+    if not timestamps:
+        print("No timestamps found in " + csv_file)
+        sys.exit(1)
+
+    bench(timestamps, iterations)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,68 @@
+import itertools
+import json
+import os
+import sys
+import getopt
+import timeit
+
+import jsonschema
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helpers.utils import results_from_csv
+from kruize.json_validate import exp_input_schema, result_input_schema, validate_exp_input_json, \
+    validate_exp_input_jsons, validate_result_input_json, draft7_format_checker
+
+# Description: Micro-benchmark of the createExperiment and updateResults json validation, comparing
+# jsonschema.validate, which builds the validator for every call, with the validators compiled once
+# by json_validate. Prints the cost per payload.
+def bench(name, reference, compiled, iterations, number):
+    reference_time = min(timeit.repeat(reference, number=number, repeat=iterations)) / number
+    compiled_time = min(timeit.repeat(compiled, number=number, repeat=iterations)) / number
+    print("%-28s: %8.1f us -> %8.1f us per payload (%.1fx)" % (name, reference_time * 1e6, compiled_time * 1e6,
+                                                               reference_time / compiled_time))
+
+
+def main(argv):
+    exp_json_file = "../json_files/create_exp.json"
+    csv_file = "../csv_data/tfb-qrh_deployment_tfb-tests.csv"
+    iterations = 5
+    number = 200
+
+    try:
+        opts, args = getopt.getopt(argv, "h:e:c:n:")
+    except getopt.GetoptError:
+        print("bench_json_validate.py -e <experiment json> -c <results csv> -n <iterations>")
+        sys.exit(2)
+
+    for opt, arg in opts:
+        if opt == '-h':
+            print("bench_json_validate.py -e <experiment json> -c <results csv> -n <iterations>")
+            sys.exit()
+        elif opt == '-e':
+            exp_json_file = arg
+        elif opt == '-c':
+            csv_file = arg
+        elif opt == '-n':
+            iterations = int(arg)
+
+    exp_json = json.load(open(exp_json_file))
+    # A full updateResults payload
+    results_json = list(itertools.islice(results_from_csv(csv_file), 100))
+
+    if validate_exp_input_json(exp_json) or validate_result_input_json(results_json):
+        print("The experiment json or the results are invalid")
+        sys.exit(1)
+
+    bench("createExperiment json",
+          lambda: jsonschema.validate(instance=exp_json, schema=exp_input_schema, format_checker=draft7_format_checker),
+          lambda: validate_exp_input_json(exp_json), iterations, number)
+    bench("updateResults json (100)",
+          lambda: jsonschema.validate(instance=results_json, schema=result_input_schema, format_checker=draft7_format_checker),
+          lambda: validate_result_input_json(results_json), iterations, number // 10)
+
+    experiments = [dict(exp_json[0], experiment_name=exp_json[0]["experiment_name"] + "_" + str(i)) for i in range(1000)]
+    batch_time = min(timeit.repeat(lambda: validate_exp_input_jsons(experiments), number=1, repeat=iterations))
+    print("%-28s: %8.1f us per experiment" % ("batch of 1000 experiments", batch_time / len(experiments) * 1e6))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
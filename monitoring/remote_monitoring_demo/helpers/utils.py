@@ -2,420 +2,393 @@ import csv
 import json
 import os
 import datetime
+import functools
 import sys
 import getopt
 
+import dateutil.tz
+import numpy as np
+import pandas as pd
+
+DATE_FORMATS = ["%a %b %d %H:%M:%S %Z %Y",
+                "%Y-%m-%dT%H:%M:%S.%f",
+                "%a %b %d %H:%M:%S UTC %Y",
+                "%Y-%m-%d %H:%M:%S %Z",
+                "%Y-%m-%d %H:%M:%S %z %Z",
+                "%Y-%m-%dT%H:%M:%S"]
+
+# Max no. of converted timestamps remembered by a DateFormatter
+DATE_CACHE_SIZE = 4096
+
+# Convert a date in the given format to kruize specific format
+def format_date(input_date_str, date_format):
+    dt = datetime.datetime.strptime(input_date_str, date_format)
+    dt_utc = dt.astimezone(datetime.timezone.utc)
+    return dt_utc.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
 # Convert any date format to kruize specific format
 def convert_date_format(input_date_str):
-    DATE_FORMATS = ["%a %b %d %H:%M:%S %Z %Y",
-                    "%Y-%m-%dT%H:%M:%S.%f",
-                    "%a %b %d %H:%M:%S UTC %Y",
-                    "%Y-%m-%d %H:%M:%S %Z",
-                    "%Y-%m-%d %H:%M:%S %z %Z",
-                    "%Y-%m-%dT%H:%M:%S"]
-
     for date_format in DATE_FORMATS:
         try:
-            dt = datetime.datetime.strptime(input_date_str, date_format)
-            dt_utc = dt.astimezone(datetime.timezone.utc)
-            output_date_str = dt_utc.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-            return output_date_str
+            return format_date(input_date_str, date_format)
         except ValueError:
             continue
     raise ValueError(f"Unrecognized date format: {input_date_str} ")
 
-# Convert the csv to json
-def create_json_from_csv(csv_file_path, outputjsonfile):
-    json_data = []
-    deployments = []
+
+class DateFormatter:
+    """Converts the timestamps of a csv to kruize specific format.
+
+    Gives the same output as convert_date_format, but remembers the format that
+    matched last and tries it first, so a file in a single format costs one
+    strptime per value instead of failing through DATE_FORMATS. Converted values
+    are kept in a bounded LRU cache, which also covers the interval start of a
+    row being the interval end of the previous one. convert_column parses the
+    values of a column together with pandas in that format.
+    """
+
+    def __init__(self, cache_size=DATE_CACHE_SIZE):
+        self.date_format = None
+        self.convert = functools.lru_cache(maxsize=cache_size)(self.convert_uncached)
+
+    def convert_uncached(self, input_date_str):
+        if self.date_format is not None:
+            try:
+                return format_date(input_date_str, self.date_format)
+            except ValueError:
+                pass
+        for date_format in DATE_FORMATS:
+            try:
+                output_date_str = format_date(input_date_str, date_format)
+            except ValueError:
+                continue
+            self.date_format = date_format
+            return output_date_str
+        raise ValueError(f"Unrecognized date format: {input_date_str} ")
+
+    # Convert a whole column at once with the format that matched last, parsing each distinct value only once.
+    # As with strptime, a time without a numeric offset is local time. The cells that don't parse with that
+    # format, or are ambiguous or missing in local time, are converted one by one.
+    def convert_column(self, values):
+        if not values:
+            return []
+        if self.date_format is None:
+            self.convert(values[0])
+        has_offset = "%z" in self.date_format
+        # strptime only checks the %Z name, other names than UTC are left to the one by one conversion
+        date_format = self.date_format.replace("%Z", "UTC")
+        codes, distinct = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        try:
+            parsed = pd.to_datetime(pd.Series(distinct), format=date_format, errors="coerce", utc=has_offset)
+            if not has_offset:
+                parsed = parsed.dt.tz_localize(dateutil.tz.tzlocal(), ambiguous="NaT", nonexistent="NaT")
+            utc_times = parsed.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        except ValueError:
+            # A format pandas can't parse with, all the values are converted one by one
+            utc_times = np.full(len(distinct), np.datetime64("NaT"), dtype="datetime64[ns]")
+        # Same as strftime("%Y-%m-%dT%H:%M:%S.000Z"), without formatting the values one by one
+        converted = np.char.add(np.datetime_as_string(utc_times, unit="s"), ".000Z").tolist()
+        failed = np.isnat(utc_times)
+        converted = [self.convert(value) if is_failed else output_date_str
+                     for value, output_date_str, is_failed in zip(distinct, converted, failed)]
+        return [converted[code] for code in codes]
+
+MEBIBYTE = 1048576
+
+# Rows read per chunk by the columnar csv converter
+CSV_CHUNK_SIZE = 1000
+
+# Container metrics in the order they appear in the results json.
+# (metric name, csv column prefix, aggregations, format, column that must be non-empty for the metric to be sent)
+# A mask column of None means the metric is always sent.
+CONTAINER_METRICS = [
+    ("cpuRequest", "cpu_request_container", ("sum", "avg"), "cores", "cpu_request_container_avg"),
+    ("cpuLimit", "cpu_limit_container", ("sum", "avg"), "cores", "cpu_limit_container_avg"),
+    ("cpuThrottle", "cpu_throttle_container", ("sum", "max", "avg"), "cores", "cpu_throttle_container_max"),
+    ("cpuUsage", "cpu_usage_container", ("sum", "min", "max", "avg"), "cores", None),
+    ("memoryRequest", "memory_request_container", ("sum", "avg"), "MiB", "memory_request_container_avg"),
+    ("memoryLimit", "memory_limit_container", ("sum", "avg"), "MiB", "memory_limit_container_avg"),
+    ("memoryUsage", "memory_usage_container", ("min", "max", "sum", "avg"), "MiB", None),
+    ("memoryRSS", "memory_rss_usage_container", ("min", "max", "sum", "avg"), "MiB", None),
+]
+
+# Accelerator metrics are sent only if their columns exist in the csv, along with the accelerator metadata
+ACCELERATOR_METRICS = [
+    ("acceleratorCoreUsage", "accelerator_core_usage_percentage", ("min", "max", "avg"), "percentage", "accelerator_core_usage_percentage_max"),
+    ("acceleratorMemoryUsage", "accelerator_memory_copy_percentage", ("min", "max", "avg"), "percentage", "accelerator_memory_copy_percentage_max"),
+    ("acceleratorFrameBufferUsage", "accelerator_frame_buffer_usage", ("min", "max", "avg"), "percentage", "accelerator_frame_buffer_usage_max"),
+]
+
+
+# Convert the metric columns of a csv chunk at once. Cells are parsed only where the mask column is set,
+# and memory columns are converted from bytes to MiB as whole arrays.
+# Returns (name, format, mask, {aggregation: values}, metadata) per metric present in the chunk.
+def metric_columns(df, metrics, with_metadata=False):
+    num_rows = len(df)
+    columns = []
+    for name, prefix, aggregations, unit, mask_column in metrics:
+        if with_metadata and mask_column not in df.columns:
+            continue
+        if mask_column is None:
+            mask = np.ones(num_rows, dtype=bool)
+        else:
+            mask = (df[mask_column] != "").to_numpy()
+
+        values = {}
+        for aggregation in aggregations:
+            parsed = np.full(num_rows, np.nan)
+            parsed[mask] = df[prefix + "_" + aggregation].to_numpy()[mask].astype(float)
+            if unit == "MiB":
+                parsed /= MEBIBYTE
+            values[aggregation] = parsed.tolist()
+
+        metadata = None
+        if with_metadata:
+            model_names = df["accelerator_model_name"].tolist()
+            nodes = df["node"].tolist() if "node" in df.columns else [""] * num_rows
+            metadata = [{"accelerator_model_name": model_name, "node": node} if node
+                        else {"accelerator_model_name": model_name}
+                        for model_name, node in zip(model_names, nodes)]
+        columns.append((name, unit, mask.tolist(), values, metadata))
+    return columns
+
+
+# Build the container metrics of every row of a csv chunk from the converted columns
+def container_metrics_from_frame(df):
+    columns = metric_columns(df, CONTAINER_METRICS) + metric_columns(df, ACCELERATOR_METRICS, with_metadata=True)
+    for i in range(len(df)):
+        container_metrics = []
+        for name, unit, mask, values, metadata in columns:
+            if not mask[i]:
+                continue
+            aggregation_info = {aggregation: column[i] for aggregation, column in values.items()}
+            aggregation_info["format"] = unit
+            results = {}
+            if metadata is not None:
+                results["metadata"] = metadata[i]
+            results["aggregation_info"] = aggregation_info
+            container_metrics.append({"name": name, "results": results})
+        yield container_metrics
+
+
+# Convert a csv chunk to the updateResults json of container experiments, one dict per row
+def container_results_from_frame(df, date_formatter=None):
+    if date_formatter is None:
+        date_formatter = DateFormatter()
+    # Choose type and name based on available keys
+    workload_types = df["k8_object_type"] if "k8_object_type" in df.columns else df["workload_type"]
+    workload_names = df["k8_object_name"] if "k8_object_name" in df.columns else df["workload"]
+
+    rows = zip(container_metrics_from_frame(df), df["image_name"], df["container_name"], workload_types,
+               workload_names, df["namespace"],
+               date_formatter.convert_column(df["interval_start"].tolist()),
+               date_formatter.convert_column(df["interval_end"].tolist()))
+    for container_metrics, image_name, container_name, workload_type, workload_name, namespace, start, end in rows:
+        container = {
+            "container_image_name": image_name,
+            "container_name": container_name,
+            "metrics": container_metrics
+        }
+        kubernetes_object = {
+            "type": workload_type,
+            "name": workload_name,
+            "namespace": namespace,
+            "containers": [container]
+        }
+        yield {
+            "version": "v2.0",
+            "experiment_name": f"{workload_name}|{workload_type}|{namespace}",
+            "interval_start_time": start,
+            "interval_end_time": end,
+            "kubernetes_objects": [kubernetes_object]
+        }
+
+
+# Read a csv in chunks of string columns; empty cells stay as empty strings and blank rows are dropped
+def read_csv_chunks(csv_file_path):
+    for df in pd.read_csv(csv_file_path, dtype=str, keep_default_na=False, chunksize=CSV_CHUNK_SIZE):
+        yield df[(df != "").any(axis=1)]
+
+
+# Convert a results csv row to the updateResults json of a namespace experiment
+def namespace_result_from_row(row, convert_date=convert_date_format):
     mebibyte = 1048576
 
-    with open(csv_file_path, 'r') as csvfile:
-        csvreader = csv.DictReader(csvfile)
+    namespace_metrics = []
 
-        for row in csvreader:
-            container_metrics_all = {}
-            container_metrics = []
-
-            if row["cpu_request_container_avg"]:
-                container_metrics.append({
-			"name": "cpuRequest",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["cpu_request_container_sum"]),
-                                "avg": float(row["cpu_request_container_avg"]),
-                                "format": "cores"
-                                }
-                            }
-			})
-            if row["cpu_limit_container_avg"]:
-                container_metrics.append({
-			"name" : "cpuLimit",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["cpu_limit_container_sum"]),
-                                "avg": float(row["cpu_limit_container_avg"]),
-                                "format": "cores"
-                                }
-                            }
-                        })
-            if row["cpu_throttle_container_max"]:
-                container_metrics.append({
-			"name" : "cpuThrottle",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["cpu_throttle_container_sum"]),
-                                "max": float(row["cpu_throttle_container_max"]),
-                                "avg": float(row["cpu_throttle_container_avg"]),
-                                "format": "cores"
-                                }
-                            }
-                        })
-            container_metrics.append({
-		    "name" : "cpuUsage",
-                    "results": {
-                        "aggregation_info": {
-                            "sum": float(row["cpu_usage_container_sum"]),
-                            "min": float(row["cpu_usage_container_min"]),
-                            "max": float(row["cpu_usage_container_max"]),
-                            "avg": float(row["cpu_usage_container_avg"]),
-                            "format": "cores"
-                            }
-                        }
-                    })
-            if row["memory_request_container_avg"]:
-                container_metrics.append({
-			"name" : "memoryRequest",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["memory_request_container_sum"])/mebibyte,
-                                "avg": float(row["memory_request_container_avg"])/mebibyte,
-                                "format": "MiB"
-                                }
-                            }
-                        })
-            if row["memory_limit_container_avg"]:
-                container_metrics.append({
-			"name" : "memoryLimit",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["memory_limit_container_sum"])/mebibyte,
-                                "avg": float(row["memory_limit_container_avg"])/mebibyte,
-                                "format": "MiB"
-                                }
-                            }
-                        })
-            container_metrics.append({
-		    "name" : "memoryUsage",
-                    "results": {
-                        "aggregation_info": {
-                            "min": float(row["memory_usage_container_min"])/mebibyte,
-                            "max": float(row["memory_usage_container_max"])/mebibyte,
-                            "sum": float(row["memory_usage_container_sum"])/mebibyte,
-                            "avg": float(row["memory_usage_container_avg"])/mebibyte,
-                            "format": "MiB"
-                        }
-                    }
-                })
-            container_metrics.append({
-		    "name" : "memoryRSS",
-                    "results": {
-                        "aggregation_info": {
-                            "min": float(row["memory_rss_usage_container_min"])/mebibyte,
-                            "max": float(row["memory_rss_usage_container_max"])/mebibyte,
-                            "sum": float(row["memory_rss_usage_container_sum"])/mebibyte,
-                            "avg": float(row["memory_rss_usage_container_avg"])/mebibyte,
-                            "format": "MiB"
-                        }
-                    }
-                })
-
-            if "accelerator_core_usage_percentage_max" in row and row["accelerator_core_usage_percentage_max"]:
-                if "node" in row and row["node"]:
-                    container_metrics.append({
-                        "name" : "acceleratorCoreUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"],
-                                "node": row["node"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_core_usage_percentage_min"]),
-                                "max": float(row["accelerator_core_usage_percentage_max"]),
-                                "avg": float(row["accelerator_core_usage_percentage_avg"]),
-                                "format": "percentage"
-                            }
-                        }
-                    })
-                else:
-                    container_metrics.append({
-                        "name" : "acceleratorCoreUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_core_usage_percentage_min"]),
-                                "max": float(row["accelerator_core_usage_percentage_max"]),
-                                "avg": float(row["accelerator_core_usage_percentage_avg"]),
-                                "format": "percentage"
-                            }
-                        }
-                    })
-
-            if "accelerator_memory_copy_percentage_max" in row and row["accelerator_memory_copy_percentage_max"]:
-                if "node" in row and row["node"]:
-                    container_metrics.append({
-                        "name" : "acceleratorMemoryUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"],
-                                "node": row["node"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_memory_copy_percentage_min"]),
-                                "max": float(row["accelerator_memory_copy_percentage_max"]),
-                                "avg": float(row["accelerator_memory_copy_percentage_avg"]),
-                                "format": "percentage"
-                            }
-                        }
-                    })
-                else:
-                    container_metrics.append({
-                        "name" : "acceleratorMemoryUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_memory_copy_percentage_min"]),
-                                "max": float(row["accelerator_memory_copy_percentage_max"]),
-                                "avg": float(row["accelerator_memory_copy_percentage_avg"]),
-                                "format": "percentage"
-                            }
-                        }
-                    })
-            if "accelerator_frame_buffer_usage_max" in row and row["accelerator_frame_buffer_usage_max"]:
-                if "node" in row and row["node"]:
-                    container_metrics.append({
-                        "name" : "acceleratorFrameBufferUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"],
-                                "node": row["node"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_frame_buffer_usage_min"]),
-                                "max": float(row["accelerator_frame_buffer_usage_max"]),
-                                "avg": float(row["accelerator_frame_buffer_usage_avg"]),
-                                "format": "percentage"
-                            }
-                        }
-                    })
-                else:
-                    container_metrics.append({
-                        "name" : "acceleratorFrameBufferUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_frame_buffer_usage_min"]),
-                                "max": float(row["accelerator_frame_buffer_usage_max"]),
-                                "avg": float(row["accelerator_frame_buffer_usage_avg"]),
-                                "format": "percentage"
-                            }
-                        }
-                    })
-
-            container = {
-                "container_image_name": row["image_name"],
-                "container_name": row["container_name"],
-                "metrics": container_metrics
-            }
+    columns_tocheck = ["namespace", "cluster_name"]
+    namespace = "clowder-system"
+    cluster_name = "e23-alias"
 
-            # Choose type and name based on available keys
-            workload_type = row.get("k8_object_type") or row.get("workload_type")
-            workload_name = row.get("k8_object_name") or row.get("workload")
+    for col in columns_tocheck:
+        if col not in row:
+            if col == "namespace":
+                row[col] = namespace
+            elif col == "cluster_name":
+                row[col] = cluster_name
 
-            containers = [container]
-            kubernetes_object = {
-                "type": workload_type,
-                "name": workload_name,
-                "namespace": row["namespace"],
-                "containers": containers
+    if row["cpu_request_namespace_sum"]:
+        namespace_metrics.append({
+            "name": "namespaceCpuRequest",
+            "results": {
+                "aggregation_info": {
+                    "sum": float(row["cpu_request_namespace_sum"]),
+                    "format": "cores"
+                }
+            }
+        })
+    if row["cpu_limit_namespace_sum"]:
+        namespace_metrics.append({
+            "name" : "namespaceCpuLimit",
+            "results": {
+                "aggregation_info": {
+                    "sum": float(row["cpu_limit_namespace_sum"]),
+                    "format": "cores"
+                }
+            }
+        })
+    if row["cpu_throttle_namespace_min"] and row["cpu_throttle_namespace_max"]:
+        namespace_metrics.append({
+            "name" : "namespaceCpuThrottle",
+            "results": {
+                "aggregation_info": {
+                    "min": float(row["cpu_throttle_namespace_min"]),
+                    "max": float(row["cpu_throttle_namespace_max"]),
+                    "avg": float(row["cpu_throttle_namespace_avg"]),
+                    "format": "cores"
+                }
             }
-            kubernetes_objects = [kubernetes_object]
-            experiment = {
-                "version": "v2.0",
-                "experiment_name": f"{workload_name}|{workload_type}|{row['namespace']}",
-                "interval_start_time": convert_date_format(row["interval_start"]),
-                "interval_end_time": convert_date_format(row["interval_end"]),
-                "kubernetes_objects": kubernetes_objects
+        })
+    elif row["cpu_throttle_namespace_max"]:
+        namespace_metrics.append({
+            "name" : "namespaceCpuThrottle",
+            "results": {
+                "aggregation_info": {
+                    "max": float(row["cpu_throttle_namespace_max"]),
+                    "avg": float(row["cpu_throttle_namespace_avg"]),
+                    "format": "cores"
+                }
             }
-            json_data.append(experiment)
+        })
 
-    with open(outputjsonfile, "w") as json_file:
-        json.dump(json_data, json_file)
+    if row["cpu_usage_namespace_avg"]:
+        namespace_metrics.append({
+            "name" : "namespaceCpuUsage",
+            "results": {
+                "aggregation_info": {
+                    "min": float(row["cpu_usage_namespace_min"]),
+                    "max": float(row["cpu_usage_namespace_max"]),
+                    "avg": float(row["cpu_usage_namespace_avg"]),
+                    "format": "cores"
+                }
+            }
+        })
+    if row["memory_request_namespace_sum"]:
+        namespace_metrics.append({
+            "name" : "namespaceMemoryRequest",
+            "results": {
+                "aggregation_info": {
+                    "sum": float(row["memory_request_namespace_sum"])/mebibyte,
+                    "format": "MiB"
+                }
+            }
+        })
+    if row["memory_limit_namespace_sum"]:
+        namespace_metrics.append({
+            "name" : "namespaceMemoryLimit",
+            "results": {
+                "aggregation_info": {
+                    "sum": float(row["memory_limit_namespace_sum"])/mebibyte,
+                    "format": "MiB"
+                }
+            }
+        })
+    if row["memory_usage_namespace_avg"]:
+        namespace_metrics.append({
+            "name" : "namespaceMemoryUsage",
+            "results": {
+                "aggregation_info": {
+                    "min": float(row["memory_usage_namespace_min"])/mebibyte,
+                    "max": float(row["memory_usage_namespace_max"])/mebibyte,
+                    "avg": float(row["memory_usage_namespace_avg"])/mebibyte,
+                    "format": "MiB"
+                }
+            }
+        })
+    if row["memory_rss_usage_namespace_avg"]:
+        namespace_metrics.append({
+            "name" : "namespaceMemoryRSS",
+            "results": {
+                "aggregation_info": {
+                    "min": float(row["memory_rss_usage_namespace_min"])/mebibyte,
+                    "max": float(row["memory_rss_usage_namespace_max"])/mebibyte,
+                    "avg": float(row["memory_rss_usage_namespace_avg"])/mebibyte,
+                    "format": "MiB"
+                }
+            }
+        })
 
+    # Create a dictionary to hold the container information
+    namespace = {
+        "namespace": row["namespace"],
+        "metrics": namespace_metrics
+    }
 
-#create_json_from_csv('../csv_data/rhsso-operator_deployment_sso.csv', 'finaldata.csv')
+    # Create a list to hold the containers
+    namespaces = [namespace]
 
-# Create results json for namespace experiment from csv
-def create_namespace_json_from_csv(csv_file_path, outputjsonfile):
+    # Create a dictionary to hold the deployment information
+    kubernetes_object = {
+        "namespaces": namespace
+    }
+    kubernetes_objects = [kubernetes_object]
 
-    # Check if output file already exists. If yes, delete that.
-    if os.path.exists(outputjsonfile):
-        os.remove(outputjsonfile)
+    # Create a dictionary to hold the experiment data
+    experiment = {
+        "version": "v2.0",
+        "experiment_name": row["cluster_name"] + '|' + row["namespace"],
+        "interval_start_time": convert_date(row["start_timestamp"]),
+        "interval_end_time": convert_date(row["end_timestamp"]),
+        "kubernetes_objects": kubernetes_objects
+    }
 
-    # Define the list that will hold the final JSON data
-    json_data = []
+    return experiment
 
-    mebibyte = 1048576
+
+# Stream the updateResults payloads of a results csv, one dict per row, without intermediate files.
+# Container csvs go through the columnar converter, namespace csvs are converted row by row.
+def results_from_csv(csv_file_path, experiment_type=None):
+    date_formatter = DateFormatter()
+    if experiment_type != "namespace":
+        for df in read_csv_chunks(csv_file_path):
+            yield from container_results_from_frame(df, date_formatter)
+        return
 
     with open(csv_file_path, 'r') as csvfile:
         csvreader = csv.DictReader(csvfile)
-
         for row in csvreader:
-            namespace_metrics_all = {}
-            namespace_metrics = []
-
-            columns_tocheck = ["namespace", "cluster_name"]
-            namespace = "clowder-system"
-            cluster_name = "e23-alias"
-
-            for col in columns_tocheck:
-                if col not in row:
-                    if col == "namespace":
-                        row[col] = namespace
-                    elif col == "cluster_name":
-                        row[col] = cluster_name
-
-            if row["cpu_request_namespace_sum"]:
-                namespace_metrics.append({
-                    "name": "namespaceCpuRequest",
-                    "results": {
-                        "aggregation_info": {
-                            "sum": float(row["cpu_request_namespace_sum"]),
-                            "format": "cores"
-                        }
-                    }
-                })
-            if row["cpu_limit_namespace_sum"]:
-                namespace_metrics.append({
-                    "name" : "namespaceCpuLimit",
-                    "results": {
-                        "aggregation_info": {
-                            "sum": float(row["cpu_limit_namespace_sum"]),
-                            "format": "cores"
-                        }
-                    }
-                })
-            if row["cpu_throttle_namespace_min"] and row["cpu_throttle_namespace_max"]:
-                namespace_metrics.append({
-                    "name" : "namespaceCpuThrottle",
-                    "results": {
-                        "aggregation_info": {
-                            "min": float(row["cpu_throttle_namespace_min"]),
-                            "max": float(row["cpu_throttle_namespace_max"]),
-                            "avg": float(row["cpu_throttle_namespace_avg"]),
-                            "format": "cores"
-                        }
-                    }
-                })
-            elif row["cpu_throttle_namespace_max"]:
-                namespace_metrics.append({
-                    "name" : "namespaceCpuThrottle",
-                    "results": {
-                        "aggregation_info": {
-                            "max": float(row["cpu_throttle_namespace_max"]),
-                            "avg": float(row["cpu_throttle_namespace_avg"]),
-                            "format": "cores"
-                        }
-                    }
-                })
-
-            if row["cpu_usage_namespace_avg"]:
-                namespace_metrics.append({
-                    "name" : "namespaceCpuUsage",
-                    "results": {
-                        "aggregation_info": {
-                            "min": float(row["cpu_usage_namespace_min"]),
-                            "max": float(row["cpu_usage_namespace_max"]),
-                            "avg": float(row["cpu_usage_namespace_avg"]),
-                            "format": "cores"
-                        }
-                    }
-                })
-            if row["memory_request_namespace_sum"]:
-                namespace_metrics.append({
-                    "name" : "namespaceMemoryRequest",
-                    "results": {
-                        "aggregation_info": {
-                            "sum": float(row["memory_request_namespace_sum"])/mebibyte,
-                            "format": "MiB"
-                        }
-                    }
-                })
-            if row["memory_limit_namespace_sum"]:
-                namespace_metrics.append({
-                    "name" : "namespaceMemoryLimit",
-                    "results": {
-                        "aggregation_info": {
-                            "sum": float(row["memory_limit_namespace_sum"])/mebibyte,
-                            "format": "MiB"
-                        }
-                    }
-                })
-            if row["memory_usage_namespace_avg"]:
-                namespace_metrics.append({
-                    "name" : "namespaceMemoryUsage",
-                    "results": {
-                        "aggregation_info": {
-                            "min": float(row["memory_usage_namespace_min"])/mebibyte,
-                            "max": float(row["memory_usage_namespace_max"])/mebibyte,
-                            "avg": float(row["memory_usage_namespace_avg"])/mebibyte,
-                            "format": "MiB"
-                        }
-                    }
-                })
-            if row["memory_rss_usage_namespace_avg"]:
-                namespace_metrics.append({
-                    "name" : "namespaceMemoryRSS",
-                    "results": {
-                        "aggregation_info": {
-                            "min": float(row["memory_rss_usage_namespace_min"])/mebibyte,
-                            "max": float(row["memory_rss_usage_namespace_max"])/mebibyte,
-                            "avg": float(row["memory_rss_usage_namespace_avg"])/mebibyte,
-                            "format": "MiB"
-                        }
-                    }
-                })
-
-            # Create a dictionary to hold the container information
-            namespace = {
-                "namespace": row["namespace"],
-                "metrics": namespace_metrics
-            }
+            if not any(row.values()):
+                continue
+            yield namespace_result_from_row(row, date_formatter.convert)
 
-            # Create a list to hold the containers
-            namespaces = [namespace]
 
-            # Create a dictionary to hold the deployment information
-            kubernetes_object = {
-                "namespaces": namespace
-            }
-            kubernetes_objects = [kubernetes_object]
-
-            # Create a dictionary to hold the experiment data
-            experiment = {
-                "version": "v2.0",
-                "experiment_name": row["cluster_name"] + '|' + row["namespace"],
-                "interval_start_time": convert_date_format(row["start_timestamp"]),
-                "interval_end_time": convert_date_format(row["end_timestamp"]),
-                "kubernetes_objects": kubernetes_objects
-            }
+# Convert the csv to json
+def create_json_from_csv(csv_file_path, outputjsonfile):
+    json_data = list(results_from_csv(csv_file_path))
+
+    with open(outputjsonfile, "w") as json_file:
+        json.dump(json_data, json_file)
+
+
+#create_json_from_csv('../csv_data/rhsso-operator_deployment_sso.csv', 'finaldata.csv')
+
+# Create results json for namespace experiment from csv
+def create_namespace_json_from_csv(csv_file_path, outputjsonfile):
+
+    # Check if output file already exists. If yes, delete that.
+    if os.path.exists(outputjsonfile):
+        os.remove(outputjsonfile)
 
-            json_data.append(experiment)
+    json_data = list(results_from_csv(csv_file_path, "namespace"))
     with open(outputjsonfile, "w") as json_file:
         json.dump(json_data, json_file)
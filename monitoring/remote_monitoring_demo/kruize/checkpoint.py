@@ -0,0 +1,131 @@
+"""
+Copyright (c) 2022, 2022 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CHECKPOINT_FILE = "ingest_checkpoint.json"
+# The checkpoint is saved once this many seconds passed or this many updateResults calls were acknowledged
+# since the last save, whichever comes first, and at exit
+DEFAULT_SAVE_INTERVAL = 5
+DEFAULT_SAVE_EVERY = 50
+
+
+class IngestCheckpoint:
+    """Last interval_end_time acknowledged by updateResults, per experiment.
+
+    When resuming, the results up to that end time are skipped. Saves are
+    batched: the checkpoint is written every save_every acknowledged calls,
+    every save_interval seconds and at exit, so a crash may repeat the calls
+    acknowledged since the last save. It is written to a temporary file that
+    then replaces the checkpoint file, so a crash leaves either the previous
+    or the new checkpoint and never a partial one. Once an updateResults call
+    of an experiment fails, its end time stays below the first failed
+    interval_end_time until that interval is acknowledged by a retry or
+    dropped, the end times acknowledged meanwhile are held and it then catches
+    up with them. Interval end times are in the Kruize "%Y-%m-%dT%H:%M:%S.%fZ"
+    format and are compared as strings. acknowledge() and drop() may be called
+    from several threads at once.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_FILE, resume=False, save_interval=DEFAULT_SAVE_INTERVAL,
+                 save_every=DEFAULT_SAVE_EVERY, clock=time.monotonic):
+        self.path = path
+        self.save_interval = save_interval
+        self.save_every = save_every
+        self.clock = clock
+        self.end_times = {}
+        # interval_end_times of the failed updateResults calls per experiment, the checkpoint stays below them
+        self.failed = {}
+        # interval_end_times acknowledged above a failed one per experiment
+        self.held = {}
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._last_save = clock()
+        if resume and os.path.exists(path):
+            with open(path, "r") as checkpoint_file:
+                self.end_times = json.load(checkpoint_file)
+            print("\nResuming from checkpoint ", path, " with ", len(self.end_times), " experiments")
+        atexit.register(self.save)
+
+    def is_acknowledged(self, experiment_name, interval_end_time):
+        end_time = self.end_times.get(experiment_name)
+        return end_time is not None and interval_end_time <= end_time
+
+    # Skips the results that were already acknowledged
+    def pending(self, results):
+        for result in results:
+            if not self.is_acknowledged(result["experiment_name"], result["interval_end_time"]):
+                yield result
+
+    # Records the results posted in an updateResults call if Kruize accepted them. A None response, returned
+    # by update_results when the results are rejected before being posted, counts as a failure.
+    def acknowledge(self, results, response):
+        with self._lock:
+            if response is None or response.status_code >= 300:
+                for result in results:
+                    self.failed.setdefault(result["experiment_name"], set()).add(result["interval_end_time"])
+                return
+            self._advance(results)
+
+    # Moves the checkpoint past results that will not be posted again, as if they had been acknowledged
+    def drop(self, results):
+        with self._lock:
+            self._advance(results)
+
+    # Acknowledges the end times of the results. The end times above the first failed one of an experiment are held
+    # until no failed one is left below them.
+    def _advance(self, results):
+        experiment_names = set()
+        for result in results:
+            experiment_name, end_time = result["experiment_name"], result["interval_end_time"]
+            self.failed.get(experiment_name, set()).discard(end_time)
+            self.held.setdefault(experiment_name, []).append(end_time)
+            experiment_names.add(experiment_name)
+        for experiment_name in experiment_names:
+            if not self.failed.get(experiment_name):
+                self.failed.pop(experiment_name, None)
+            first_failed = min(self.failed[experiment_name]) if experiment_name in self.failed else None
+            held = self.held.pop(experiment_name)
+            acknowledged = [end_time for end_time in held if first_failed is None or end_time < first_failed]
+            if len(acknowledged) < len(held):
+                self.held[experiment_name] = [end_time for end_time in held if end_time >= first_failed]
+            if acknowledged and not self.is_acknowledged(experiment_name, max(acknowledged)):
+                self.end_times[experiment_name] = max(acknowledged)
+        self._unsaved += 1
+        if self._unsaved >= self.save_every or self.clock() - self._last_save >= self.save_interval:
+            self._save()
+
+    # Writes the acknowledgements not saved yet
+    def save(self):
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, prefix=".checkpoint-", suffix=".tmp",
+                                         delete=False) as checkpoint_file:
+            json.dump(self.end_times, checkpoint_file, indent=4)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(checkpoint_file.name, self.path)
+        self._unsaved = 0
+        self._last_save = self.clock()
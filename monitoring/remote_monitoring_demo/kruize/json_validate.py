@@ -15,7 +15,7 @@ limitations under the License.
 """
 
 import jsonschema
-from jsonschema import validate, draft7_format_checker
+from jsonschema import draft7_format_checker
 
 DIRECTIONS_SUPPORTED = ("maximize", "minimize")
 
@@ -151,23 +151,191 @@ exp_input_schema = {
   }
 }
 
+metrics_schema = {
+  "type": "array",
+  "items": {
+    "type": "object",
+    "properties": {
+      "name": {
+        "type": "string"
+      },
+      "results": {
+        "type": "object",
+        "properties": {
+          "metadata": {
+            "type": "object"
+          },
+          "aggregation_info": {
+            "type": "object",
+            "properties": {
+              "format": {
+                "type": "string"
+              }
+            },
+            "additionalProperties": {
+              "type": "number"
+            },
+            "required": [
+              "format"
+            ]
+          }
+        },
+        "required": [
+          "aggregation_info"
+        ]
+      }
+    },
+    "required": [
+      "name",
+      "results"
+    ]
+  }
+}
+
+result_input_schema = {
+  "type": "array",
+  "items": {
+    "type": "object",
+    "properties": {
+      "version": {
+        "type": "string"
+      },
+      "experiment_name": {
+        "type": "string"
+      },
+      "interval_start_time": {
+        "type": "string"
+      },
+      "interval_end_time": {
+        "type": "string"
+      },
+      "kubernetes_objects": {
+        "type": "array",
+        "items": {
+          "type": "object",
+          "properties": {
+            "type": {
+              "type": "string"
+            },
+            "name": {
+              "type": "string"
+            },
+            "namespace": {
+              "type": "string"
+            },
+            "containers": {
+              "type": "array",
+              "items": {
+                "type": "object",
+                "properties": {
+                  "container_image_name": {
+                    "type": "string"
+                  },
+                  "container_name": {
+                    "type": "string"
+                  },
+                  "metrics": metrics_schema
+                },
+                "required": [
+                  "container_image_name",
+                  "container_name",
+                  "metrics"
+                ]
+              }
+            },
+            "namespaces": {
+              "type": "object",
+              "properties": {
+                "namespace": {
+                  "type": "string"
+                },
+                "metrics": metrics_schema
+              },
+              "required": [
+                "namespace",
+                "metrics"
+              ]
+            }
+          },
+          "oneOf": [
+            {
+              "required": [
+                "namespaces"
+              ]
+            },
+            {
+              "required": [
+                "containers",
+                "type",
+                "name",
+                "namespace"
+              ]
+            }
+          ]
+        }
+      }
+    },
+    "required": [
+      "version",
+      "experiment_name",
+      "interval_start_time",
+      "interval_end_time",
+      "kubernetes_objects"
+    ]
+  }
+}
+
+# Builds the validator of a schema once, as jsonschema.validate would for every call
+def compile_validator(schema):
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema, format_checker=draft7_format_checker)
+
+exp_input_validator = compile_validator(exp_input_schema)
+result_input_validator = compile_validator(result_input_schema)
+
+# Returns the error jsonschema.validate would raise for the instance, None if it is valid
+def schema_error(validator, instance):
+    return jsonschema.exceptions.best_match(validator.iter_errors(instance))
+
+# Converts a schema validation error to the error message returned by the validation functions
+def schema_error_message(err):
+    # Check if the exception is due to empty or null required parameters and prepare the response accordingly
+    if any(word in err.message for word in JSON_NULL_VALUES):
+        errorMsg = "Parameters" + VALUE_MISSING
+        return errorMsg
+    # Modify the error response in case of additional properties error
+    elif str(err.message).__contains__('('):
+        errorMsg = str(err.message).split('(')
+        return errorMsg[0]
+    else:
+        return err.message
+
 def validate_exp_input_json(exp_input_json):
     errorMsg = ""
-    try:
-        validate(instance=exp_input_json, schema=exp_input_schema, format_checker=draft7_format_checker)
-        errorMsg = validate_exp_input_json_values(exp_input_json[0])
-        return errorMsg
-    except jsonschema.exceptions.ValidationError as err:
-        # Check if the exception is due to empty or null required parameters and prepare the response accordingly
-        if any(word in err.message for word in JSON_NULL_VALUES):
-            errorMsg = "Parameters" + VALUE_MISSING
-            return errorMsg
-        # Modify the error response in case of additional properties error
-        elif str(err.message).__contains__('('):
-            errorMsg = str(err.message).split('(')
-            return errorMsg[0]
-        else:
-            return err.message
+    err = schema_error(exp_input_validator, exp_input_json)
+    if err is not None:
+        return schema_error_message(err)
+    errorMsg = validate_exp_input_json_values(exp_input_json[0])
+    return errorMsg
+
+# Validates a list of experiments, each as the createExperiment input json holding only that experiment.
+# Returns the error messages of the invalid experiments by experiment name, or by index if it has no name.
+def validate_exp_input_jsons(experiments):
+    errors = {}
+    for i, exp in enumerate(experiments):
+        errorMsg = validate_exp_input_json([exp])
+        if errorMsg:
+            name = exp.get("experiment_name", i) if isinstance(exp, dict) else i
+            errors[name] = errorMsg
+    return errors
+
+# Validates the updateResults input json, returns the error message, empty if it is valid
+def validate_result_input_json(result_input_json):
+    err = schema_error(result_input_validator, result_input_json)
+    if err is not None:
+        return schema_error_message(err)
+    return ""
 
 def validate_exp_input_json_values(exp):
     validationErrorMsg = ""
@@ -21,12 +21,75 @@ import os
 import signal
 import time
 
-from .json_validate import validate_exp_input_json
+from requests.adapters import HTTPAdapter
+
+from .json_validate import validate_exp_input_json, validate_result_input_json
 
 # Global vars
-URL = ""
 KRUIZE_UI_URL = ""
 
+# Connection pool settings for the shared Kruize session
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+# (connect, read) timeouts in seconds, per Kruize endpoint
+DEFAULT_TIMEOUT = (10, 60)
+ENDPOINT_TIMEOUTS = {
+    "/createExperiment": (10, 60),
+    "/createPerformanceProfile": (10, 60),
+    "/updateResults": (10, 120),
+    "/updateRecommendations": (10, 300),
+    "/listRecommendations": (10, 120),
+    "/listExperiments": (10, 300),
+}
+
+
+class KruizeClient:
+    """Pooled, keep-alive HTTP session for the Kruize REST API.
+
+    All the API helpers in this module go through a single instance so that
+    repeated calls reuse TCP connections instead of opening one per request.
+    """
+
+    def __init__(self, base_url="", pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, timeouts=None):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        self.configure(pool_connections, pool_maxsize, timeouts)
+
+    def configure(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, timeouts=None):
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+    def url(self, endpoint):
+        return self.base_url + endpoint
+
+    def timeout(self, endpoint):
+        return self.timeouts.get(endpoint.split("?")[0], DEFAULT_TIMEOUT)
+
+    def request(self, method, endpoint, **kwargs):
+        kwargs.setdefault("timeout", self.timeout(endpoint))
+        return self.session.request(method, self.url(endpoint), **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def delete(self, endpoint, **kwargs):
+        return self.request("DELETE", endpoint, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+kruize_client = KruizeClient()
+
+
 def get_pod_name(label_selector, namespace):
     result = subprocess.run(
         [
@@ -54,7 +117,6 @@ def kill_existing_port_forward(namespace):
         os.kill(int(pid), signal.SIGTERM)
 
 def form_kruize_url(cluster_type):
-    global URL
     global KRUIZE_UI_URL
     if (cluster_type == "minikube"):
         port = subprocess.run(
@@ -83,7 +145,7 @@ def form_kruize_url(cluster_type):
 
         ip = subprocess.run(["minikube", "ip"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
         SERVER_IP = ip.stdout.strip()
-        URL = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
+        kruize_client.base_url = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
         KRUIZE_UI_URL = "http://" + str(SERVER_IP) + ":" + str(KRUIZE_UI_PORT)
 
     elif (cluster_type == "openshift"):
@@ -96,7 +158,7 @@ def form_kruize_url(cluster_type):
                 "-o", "jsonpath={.spec.host}",
                 ],
                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True,).stdout.strip()
-        URL = f"http://{host}"
+        kruize_client.base_url = f"http://{host}"
 
         subprocess.run(["oc", "expose", "svc/kruize-ui-nginx-service", "-n", "openshift-tuning"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
         host = subprocess.run(
@@ -127,16 +189,24 @@ def form_kruize_url(cluster_type):
             stdout=DEVNULL, stderr=DEVNULL, start_new_session=True)
         time.sleep(60)
 
-        URL = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
+        kruize_client.base_url = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
         KRUIZE_UI_URL = "http://" + str(SERVER_IP) + ":" + str(KRUIZE_UI_PORT)
-    print("\nKRUIZE AUTOTUNE URL = ", URL)
+    print("\nKRUIZE AUTOTUNE URL = ", kruize_client.base_url)
     print("\nKRUIZE UI URL = ", KRUIZE_UI_URL)
 
+# Description: Returns the json as is if it is already loaded, else reads it from the file
+# Input Parameters: json file or json object
+def load_json(json_input):
+    if isinstance(json_input, (list, dict)):
+        return json_input
+    with open(json_input, "r") as json_file:
+        return json.load(json_file)
+
+
 # Description: This function validates the input json and posts the experiment using createExperiment API to Kruize
-# Input Parameters: experiment input json
+# Input Parameters: experiment input json file or the experiment json itself
 def create_experiment(input_json_file):
-    json_file = open(input_json_file, "r")
-    input_json = json.loads(json_file.read())
+    input_json = load_json(input_json_file)
     print("\n************************************************************")
     print(input_json)
     print("\n************************************************************")
@@ -152,30 +222,31 @@ def create_experiment(input_json_file):
         # read the json
         print("\nCreating the experiment...")
 
-        url = URL + "/createExperiment"
-        print("URL = ", url)
+        print("URL = ", kruize_client.url("/createExperiment"))
         print("KRUIZE UI URL = ", KRUIZE_UI_URL)
 
-        response = requests.post(url, json=input_json)
+        response = kruize_client.post("/createExperiment", json=input_json)
         print("Response status code = ", response.status_code)
         print(response.text)
 
 
 # Description: This function validates the result json and posts the experiment results using updateResults API to Kruize
-# Input Parameters: resource usage metrics json
+# Input Parameters: resource usage metrics json file or the results json itself
 def update_results(result_json_file):
-    # read the json
-    json_file = open(result_json_file, "r")
-    result_json = json.loads(json_file.read())
+    result_json = load_json(result_json_file)
 
-    # TO DO: Validate the result json
+    # Validate the json, the results are not posted if it is invalid
+    isInvalid = validate_result_input_json(result_json)
+    if isInvalid:
+        print(isInvalid)
+        print("Result Json is invalid")
+        return None
 
     print("\nUpdating the results...")
-    url = URL + "/updateResults"
-    print("URL = ", url)
+    print("URL = ", kruize_client.url("/updateResults"))
     print("KRUIZE UI URL = ", KRUIZE_UI_URL)
 
-    response = requests.post(url, json=result_json)
+    response = kruize_client.post("/updateResults", json=result_json)
     print("Response status code = ", response.status_code)
     print(response.text)
     return response
@@ -183,10 +254,10 @@ def update_results(result_json_file):
 
 def update_recommendations(name, edate):
     print("\nUpdating the Recommendations...")
-    url = URL + "/updateRecommendations?experiment_name=%s&interval_end_time=%s" % (name, edate)
-    print("URL = ", url)
+    endpoint = "/updateRecommendations?experiment_name=%s&interval_end_time=%s" % (name, edate)
+    print("URL = ", kruize_client.url(endpoint))
 
-    response = requests.post(url, )
+    response = kruize_client.post(endpoint)
     print("Response status code = ", response.status_code)
     # print(response.text)
     return response
@@ -196,14 +267,14 @@ def update_recommendations(name, edate):
 # Input Parameters: experiment name
 def list_recommendations(experiment_name, rm=False):
     print("\nListing the recommendations...")
-    url = URL + "/listRecommendations"
+    endpoint = "/listRecommendations"
     if rm:
-        url += "?rm=true"
-    print("URL = ", url)
+        endpoint += "?rm=true"
+    print("URL = ", kruize_client.url(endpoint))
     print("KRUIZE UI URL = ", KRUIZE_UI_URL)
 
     PARAMS = {'experiment_name': experiment_name}
-    response = requests.get(url=url, params=PARAMS)
+    response = kruize_client.get(endpoint, params=PARAMS)
     print("Response status code = ", response.status_code)
 
     return response.json()
@@ -216,11 +287,10 @@ def create_performance_profile(perf_profile_json_file):
     perf_profile_json = json.loads(json_file.read())
 
     print("\nCreating performance profile...")
-    url = URL + "/createPerformanceProfile"
-    print("URL = ", url)
+    print("URL = ", kruize_client.url("/createPerformanceProfile"))
     print("KRUIZE UI URL = ", KRUIZE_UI_URL)
 
-    response = requests.post(url, json=perf_profile_json)
+    response = kruize_client.post("/createPerformanceProfile", json=perf_profile_json)
     print("Response status code = ", response.status_code)
     print(response.text)
     return response
@@ -229,13 +299,13 @@ def create_performance_profile(perf_profile_json_file):
 # Description: This function obtains the experiments and result metrics from Kruize using listExperiments API
 def list_experiments(rm=False):
     print("\nListing the experiments...")
-    url = URL + "/listExperiments"
+    endpoint = "/listExperiments"
     if rm:
-        url += "?rm=true"
-    print("URL = ", url)
+        endpoint += "?rm=true"
+    print("URL = ", kruize_client.url(endpoint))
     print("KRUIZE UI URL = ", KRUIZE_UI_URL)
 
-    response = requests.get(url=url)
+    response = kruize_client.get(endpoint)
     print("Response status code = ", response.status_code)
 
     return response.json()
@@ -256,6 +326,7 @@ def combine_jsons(result_json, reco_json):
 
 
 def remote_monitoring_summary():
+    URL = kruize_client.base_url
     summary_message = f"""
 ##########################################
 Remote monitoring demo summary:
@@ -0,0 +1,59 @@
+"""
+Copyright (c) 2022, 2022 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+
+from . import kruize
+
+DEFAULT_CONCURRENCY = 4
+
+
+class AsyncKruizeClient:
+    """asyncio front-end for the Kruize API helpers in kruize.py.
+
+    Each call runs on a worker thread over the shared pooled session. A
+    semaphore caps the number of requests in flight; all of them go to the
+    single Kruize instance of kruize_client.base_url. Callers keep the calls
+    of one experiment in order by awaiting them one after another.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
+        self._limit = asyncio.Semaphore(concurrency)
+        # Make sure the pool can hold a connection per in-flight request
+        kruize.kruize_client.configure(pool_maxsize=max(concurrency, kruize.POOL_MAXSIZE))
+
+    async def _call(self, func, *args, **kwargs):
+        async with self._limit:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def create_experiment(self, *args, **kwargs):
+        return await self._call(kruize.create_experiment, *args, **kwargs)
+
+    async def update_results(self, *args, **kwargs):
+        return await self._call(kruize.update_results, *args, **kwargs)
+
+    async def update_recommendations(self, *args, **kwargs):
+        return await self._call(kruize.update_recommendations, *args, **kwargs)
+
+    async def list_recommendations(self, *args, **kwargs):
+        return await self._call(kruize.list_recommendations, *args, **kwargs)
+
+    async def list_experiments(self, *args, **kwargs):
+        return await self._call(kruize.list_experiments, *args, **kwargs)
+
+    async def create_performance_profile(self, *args, **kwargs):
+        return await self._call(kruize.create_performance_profile, *args, **kwargs)
@@ -0,0 +1,158 @@
+"""
+Copyright (c) 2023, 2023 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys, getopt
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recommendations_demo.recommendation_validation import aggregate_workloads_frame
+
+# Description: Regression check and benchmark of recommendation_validation.aggregateWorkloads.
+# The iterrows / file_N.csv implementation it had before the aggregation was vectorized is kept here
+# as a reference, its output is compared with aggregate_workloads_frame, ignoring the order of the rows.
+# Run it from the recommendations_infra_demo directory, the default csv paths are relative to it.
+
+DEFAULT_CSVS = ["recommendations_demo/crc-results/aliascluster.csv",
+                "recommendations_demo/validateResults/advisor-frontend_norequestslimits.csv",
+                "recommendations_demo/validateResults/cert-manager-gpu.csv",
+                "recommendations_demo/validateResults/cert-manager-openshift-routes_cpumem-overprovisioned.csv",
+                "recommendations_demo/validateResults/clowder-plugin_nocpuRecommendations.csv"]
+
+
+# The reference writes its intermediate files to the current directory, run it in workdir
+def aggregate_workloads_reference(filename, outputResults, workdir):
+    cwd = os.getcwd()
+    filename = os.path.abspath(filename)
+    outputResults = os.path.abspath(outputResults)
+    os.chdir(workdir)
+    try:
+        df = pd.read_csv(filename)
+
+        columns_to_check = ['owner_kind', 'owner_name', 'workload', 'workload_type']
+        df = df.dropna(subset=columns_to_check, how='any')
+        df = df[df['workload_type'] != 'job']
+
+        df['k8_object_type'] = ''
+        for i, row in df.iterrows():
+            if row['owner_kind'] == 'ReplicaSet' and row['workload'] == '<none>':
+                df.at[i, 'k8_object_type'] = 'replicaset'
+            elif row['owner_kind'] == 'ReplicationController' and row['workload'] == '<none>':
+                df.at[i, 'k8_object_type'] = 'replicationcontroller'
+            else:
+                df.at[i, 'k8_object_type'] = row['workload_type']
+
+        df['k8_object_name'] = ''
+        for i, row in df.iterrows():
+            if row['workload'] != '<none>':
+                df.at[i, 'k8_object_name'] = row['workload']
+            else:
+                df.at[i, 'k8_object_name'] = row['owner_name']
+
+        sort_columns = ['namespace', 'k8_object_type', 'workload', 'container_name', 'interval_start']
+        sorted_df = df.sort_values(sort_columns)
+        grouped = sorted_df.groupby(sort_columns)
+
+        output_dir = 'output'
+        os.makedirs(output_dir)
+        counter = 0
+        for key, group in grouped:
+            counter += 1
+            group.to_csv(os.path.join(output_dir, f"file_{counter}.csv"), index=False)
+
+        agg_df = pd.DataFrame(columns=df.columns.tolist())
+        columns_to_ignore = ['pod', 'owner_name', 'node']
+        if 'resource_id' in df.columns:
+            columns_to_ignore.append('resource_id')
+
+        for filename in os.listdir(output_dir):
+            if filename.endswith('.csv'):
+                df = pd.read_csv(os.path.join(output_dir, filename))
+                for column in df.columns:
+                    if column.endswith('avg'):
+                        df[column] = df[column].mean()
+                    elif column.endswith('min'):
+                        df[column] = df[column].min()
+                    elif column.endswith('max'):
+                        df[column] = df[column].max()
+                    elif column.endswith('sum'):
+                        df[column] = df[column].sum()
+                df = df.drop_duplicates(subset=[col for col in df.columns if col not in columns_to_ignore])
+                agg_df = pd.concat([agg_df, df], ignore_index=True)
+
+        agg_df.to_csv('final.csv', index=False)
+        df1 = pd.read_csv('final.csv')
+        df1.drop(columns_to_ignore, axis=1, inplace=True)
+        df1.to_csv(outputResults, index=False)
+    finally:
+        os.chdir(cwd)
+
+
+# Reads an aggregated csv back with its rows in a canonical order
+def sorted_rows(filename):
+    df = pd.read_csv(filename)
+    df = df[sorted(df.columns)]
+    return df.sort_values(list(df.columns), kind='stable').reset_index(drop=True)
+
+
+def check(filename):
+    with tempfile.TemporaryDirectory() as workdir:
+        reference_csv = os.path.join(workdir, "reference.csv")
+        vectorized_csv = os.path.join(workdir, "vectorized.csv")
+
+        start = time.perf_counter()
+        aggregate_workloads_reference(filename, reference_csv, workdir)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        aggregate_workloads_frame(pd.read_csv(filename)).to_csv(vectorized_csv, index=False)
+        vectorized_time = time.perf_counter() - start
+
+        reference, vectorized = sorted_rows(reference_csv), sorted_rows(vectorized_csv)
+        try:
+            pd.testing.assert_frame_equal(reference, vectorized, check_dtype=False, rtol=1e-9)
+        except AssertionError as e:
+            print(f"aggregate_workloads_frame differs from the reference for {filename}:\n{e}")
+            return False
+    print("%-90s %6d rows %8.3f s %8.3f s" % (filename, len(reference), reference_time, vectorized_time))
+    return True
+
+
+def main(argv):
+    csvs = DEFAULT_CSVS
+
+    try:
+        opts, args = getopt.getopt(argv, "h:f:")
+    except getopt.GetoptError:
+        print("bench_aggregate_workloads.py -f <comma separated metrics csvs>")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print("bench_aggregate_workloads.py -f <comma separated metrics csvs>")
+            sys.exit()
+        elif opt == '-f':
+            csvs = arg.split(",")
+
+    print("%-90s %11s %10s %10s" % ("csv", "", "reference", "vectorized"))
+    if not all([check(filename) for filename in csvs]):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
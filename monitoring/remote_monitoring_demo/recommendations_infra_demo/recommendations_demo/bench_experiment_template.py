@@ -0,0 +1,105 @@
+"""
+Copyright (c) 2023, 2023 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+import sys, getopt
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recommendations_demo.recommendation_experiment import EXP_TEMPLATE, NAMESPACE_EXP_TEMPLATE, experiment_json
+
+# Description: Benchmark of the experiment json rendering done by recommendation_experiment.experiment_json.
+# The template load and the replacements in the serialized json it did for every row before the templates
+# were precompiled are kept here as a reference, its output is compared with experiment_json.
+# Run it from the recommendations_infra_demo directory, the template paths are relative to it.
+
+def synthetic_rows(num_experiments):
+    for i in range(num_experiments):
+        yield {"image_name": f"quay.io/example/app-{i % 7}:latest", "container_name": f"container-{i % 3}",
+               "k8_object_type": "deployment", "k8_object_name": f"workload-{i}",
+               "namespace": f"namespace-{i % 50}", "cluster_name": "scale-test"}
+
+
+def experiment_json_reference(row, exp_type=None):
+    if exp_type == "namespace":
+        with open(NAMESPACE_EXP_TEMPLATE, 'r') as jsonfile:
+            data = json.load(jsonfile)
+        replacements = {
+            "EXP_NAME": row["cluster_name"] + '|' + row["namespace"],
+            "CLUSTER_NAME": row["cluster_name"],
+            "k8Object_NAMESPACE_NAME": row["namespace"],
+            }
+    else:
+        with open(EXP_TEMPLATE, 'r') as jsonfile:
+            data = json.load(jsonfile)
+        replacements = {
+            "EXP_NAME": row["container_name"] + '|' + row["k8_object_name"] + '|' + row["k8_object_type"] + '|' + row["namespace"] + '|' + row["cluster_name"],
+            "CLUSTER_NAME": row["cluster_name"],
+            "k8Object_TYPE": row["k8_object_type"],
+            "k8Object_NAME": row["k8_object_name"],
+            "k8ObjectNAMESPACE": row["namespace"],
+            "k8Object_CONTAINER_IMAGE": row["image_name"],
+            "k8Object_CONTAINER_NAME": row["container_name"]
+            }
+
+    for key, value in replacements.items():
+        for obj in data:
+            json_str = json.dumps(obj)
+            json_str = json_str.replace(key, value)
+            obj.update(json.loads(json_str))
+    return data
+
+
+def timed(func, rows, exp_type):
+    start = time.perf_counter()
+    experiments = [func(dict(row), exp_type) for row in rows]
+    return experiments, time.perf_counter() - start
+
+
+def main(argv):
+    num_experiments = 10000
+    exp_type = None
+
+    try:
+        opts, args = getopt.getopt(argv, "h:n:t:")
+    except getopt.GetoptError:
+        print("bench_experiment_template.py -n <no. of experiments> -t <experiment type>")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print("bench_experiment_template.py -n <no. of experiments> -t <experiment type>")
+            sys.exit()
+        elif opt == '-n':
+            num_experiments = int(arg)
+        elif opt == '-t':
+            exp_type = arg
+
+    rows = list(synthetic_rows(num_experiments))
+    experiments, template_time = timed(experiment_json, rows, exp_type)
+    reference, reference_time = timed(experiment_json_reference, rows, exp_type)
+    if experiments != reference:
+        print("experiment_json differs from the reference rendering")
+        sys.exit(1)
+
+    print("experiments          : " + str(num_experiments))
+    print("reference            : %.3f s (%d experiments/s)" % (reference_time, num_experiments / reference_time))
+    print("precompiled template : %.3f s (%d experiments/s)" % (template_time, num_experiments / template_time))
+    print("speedup              : %.1fx" % (reference_time / template_time))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,179 @@
+"""
+Copyright (c) 2023, 2023 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+import sys, getopt
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recommendations_demo import recommendation_validation
+
+# Description: Parity check and benchmark of the listExperiments flattening of recommendation_validation.
+# The listExperiments json of an experiment is rebuilt from the checked-in metrics and box plots csvs of the
+# validate directories, flattened again, and the csvs written are compared with the checked-in ones.
+# Run it from the recommendations_infra_demo directory, the default paths are relative to it.
+
+# (experiment type, directory with the recommendations/ and boxplots/ csvs)
+DEFAULT_VALIDATE_DIRS = [("container", "recommendations_demo/validateResults"),
+                         ("namespace", "recommendations_demo/validateNamespaceResults")]
+
+IDENTITY_COLUMNS = ['cluster_name', 'experiment_name', 'namespace', 'type', 'name', 'container_name', 'timezone']
+ENGINES = ['cost', 'performance']
+
+
+# Cells are read back as the json numbers str() wrote them from, anything else stays a string
+def json_value(cell):
+    try:
+        return json.loads(cell)
+    except ValueError:
+        return cell
+
+
+# The results and recommendations of a time zone, from a row of the experimentMetrics_sorted csv
+def timezone_data(row):
+    metrics, terms = {}, {}
+    for column, cell in row.items():
+        if column in IDENTITY_COLUMNS or cell == "":
+            continue
+        parts = column.split('_')
+        if parts[0] not in ENGINES:
+            metric, aggregation = column.split('_', 1)
+            metrics.setdefault(metric, {"aggregation_info": {}})["aggregation_info"][aggregation] = json_value(cell)
+            continue
+        engine, term, resource, config = parts[0], parts[1] + '_' + parts[2], parts[3], parts[4]
+        engine_data = terms.setdefault(term, {"recommendation_engines": {}})["recommendation_engines"].setdefault(engine, {})
+        if resource == "accelerator":
+            engine_data.setdefault("config", {}).setdefault(config, {})[cell] = {"amount": 1.0, "format": "cores"}
+        elif parts[5:] == ["variation"]:
+            engine_data.setdefault("variation", {}).setdefault(config, {})[resource] = {"amount": json_value(cell)}
+        elif parts[5:] == ["format"]:
+            engine_data.setdefault("config", {}).setdefault(config, {}).setdefault(resource, {})["format"] = cell
+        else:
+            engine_data.setdefault("config", {}).setdefault(config, {}).setdefault(resource, {})["amount"] = json_value(cell)
+    return metrics, terms
+
+
+# The box plots of the terms of a time zone, from a row of the experimentPlotData_sorted csv. Kruize numbers the
+# datapoints without usage data too, they are kept as empty plots so that the next ones keep their number.
+def timezone_plots(row):
+    terms = {}
+    for term, prefix, datapoints in recommendation_validation.PLOT_TERMS:
+        plots_data = {}
+        for datapoint in range(1, datapoints + 1):
+            plot_timezone = row.get(term + '_tz' + str(datapoint), "")
+            if plot_timezone == "":
+                plots_data["no_data_" + str(datapoint)] = {}
+                continue
+            plots_data[plot_timezone] = {usage: {stat: json_value(row[prefix + '_tz' + str(datapoint) + '_' + resource + '_' + stat])
+                                                 for stat in recommendation_validation.PLOT_STATS}
+                                         for usage, resource in recommendation_validation.PLOT_RESOURCES.items()}
+        if any(plots_data.values()):
+            terms[term] = {"plots": {"datapoints": len(plots_data), "plots_data": plots_data}}
+    return terms
+
+
+# Rebuilds the listExperiments json of the single container (or namespace) of the checked-in csvs
+def experiment_json(metrics, boxplots, experiment_type):
+    unit = {"results": {}, "recommendations": {"data": {}}}
+    recommendations = unit["recommendations"]["data"]
+    for row in metrics.to_dict('records'):
+        metric_data, terms = timezone_data(row)
+        unit["results"][row["timezone"]] = {"metrics": metric_data}
+        if terms:
+            recommendations[row["timezone"]] = {"recommendation_terms": terms}
+    for row in boxplots.to_dict('records'):
+        terms = recommendations.setdefault(row["timezone"], {"recommendation_terms": {}})["recommendation_terms"]
+        for term, term_data in timezone_plots(row).items():
+            terms.setdefault(term, {}).update(term_data)
+
+    first = boxplots.iloc[0]
+    if experiment_type == "namespace":
+        unit["namespace"] = first["namespace"]
+        kobj = {"namespace": first["namespace"], "namespaces": {first["namespace"]: unit}}
+    else:
+        unit["container_name"] = first["container_name"]
+        kobj = {"type": first["type"], "name": first["name"], "namespace": first["namespace"],
+                "containers": {first["container_name"]: unit}}
+    return [{"experiment_name": first["experiment_name"], "cluster_name": first["cluster_name"], "kubernetes_objects": [kobj]}]
+
+
+def check(experiment_type, validate_dir, csvfile):
+    metrics_csv = os.path.join(validate_dir, "recommendations", csvfile)
+    boxplots_csv = os.path.join(validate_dir, "boxplots", csvfile)
+    metrics = pd.read_csv(metrics_csv, dtype=str, keep_default_na=False)
+    boxplots = pd.read_csv(boxplots_csv, dtype=str, keep_default_na=False)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, "experiments.json"), "w") as f:
+            json.dump(experiment_json(metrics, boxplots, experiment_type), f)
+        os.chdir(workdir)
+        try:
+            start = time.perf_counter()
+            if experiment_type == "namespace":
+                recommendation_validation.getNamespaceExperimentMetrics("experiments.json")
+            else:
+                recommendation_validation.getExperimentMetrics("experiments.json")
+            recommendation_validation.getExperimentBoxPlots("experiments.json", experiment_type)
+            elapsed = time.perf_counter() - start
+            actual = [pd.read_csv("experimentMetrics_sorted.csv"), pd.read_csv("experimentPlotData_sorted.csv")]
+        finally:
+            os.chdir(cwd)
+
+    matched = True
+    for expected_csv, actual_df in zip([metrics_csv, boxplots_csv], actual):
+        expected_df = pd.read_csv(expected_csv)
+        differences = recommendation_validation.compare_frames(expected_df, actual_df)
+        if list(expected_df.columns) != list(actual_df.columns) or not differences.empty:
+            print(f"The flattened csv differs from {expected_csv}:")
+            print(differences.head(recommendation_validation.MAX_PRINTED_DIFFERENCES).to_string(index=False))
+            matched = False
+    if matched:
+        print("%-70s %6d rows %8.3f s" % (os.path.join(validate_dir, "*", csvfile), len(metrics), elapsed))
+    return matched
+
+
+def main(argv):
+    experiment_type = "container"
+    validate_dir = None
+
+    try:
+        opts, args = getopt.getopt(argv, "ht:d:")
+    except getopt.GetoptError:
+        print("bench_flatten_experiments.py [-t <experiment type> -d <validate directory>]")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print("bench_flatten_experiments.py [-t <experiment type> -d <validate directory>]")
+            sys.exit()
+        elif opt == '-t':
+            experiment_type = arg
+        elif opt == '-d':
+            validate_dir = arg
+
+    validate_dirs = DEFAULT_VALIDATE_DIRS if validate_dir is None else [(experiment_type, validate_dir)]
+
+    results = [check(experiment_type, validate_dir, csvfile) for experiment_type, validate_dir in validate_dirs
+               for csvfile in sorted(os.listdir(os.path.join(validate_dir, "recommendations")))]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
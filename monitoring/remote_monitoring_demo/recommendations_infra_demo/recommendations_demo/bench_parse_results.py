@@ -0,0 +1,132 @@
+"""
+Copyright (c) 2023, 2023 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import random
+import sys, getopt
+import time
+
+from metrics_promql import metric_names, parse_results
+
+# Description: Benchmark of metrics_promql.parse_results on synthetic prometheus result sets.
+# The nested-loop join parse_results used before it was indexed is kept here as a reference,
+# its output is compared with parse_results for the sizes it is run on.
+
+def synthetic_results(num_series, containers_per_pod=1, seed=0):
+    rng = random.Random(seed)
+    owners, workloads = [], []
+    metrics = {name: [] for name in metric_names}
+    for i in range(num_series):
+        pod_no, container_no = divmod(i, containers_per_pod)
+        namespace = f"namespace-{pod_no % 50}"
+        workload = f"workload-{pod_no // 3}"
+        pod = f"{workload}-pod-{pod_no}"
+        container = f"container-{container_no}"
+        container_id = f"cri-o://{i:064x}"
+        labels = {"container": container, "pod": pod, "namespace": namespace, "container_id": container_id,
+                  "image": f"quay.io/example/{container}:latest"}
+        owners.append({"metric": dict(labels, owner_kind="ReplicaSet", owner_name=f"{workload}-rs"),
+                       "value": [0, "1"]})
+        workloads.append({"metric": dict(labels, workload=workload, workload_type="deployment"),
+                          "value": [0, "1"]})
+        for name in metric_names:
+            metrics[name].append({"metric": {"container": container, "pod": pod, "namespace": namespace,
+                                             "node": f"node-{pod_no % 20}"},
+                                  "value": [0, str(rng.random())]})
+    # Prometheus does not return the series of each vector in the same order
+    for name in metric_names:
+        rng.shuffle(metrics[name])
+    rng.shuffle(workloads)
+
+    results_map = {"image_owners": owners, "image_workloads": workloads}
+    results_map.update(metrics)
+    return results_map
+
+
+def parse_results_nested(results_map):
+    imageowners = results_map["image_owners"]
+    imageworkloads = results_map["image_workloads"]
+    result_map_values = [None] * len(metric_names)
+    rows = []
+    result_map_node = ""
+
+    for data in imageowners:
+        for workloaddata in imageworkloads:
+            if data["metric"]["container_id"] == workloaddata["metric"]["container_id"]:
+                for i, result_map in enumerate(metric_names):
+                    for result in results_map[result_map]:
+                        if result["metric"]["pod"] == data["metric"]["pod"]:
+                            result_map_values[i] = result["value"][1]
+                            result_map_node = result["metric"]["node"]
+
+                row = {'container_name': data["metric"]["container"],
+                       'image_name': data["metric"]["image"],
+                       'pod': data["metric"]["pod"],
+                       'owner_name': data["metric"]["owner_name"],
+                       'owner_kind': data["metric"]["owner_kind"],
+                       'workload': workloaddata["metric"]["workload"],
+                       'workload_type': workloaddata["metric"]["workload_type"],
+                       'namespace': data["metric"]["namespace"],
+                       'node': result_map_node}
+                row.update(zip(metric_names, result_map_values))
+                rows.append(row)
+
+    return rows
+
+
+def timed(func, results_map):
+    start = time.perf_counter()
+    rows = func(results_map)
+    return rows, time.perf_counter() - start
+
+
+def main(argv):
+    sizes = [1000, 10000, 50000]
+    reference_max = 1000
+
+    try:
+        opts, args = getopt.getopt(argv, "h:s:r:")
+    except getopt.GetoptError:
+        print("bench_parse_results.py -s <comma separated no. of series> -r <max no. of series for the nested-loop reference>")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print("bench_parse_results.py -s <comma separated no. of series> -r <max no. of series for the nested-loop reference>")
+            sys.exit()
+        elif opt == '-s':
+            sizes = [int(size) for size in arg.split(",")]
+        elif opt == '-r':
+            reference_max = int(arg)
+
+    print("%10s %12s %12s" % ("series", "indexed (s)", "nested (s)"))
+    for size in sizes:
+        results_map = synthetic_results(size)
+        rows, indexed_time = timed(parse_results, results_map)
+        if len(rows) != size:
+            print(f"parse_results returned {len(rows)} rows for {size} series")
+            sys.exit(1)
+
+        nested_time = "-"
+        if size <= reference_max:
+            reference_rows, elapsed = timed(parse_results_nested, results_map)
+            if reference_rows != rows:
+                print(f"parse_results differs from the nested-loop join for {size} series")
+                sys.exit(1)
+            nested_time = "%.3f" % elapsed
+        print("%10d %12.3f %12s" % (size, indexed_time, nested_time))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
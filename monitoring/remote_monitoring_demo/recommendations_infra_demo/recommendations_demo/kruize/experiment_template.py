@@ -0,0 +1,77 @@
+"""
+Copyright (c) 2022, 2022 Red Hat, IBM Corporation and others.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+
+
+# Yields the path and the value of every string in a json, dict keys are not included
+def _string_fields(data, path=()):
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        if isinstance(data, str):
+            yield path, data
+        return
+    for key, value in items:
+        yield from _string_fields(value, path + (key,))
+
+
+# Copies the dicts and lists of a json, the other values are immutable and shared
+def _copy(data):
+    if isinstance(data, dict):
+        return {key: _copy(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_copy(value) for value in data]
+    return data
+
+
+class ExperimentTemplate:
+    """Experiment json template with placeholders in its string values.
+
+    The template is parsed once and the paths of the strings holding a
+    placeholder are found up front. render() then copies the template and
+    assigns those strings with the placeholders replaced, in the order of the
+    given replacements, instead of replacing them in the serialized json.
+    """
+
+    def __init__(self, template, placeholders):
+        if isinstance(template, (list, dict)):
+            self.template = _copy(template)
+        else:
+            with open(template, "r") as template_file:
+                self.template = json.load(template_file)
+        placeholders = list(placeholders)
+        # Path, template string and the placeholders it holds, for each string to render
+        self.fields = []
+        for path, value in _string_fields(self.template):
+            found = [placeholder for placeholder in placeholders if placeholder in value]
+            if found:
+                self.fields.append((path, value, found))
+
+    # Returns a new experiment json with the placeholders replaced, as a placeholder => value dict
+    def render(self, replacements):
+        data = _copy(self.template)
+        for path, value, found in self.fields:
+            for placeholder, replacement in replacements.items():
+                if placeholder in found:
+                    value = value.replace(placeholder, replacement)
+            parent = data
+            for key in path[:-1]:
+                parent = parent[key]
+            parent[path[-1]] = value
+        return data
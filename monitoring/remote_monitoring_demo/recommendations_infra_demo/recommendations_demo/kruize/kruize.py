@@ -14,17 +14,84 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from . json_validate import validate_exp_input_json
+from . json_validate import validate_exp_input_json, validate_result_input_json
 import subprocess
 import requests
 import json
 import os
 import time
 import shutil
+import threading
+from requests.adapters import HTTPAdapter
+
+# Connection pool settings for the shared Kruize session
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+# Size of the chunks in which large response bodies are written to a file
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# (connect, read) timeouts in seconds, per Kruize endpoint
+DEFAULT_TIMEOUT = (10, 60)
+ENDPOINT_TIMEOUTS = {
+    "/createExperiment": (10, 60),
+    "/createPerformanceProfile": (10, 60),
+    "/updateResults": (10, 120),
+    "/updateRecommendations": (10, 300),
+    "/listRecommendations": (10, 120),
+    "/listExperiments": (10, 300),
+    "/listClusters": (10, 60),
+    "/summarize": (10, 300),
+}
+
+
+class KruizeClient:
+    """Pooled, keep-alive HTTP session for the Kruize REST API.
+
+    All the API helpers in this module go through a single instance so that
+    repeated calls reuse TCP connections instead of opening one per request.
+    """
+
+    def __init__(self, base_url="", pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, timeouts=None):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        self.configure(pool_connections, pool_maxsize, timeouts)
+
+    def configure(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, timeouts=None):
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+    def url(self, endpoint):
+        return self.base_url + endpoint
+
+    def timeout(self, endpoint):
+        return self.timeouts.get(endpoint.split("?")[0], DEFAULT_TIMEOUT)
+
+    def request(self, method, endpoint, **kwargs):
+        kwargs.setdefault("timeout", self.timeout(endpoint))
+        return self.session.request(method, self.url(endpoint), **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def delete(self, endpoint, **kwargs):
+        return self.request("DELETE", endpoint, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+kruize_client = KruizeClient()
 
 
 def form_kruize_url(cluster_type):
-    global URL
     if (cluster_type == "minikube"):
         port = subprocess.run(['kubectl -n monitoring get svc kruize --no-headers -o=custom-columns=PORT:.spec.ports[*].nodePort'], shell=True, stdout=subprocess.PIPE)
 
@@ -33,7 +100,7 @@ def form_kruize_url(cluster_type):
         ip = subprocess.run(['minikube ip'], shell=True, stdout=subprocess.PIPE)
         SERVER_IP=ip.stdout.decode('utf-8').strip('\n')
 
-        URL = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
+        kruize_client.base_url = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
 
     elif (cluster_type == "openshift"):
         #port = subprocess.run(['kubectl -n openshift-tuning get svc kruize --no-headers -o=custom-columns=PORT:.spec.ports[*].nodePort'], shell=True, stdout=subprocess.PIPE)
@@ -46,19 +113,26 @@ def form_kruize_url(cluster_type):
         #print("IP = ", SERVER_IP)
         port = subprocess.run(['oc expose svc/kruize -n openshift-tuning'], shell=True, stdout=subprocess.PIPE)
         kruize_URL = subprocess.run(['oc status -n openshift-tuning | grep "svc/kruize[^-]" | cut -d " " -f1'], shell=True, stdout=subprocess.PIPE)
-        URL = kruize_URL.stdout.decode('utf-8').strip('\n')
+        kruize_client.base_url = kruize_URL.stdout.decode('utf-8').strip('\n')
 
 #    URL = "http://" + str(SERVER_IP) + ":" + str(AUTOTUNE_PORT)
-    print ("\nKRUIZE AUTOTUNE URL = ", URL)
-    return URL
+    print ("\nKRUIZE AUTOTUNE URL = ", kruize_client.base_url)
+    return kruize_client.base_url
+
+
+# Description: Returns the json as is if it is already loaded, else reads it from the file
+# Input Parameters: json file or json object
+def load_json(json_input):
+    if isinstance(json_input, (list, dict)):
+        return json_input
+    with open(json_input, "r") as json_file:
+        return json.load(json_file)
 
 
 # Description: This function validates the input json and posts the experiment using createExperiment API to Kruize
-# Input Parameters: experiment input json
+# Input Parameters: experiment input json file or the experiment json itself
 def create_experiment(input_json_file):
-
-    json_file = open(input_json_file, "r")
-    input_json = json.loads(json_file.read())
+    input_json = load_json(input_json_file)
     print("\n************************************************************")
     print(input_json)
     print("\n************************************************************")
@@ -72,22 +146,26 @@ def create_experiment(input_json_file):
         exit(1)
     else:
         print("\nCreating the experiment...")
-        url = URL + "/createExperiment"
-        response = requests.post(url, json=input_json)
+        url = kruize_client.url("/createExperiment")
+        response = kruize_client.post("/createExperiment", json=input_json)
         print("URL = ", url, "   Response status code = ", response.status_code)
+        return response
 
 # Description: This function validates the result json and posts the experiment results using updateResults API to Kruize
-# Input Parameters: resource usage metrics json
+# Input Parameters: resource usage metrics json file or the results json itself
 def update_results(result_json_file):
-    # read the json
-    json_file = open(result_json_file, "r")
-    result_json = json.loads(json_file.read())
-    
-    # TO DO: Validate the result json
+    result_json = load_json(result_json_file)
+
+    # Validate the json, the results are not posted if it is invalid
+    isInvalid = validate_result_input_json(result_json)
+    if isInvalid:
+        print(isInvalid)
+        print("Result Json is invalid")
+        return None
 
     print("\nUpdating the results...")
-    url = URL + "/updateResults"
-    response = requests.post(url, json=result_json)
+    url = kruize_client.url("/updateResults")
+    response = kruize_client.post("/updateResults", json=result_json)
     print("URL = ", url, "  Response status code = ", response.status_code)
     #print(response.text)
     return response
@@ -96,13 +174,13 @@ def update_results(result_json_file):
 # Input Parameters: experiment_name , interval_end time
 def update_recommendations(experiment_name, end_time=None):
     print("\nUpdating the Recommendations...")
-    url = URL + "/updateRecommendations"
+    url = kruize_client.url("/updateRecommendations")
     if end_time is not None:
         PARAMS = {'experiment_name':experiment_name,'interval_end_time':end_time}
     else:
         PARAMS = {'experiment_name':experiment_name}
 
-    response = requests.post(url, params = PARAMS )
+    response = kruize_client.post("/updateRecommendations", params = PARAMS )
     print("URL = ", url, "  Response status code = ", response.status_code)
     #print(response.text)
     return response
@@ -111,11 +189,12 @@ def update_recommendations(experiment_name, end_time=None):
 # Input Parameters: experiment name
 def list_recommendations(experiment_name,rm=False):
     print("\nListing the recommendations...")
-    url = URL + "/listRecommendations"
+    endpoint = "/listRecommendations"
     if rm:
-        url += "?rm=true"
+        endpoint += "?rm=true"
+    url = kruize_client.url(endpoint)
     PARAMS = {'experiment_name': experiment_name}
-    response = requests.get(url = url, params = PARAMS)
+    response = kruize_client.get(endpoint, params = PARAMS)
     print("URL = ", url, "  Response status code = ", response.status_code)
     return response.json()
 
@@ -126,58 +205,141 @@ def create_performance_profile(perf_profile_json_file):
     perf_profile_json = json.loads(json_file.read())
 
     print("\nCreating performance profile...")
-    url = URL + "/createPerformanceProfile"
-    response = requests.post(url, json=perf_profile_json)
+    url = kruize_client.url("/createPerformanceProfile")
+    response = kruize_client.post("/createPerformanceProfile", json=perf_profile_json)
     print("URL = ", url , "   Response status code = ", response.status_code)
     #print(response.text)
     return response
 
 def list_experiments(rm=False):
     print("\nListing the experiments...")
-    url = URL + "/listExperiments"
+    endpoint = "/listExperiments"
     if rm:
-        url += "?rm=true"
+        endpoint += "?rm=true"
+    url = kruize_client.url(endpoint)
 
-    response = requests.get(url = url)
+    response = kruize_client.get(endpoint)
     print("URL = ", url, "   Response status code = ", response.status_code)
 
     return response.json()
 
+
+class ExperimentCache:
+    """Names of the experiments that exist in Kruize.
+
+    Seeded from listExperiments the first time it is looked up, then kept
+    current by create_experiment_once and delete_experiment, so that an
+    experiment is created at most once per run. clear() drops the names and
+    makes the next lookup seed the cache again.
+    """
+
+    def __init__(self):
+        self.names = None
+        self._lock = threading.Lock()
+
+    def _seed(self):
+        if self.names is None:
+            experiments = list_experiments(rm=True)
+            if not isinstance(experiments, list):
+                experiments = []
+            self.names = {exp.get('experiment_name') for exp in experiments if exp.get('experiment_name')}
+
+    def exists(self, experiment_name):
+        with self._lock:
+            self._seed()
+            return experiment_name in self.names
+
+    def add(self, experiment_name):
+        with self._lock:
+            self._seed()
+            self.names.add(experiment_name)
+
+    def discard(self, experiment_name):
+        with self._lock:
+            if self.names is not None:
+                self.names.discard(experiment_name)
+
+    def clear(self):
+        with self._lock:
+            self.names = None
+
+
+experiment_cache = ExperimentCache()
+
+
+# Description: Creates the experiment using createExperiment API, unless it already exists in Kruize
+# Input Parameters: experiment input json file or the experiment json itself
+# Returns the response, None if the experiment was not created as it exists
+def create_experiment_once(input_json_file):
+    input_json = load_json(input_json_file)
+    experiment_name = input_json[0]['experiment_name']
+    if experiment_cache.exists(experiment_name):
+        print("\nExperiment ", experiment_name, " exists, skipping createExperiment")
+        return None
+
+    response = create_experiment(input_json)
+    # 409 is returned if the experiment was created after the cache was seeded
+    if response is not None and (response.status_code < 300 or response.status_code == 409):
+        experiment_cache.add(experiment_name)
+    return response
+
+
+# Description: Deletes the experiment using createExperiment API and drops it from the experiment cache
+# Input Parameters: experiment name
+def delete_experiment(experiment_name):
+    print("\nDeleting the experiment...")
+    url = kruize_client.url("/createExperiment")
+    response = kruize_client.delete("/createExperiment", json=[{"experiment_name": experiment_name}])
+    print("URL = ", url, "   Response status code = ", response.status_code)
+    if response.status_code < 300:
+        experiment_cache.discard(experiment_name)
+    return response
+
 # Description: This function obtains the result metrics and recommendations from Kruize using listExperiments API for an experiment.
-def list_metrics_with_recommendations(experiment_name):
+# Input Parameters: experiment name, file to stream the response body to instead of returning it parsed, the
+# response holds every interval of the experiment so it is written in chunks without being held in memory
+def list_metrics_with_recommendations(experiment_name, output_file=None):
     print("\nListing the experiments with metrics and recommendations...")
-    url = URL + "/listExperiments"
+    url = kruize_client.url("/listExperiments")
     PARAMS = {'results':'true','recommendations':'true','latest':'false','experiment_name':experiment_name, 'rm':'true'}
-    response = requests.get(url = url, params = PARAMS)
-    print("URL = ", url, "   Response status code = ", response.status_code)
-    return response.json()
+    if output_file is None:
+        response = kruize_client.get("/listExperiments", params = PARAMS)
+        print("URL = ", url, "   Response status code = ", response.status_code)
+        return response.json()
+
+    with kruize_client.get("/listExperiments", params = PARAMS, stream=True) as response:
+        print("URL = ", url, "   Response status code = ", response.status_code)
+        with open(output_file, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                f.write(chunk)
+    return response
 
 def list_clusters():
     print("\nListing the clusters...")
-    url = URL + "/listClusters"
-    response = requests.get(url = url)
+    url = kruize_client.url("/listClusters")
+    response = kruize_client.get("/listClusters")
     print("URL = ", url,"   Response status code = ", response.status_code)
     return response.json()
 
 def summarize_cluster_data(cluster_name=None,namespace_name=None):
     print("\nSummarizing the cluster data...")
     PARAMS = {'summarize_type':'cluster'}
-    url = URL + "/summarize"
+    url = kruize_client.url("/summarize")
     if cluster_name is not None and namespace_name is None:
         PARAMS = {'summarize_type':'cluster', 'cluster_name':cluster_name}
     elif cluster_name is not None and namespace_name is not None:
         PARAMS = {'summarize_type':'namespace','cluster_name':cluster_name, 'namespace_name':namespace_name}
-    response = requests.get(url = url, params = PARAMS)
+    response = kruize_client.get("/summarize", params = PARAMS)
     print("URL = ", url,  "PARAMS = ",PARAMS ,"   Response status code = ", response.status_code)
     return response.json()
 
 def summarize_namespace_data(namespace_name=None):
     print("\nSummarizing the namespace data...")
-    url = URL + "/summarize"
+    url = kruize_client.url("/summarize")
     PARAMS = {'summarize_type':'namespace'}
     if namespace_name is not None:
         PARAMS = {'summarize_type':'namespace','namespace_name':namespace_name}
-    response = requests.get(url = url, params = PARAMS)
+    response = kruize_client.get("/summarize", params = PARAMS)
     print("URL = ", url,  "PARAMS = ",PARAMS ,"   Response status code = ", response.status_code)
     return response.json()
 
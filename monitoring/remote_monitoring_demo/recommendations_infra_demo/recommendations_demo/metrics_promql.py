@@ -18,13 +18,32 @@ import requests
 import csv
 import sched
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import os
 import subprocess
 import sys, getopt
+from requests.adapters import HTTPAdapter
+
+# No. of prometheus queries run at the same time
+QUERY_PARALLELISM = 8
+# (connect, read) timeout in seconds of a single query
+QUERY_TIMEOUT = (10, 120)
+# No. of times a query is retried on a connection error, timeout or 429/5xx
+QUERY_RETRIES = 2
+# Seconds to wait before the first retry, doubled on every further retry
+RETRY_BACKOFF = 2
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Step of the backfill range queries, same as the [15m] window of the queries
+BACKFILL_STEP = timedelta(minutes=15)
+# Time range pulled with one set of range queries while backfilling
+BACKFILL_CHUNK = timedelta(hours=6)
 
 
 csv_headers = ['report_period_start','report_period_end','interval_start','interval_end','container_name','image_name','pod','owner_name','owner_kind','workload','workload_type','namespace','node','cpu_request_container_avg','cpu_request_container_sum','cpu_limit_container_avg','cpu_limit_container_sum','cpu_usage_container_avg','cpu_usage_container_min','cpu_usage_container_max','cpu_usage_container_sum','cpu_throttle_container_avg','cpu_throttle_container_max','cpu_throttle_container_sum','memory_request_container_avg','memory_request_container_sum','memory_limit_container_avg','memory_limit_container_sum','memory_usage_container_avg','memory_usage_container_min','memory_usage_container_max','memory_usage_container_sum','memory_rss_usage_container_avg','memory_rss_usage_container_min','memory_rss_usage_container_max','memory_rss_usage_container_sum']
 
+query_stats_headers = ['interval_end','query','status','attempts','latency_seconds','series']
+
 queries_map = {
 		"image_owners": "max_over_time(kube_pod_container_info{container!='', container!='POD', pod!='', namespace!='', namespace!~'kube-.*|openshift|openshift-.*'}[15m]) * on(pod) group_left(owner_kind, owner_name) max by(pod, owner_kind, owner_name) (max_over_time(kube_pod_owner{container!='', container!='POD', pod!='', namespace!='', namespace!~'kube-.*|openshift|openshift-.*'}[15m]))",
 		"image_workloads": "max_over_time(kube_pod_container_info{container!='', container!='POD', pod!='', namespace!='', namespace!~'kube-.*|openshift|openshift-.*'}[15m]) * on(pod) group_left(workload, workload_type) max by(pod, workload, workload_type) (max_over_time(namespace_workload_pod:kube_pod_owner:relabel{pod!='', namespace!='', namespace!~'kube-.*|openshift|openshift-.*'}[15m]))",
@@ -82,78 +101,190 @@ queries_map_all = {
 }
 
 
-def run_queries():
+prometheus_session = None
+
+
+# Shared keep-alive session to prometheus, with a connection per parallel query. The adapter is mounted once,
+# when the session is created.
+def get_prometheus_session(parallelism=QUERY_PARALLELISM):
+    global prometheus_session
+    if prometheus_session is None:
+        prometheus_session = requests.Session()
+        prometheus_session.verify = False
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=parallelism)
+        prometheus_session.mount("http://", adapter)
+        prometheus_session.mount("https://", adapter)
+    return prometheus_session
+
+
+# Returns the prometheus api url of the cluster and the headers to query it with
+def prometheus_api():
     TOKEN = 'TOKEN'
     prometheus_url = None
     if cluster_type == "openshift":
         output = subprocess.check_output(['oc', 'whoami', '--show-token'])
         TOKEN = output.decode().strip()
-        prometheus_url = f"https://thanos-querier-openshift-monitoring.apps.{server}/api/v1/query"
+        prometheus_url = f"https://thanos-querier-openshift-monitoring.apps.{server}/api/v1"
     elif cluster_type == "minikube":
-        prometheus_url = f"http://{server}:9090/api/v1/query"
+        prometheus_url = f"http://{server}:9090/api/v1"
     headers = {'Authorization': f'Bearer {TOKEN}'}
+    return prometheus_url, headers
 
-    results_map = {}
-    for key, query in queries_map.items():
-        response = requests.get(prometheus_url, headers=headers, params={'query': query}, verify=False)
+
+# Description: Runs a single prometheus query, retrying it with backoff on failures
+# Returns the result vector (None if the query failed) and the stats of the query
+def run_query(session, url, headers, params, timeout=QUERY_TIMEOUT, retries=QUERY_RETRIES):
+    start = time.perf_counter()
+    result = None
+    error = None
+    attempts = 0
+    while attempts <= retries:
+        if attempts > 0:
+            time.sleep(RETRY_BACKOFF * 2 ** (attempts - 1))
+        attempts += 1
+        try:
+            response = session.get(url, headers=headers, params=params, timeout=timeout)
+        except requests.RequestException as e:
+            error = str(e)
+            continue
         if response.status_code == 200:
-            results_map[key] = response.json()['data']['result']
+            try:
+                result = response.json()['data']['result']
+            except (ValueError, KeyError, TypeError) as e:
+                error = f"invalid response: {e!r}"
+            break
+        error = f"status code {response.status_code}"
+        if response.status_code not in RETRY_STATUS_CODES:
+            break
+
+    stats = {
+        'status': "ok" if result is not None else "failed",
+        'attempts': attempts,
+        'latency_seconds': round(time.perf_counter() - start, 3),
+        'series': len(result) if result is not None else 0
+    }
+    if result is None:
+        stats['error'] = error
+    return result, stats
+
+
+# Description: Runs all the queries in queries_map concurrently
+# Returns the results by query name and the stats of each query
+def run_queries(parallelism=QUERY_PARALLELISM, timeout=QUERY_TIMEOUT, retries=QUERY_RETRIES):
+    prometheus_url, headers = prometheus_api()
+    session = get_prometheus_session(parallelism)
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        futures = {key: executor.submit(run_query, session, prometheus_url + "/query", headers, {'query': query},
+                                        timeout, retries)
+                   for key, query in queries_map.items()}
+
+    results_map = {}
+    query_stats = []
+    for key, future in futures.items():
+        result, stats = future.result()
+        if result is None:
+            print(f"Failed to run query '{key}' after {stats['attempts']} attempts: {stats['error']}")
+        else:
+            results_map[key] = result
+        stats['query'] = key
+        query_stats.append(stats)
+    return results_map, query_stats
+
+# Description: Runs all the queries in queries_map over a time range concurrently
+# Returns the result matrices by query name and the stats of each query
+def run_range_queries(start, end, step=BACKFILL_STEP, parallelism=QUERY_PARALLELISM, timeout=QUERY_TIMEOUT,
+                      retries=QUERY_RETRIES):
+    prometheus_url, headers = prometheus_api()
+    session = get_prometheus_session(parallelism)
+    range_params = {'start': start.timestamp(), 'end': end.timestamp(), 'step': int(step.total_seconds())}
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        futures = {key: executor.submit(run_query, session, prometheus_url + "/query_range", headers,
+                                        dict(range_params, query=query), timeout, retries)
+                   for key, query in queries_map.items()}
+
+    results_map = {}
+    query_stats = []
+    for key, future in futures.items():
+        result, stats = future.result()
+        if result is None:
+            print(f"Failed to run range query '{key}' after {stats['attempts']} attempts: {stats['error']}")
         else:
-            print(f"Failed to run query '{query}' with status code {response.status_code}")
-    return results_map
+            results_map[key] = result
+        stats['query'] = key
+        query_stats.append(stats)
+    return results_map, query_stats
+
+
+# Description: Splits range query matrices into the instant query vectors of each step
+# Returns the results_map of each step, by the timestamp of the step
+def results_by_step(range_results_map):
+    steps = {}
+    for key, matrix in range_results_map.items():
+        for series in matrix:
+            for timestamp, value in series["values"]:
+                steps.setdefault(timestamp, {}).setdefault(key, []).append({"metric": series["metric"],
+                                                                            "value": [timestamp, value]})
+    return dict(sorted(steps.items()))
+
+
+# Metric columns of a csv row, filled from the query of the same name
+metric_names = csv_headers[13:]
 
+
+# Key of a container series, pod names are only unique within a namespace
+def series_key(metric):
+    return (metric.get("namespace"), metric.get("pod"), metric.get("container"))
+
+
+# Index a prometheus result vector by the key of each series
+def index_results(results, key=series_key):
+    index = {}
+    for result in results:
+        index[key(result["metric"])] = result
+    return index
+
+
+# Join the owner, workload and metric vectors of a tick into csv rows.
+# Each vector is indexed once, so the join is linear in the no. of series.
 def parse_results(results_map):
     imageowners = results_map["image_owners"]
-    imageworkloads = results_map["image_workloads"]
-    result_maps= ["cpu_request_container_avg", "cpu_request_container_sum", "cpu_limit_container_avg", "cpu_limit_container_sum", "cpu_usage_container_avg", "cpu_usage_container_min", "cpu_usage_container_max", "cpu_usage_container_sum", "cpu_throttle_container_avg", "cpu_throttle_container_max", "cpu_throttle_container_sum", "memory_request_container_avg", "memory_request_container_sum", "memory_limit_container_avg", "memory_limit_container_sum", "memory_usage_container_avg", "memory_usage_container_min", "memory_usage_container_max", "memory_usage_container_sum", "memory_rss_usage_container_avg", "memory_rss_usage_container_min", "memory_rss_usage_container_max", "memory_rss_usage_container_sum"]
-    result_map_values = [None] * len(result_maps)
+    workloads_by_container_id = {}
+    for workloaddata in results_map["image_workloads"]:
+        workloads_by_container_id.setdefault(workloaddata["metric"]["container_id"], []).append(workloaddata)
+    metric_indexes = {name: index_results(results_map.get(name, [])) for name in metric_names}
     rows = []
-    result_map_node = "" 
 
     for data in imageowners:
-        for workloaddata in imageworkloads:
-            if data["metric"]["container_id"] == workloaddata["metric"]["container_id"]:
-                for i, result_map in enumerate(result_maps):
-                    for result in results_map[result_map]:
-                        if result["metric"]["pod"] == data["metric"]["pod"]:
-                            result_map_values[i] = result["value"][1]
-                            result_map_node = result["metric"]["node"]
-                            
-                row = {'container_name': data["metric"]["container"], 
-                                   'image_name': data["metric"]["image"],
-                                    'pod': data["metric"]["pod"],
-                                    'owner_name': data["metric"]["owner_name"],
-                                    'owner_kind': data["metric"]["owner_kind"],
-                                    'workload': workloaddata["metric"]["workload"],
-                                    'workload_type': workloaddata["metric"]["workload_type"],
-                                    'namespace': data["metric"]["namespace"],
-                                    'node': result_map_node,
-                                    'cpu_request_container_avg': result_map_values[0],
-                                    'cpu_request_container_sum': result_map_values[1],
-                                    'cpu_limit_container_avg': result_map_values[2],
-                                    'cpu_limit_container_sum': result_map_values[3],
-                                    'cpu_usage_container_avg': result_map_values[4],
-                                    'cpu_usage_container_min': result_map_values[5],
-                                    'cpu_usage_container_max': result_map_values[6],
-                                    'cpu_usage_container_sum': result_map_values[7],
-                                    'cpu_throttle_container_avg': result_map_values[8],
-                                    'cpu_throttle_container_max': result_map_values[9],
-                                    'cpu_throttle_container_sum': result_map_values[10],
-                                    'memory_request_container_avg': result_map_values[11],
-                                    'memory_request_container_sum': result_map_values[12],
-                                    'memory_limit_container_avg': result_map_values[13],
-                                    'memory_limit_container_sum': result_map_values[14],
-                                    'memory_usage_container_avg': result_map_values[15],
-                                    'memory_usage_container_min': result_map_values[16],
-                                    'memory_usage_container_max': result_map_values[17],
-                                    'memory_usage_container_sum': result_map_values[18],
-                                    'memory_rss_usage_container_avg': result_map_values[19],
-                                    'memory_rss_usage_container_min': result_map_values[20],
-                                    'memory_rss_usage_container_max': result_map_values[21],
-                                    'memory_rss_usage_container_sum': result_map_values[22]
-                                    }            
-                rows.append(row)
-                            
+        workloads = workloads_by_container_id.get(data["metric"]["container_id"])
+        if not workloads:
+            continue
+
+        key = series_key(data["metric"])
+        result_map_values = {}
+        result_map_node = ""
+        for name in metric_names:
+            result = metric_indexes[name].get(key)
+            if result is None:
+                result_map_values[name] = None
+            else:
+                result_map_values[name] = result["value"][1]
+                result_map_node = result["metric"].get("node", result_map_node)
+
+        for workloaddata in workloads:
+            row = {'container_name': data["metric"]["container"],
+                   'image_name': data["metric"]["image"],
+                   'pod': data["metric"]["pod"],
+                   'owner_name': data["metric"]["owner_name"],
+                   'owner_kind': data["metric"]["owner_kind"],
+                   'workload': workloaddata["metric"]["workload"],
+                   'workload_type': workloaddata["metric"]["workload_type"],
+                   'namespace': data["metric"]["namespace"],
+                   'node': result_map_node}
+            row.update(result_map_values)
+            rows.append(row)
+
     return rows
 
 def write_header_to_csv():
@@ -162,12 +293,62 @@ def write_header_to_csv():
         writer.writeheader()
 
 
-def write_results_to_csv(rows):
+def write_query_stats_header_to_csv():
+    with open(queryStats, 'w') as f:
+        writer = csv.DictWriter(f, fieldnames=query_stats_headers)
+        writer.writeheader()
+
+
+def write_query_stats_to_csv(query_stats, interval_end):
+    with open(queryStats, 'a') as f:
+        writer = csv.DictWriter(f, fieldnames=query_stats_headers, extrasaction='ignore')
+        for stats in query_stats:
+            writer.writerow(dict(stats, interval_end=interval_end))
+
+
+def append_results_to_csv(rows):
     with open(clusterResults, 'a') as f:
         writer = csv.DictWriter(f, fieldnames=csv_headers)
         for row in rows:
             if row['cpu_usage_container_avg'] is not None:
                writer.writerow(row)
+
+
+# Incremental connector posting the rows of every tick to Kruize, set with --push
+kruize_ingest = None
+
+
+# Description: Sets up the incremental connector to Kruize. Creates the performance profile and
+# resumes the watermarks of the experiments from the checkpoint, if asked to.
+def setup_kruize_ingest(perf_profile_json_file, recommendation_cadence, checkpoint_file, resume):
+    global kruize_ingest
+    # The connector reuses the experiment and results conversion of the recommendations demo
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from recommendations_demo import recommendation_experiment
+    from recommendations_demo.kruize.checkpoint import DEFAULT_CHECKPOINT_FILE, IngestCheckpoint
+
+    recommendation_experiment.form_kruize_url(cluster_type)
+    recommendation_experiment.create_performance_profile(perf_profile_json_file)
+    checkpoint = None
+    if resume or checkpoint_file is not None:
+        checkpoint = IngestCheckpoint(checkpoint_file or DEFAULT_CHECKPOINT_FILE, resume)
+    kruize_ingest = recommendation_experiment.IncrementalIngest(
+        recommendation_cadence or recommendation_experiment.DEFAULT_RECOMMENDATION_CADENCE, checkpoint)
+
+
+# Post the new intervals of the rows to Kruize, when the connector is enabled
+def push_results(rows):
+    if kruize_ingest is None:
+        return
+    rows = [row for row in rows if row['cpu_usage_container_avg'] is not None]
+    try:
+        kruize_ingest.ingest_rows(rows, csv_headers)
+    except Exception as e:
+        print(f"Failed to push the results to Kruize: {e}")
+
+
+def write_results_to_csv(rows):
+    append_results_to_csv(rows)
     with open("intervalResults.csv", 'w') as f:
         writer = csv.DictWriter(f, fieldnames=csv_headers)
         writer.writeheader()
@@ -183,9 +364,18 @@ def job():
     time_15mins_ago_utc = now_utc - timedelta(minutes=15)
 
     # Format the time as an ISO 8601 string
-    timestamp_15mins_ago_utc = time_15mins_ago_utc.isoformat()
-    timestamp_utc = now_utc.isoformat()
-    results_map = run_queries()
+    timestamp_15mins_ago_utc = time_15mins_ago_utc.isoformat(timespec='microseconds')
+    timestamp_utc = now_utc.isoformat(timespec='microseconds')
+    results_map, query_stats = run_queries(parallelism, query_timeout, retries)
+
+    # Record the latency and no. of series of each query and log the slowest one
+    write_query_stats_to_csv(query_stats, timestamp_utc)
+    slowest = max(query_stats, key=lambda stats: stats['latency_seconds'])
+    print(f"{timestamp_utc}: ran {len(query_stats)} queries, slowest '{slowest['query']}' took {slowest['latency_seconds']}s")
+
+    if "image_owners" not in results_map or "image_workloads" not in results_map:
+        print("Skipping the interval as the owner and workload queries did not return results")
+        return
 
     # Parse results and store in rows
     rows = parse_results(results_map)
@@ -195,6 +385,45 @@ def job():
 
     # Write rows to CSV file
     write_results_to_csv(rows)
+    push_results(rows)
+
+
+# Description: Collects the csv rows of every 15 min interval between start and end from the
+# prometheus history, instead of waiting for the intervals to happen. The range is pulled a chunk
+# at a time with range queries and the rows of each chunk are appended to the csv before the next
+# chunk is pulled, so the memory used depends on the chunk size and not on the range.
+def backfill(start, end, step=BACKFILL_STEP, chunk=BACKFILL_CHUNK):
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + chunk - step, end)
+        range_results_map, query_stats = run_range_queries(chunk_start, chunk_end, step, parallelism,
+                                                           query_timeout, retries)
+        write_query_stats_to_csv(query_stats, chunk_end.isoformat())
+
+        chunk_rows = []
+        for timestamp, results_map in results_by_step(range_results_map).items():
+            if "image_owners" not in results_map or "image_workloads" not in results_map:
+                continue
+            interval_end = datetime.fromtimestamp(float(timestamp), timezone.utc).replace(tzinfo=None)
+            rows = parse_results(results_map)
+            for row in rows:
+                row['interval_end'] = interval_end.isoformat(timespec='microseconds')
+                row['interval_start'] = (interval_end - step).isoformat(timespec='microseconds')
+            append_results_to_csv(rows)
+            chunk_rows.extend(rows)
+        # Push the whole chunk at once so each experiment gets its intervals in as few calls as possible
+        push_results(chunk_rows)
+
+        print(f"Backfilled {chunk_start.isoformat()} to {chunk_end.isoformat()}: {len(chunk_rows)} rows")
+        chunk_start = chunk_end + step
+
+
+# Parse an ISO 8601 time, times without a timezone are in UTC
+def parse_time(time_str):
+    parsed = datetime.fromisoformat(time_str)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
 
 
 def main(argv):
@@ -202,10 +431,28 @@ def main(argv):
     global cluster_type
     global server
     global clusterResults
+    global queryStats
+    global parallelism
+    global query_timeout
+    global retries
+    queryStats = 'queryStats.csv'
+    parallelism = QUERY_PARALLELISM
+    query_timeout = QUERY_TIMEOUT
+    retries = QUERY_RETRIES
+    backfill_start = None
+    backfill_end = datetime.now(timezone.utc)
+    backfill_chunk = BACKFILL_CHUNK
+    push = False
+    perf_profile_json_file = "./recommendations_demo/json_files/resource_optimization_openshift.json"
+    recommendation_cadence = None
+    checkpoint_file = None
+    resume = False
     try:
-        opts, args = getopt.getopt(argv,"h:c:s:d:r:")
+        opts, args = getopt.getopt(argv,"h:c:s:d:r:", ["parallelism=", "query-timeout=", "retries=", "query-stats=",
+                                                      "start=", "end=", "chunk-hours=", "push", "perf-profile=",
+                                                      "recommendation-cadence=", "checkpoint=", "resume"])
     except getopt.GetoptError:
-        print("recommendation_experiment.py -c <cluster type> -s <server>")
+        print("recommendation_experiment.py -c <cluster type> -s <server> [--parallelism <no. of parallel queries>] [--query-timeout <seconds>] [--retries <no. of retries>] [--query-stats <query stats csv>] [--start <backfill start time> [--end <backfill end time>] [--chunk-hours <hours per set of range queries>]] [--push [--perf-profile <performance profile json>] [--recommendation-cadence <cadence>] [--checkpoint <watermarks file>] [--resume]]")
         sys.exit(2)
     for opt, arg in opts:
         if opt == '-h':
@@ -219,6 +466,30 @@ def main(argv):
             duration = arg
         elif opt == '-r':
             clusterResults = arg
+        elif opt == '--parallelism':
+            parallelism = int(arg)
+        elif opt == '--query-timeout':
+            query_timeout = (QUERY_TIMEOUT[0], float(arg))
+        elif opt == '--retries':
+            retries = int(arg)
+        elif opt == '--query-stats':
+            queryStats = arg
+        elif opt == '--start':
+            backfill_start = parse_time(arg)
+        elif opt == '--end':
+            backfill_end = parse_time(arg)
+        elif opt == '--chunk-hours':
+            backfill_chunk = timedelta(hours=float(arg))
+        elif opt == '--push':
+            push = True
+        elif opt == '--perf-profile':
+            perf_profile_json_file = arg
+        elif opt == '--recommendation-cadence':
+            recommendation_cadence = arg
+        elif opt == '--checkpoint':
+            checkpoint_file = arg
+        elif opt == '--resume':
+            resume = True
             
     # Default duration to 6 hours if not passed.
     if '-d' not in sys.argv:
@@ -228,6 +499,18 @@ def main(argv):
 
     # Create a csv with header
     write_header_to_csv()
+    write_query_stats_header_to_csv()
+
+    # Post the new intervals of every tick to Kruize
+    if push:
+        setup_kruize_ingest(perf_profile_json_file, recommendation_cadence, checkpoint_file, resume)
+
+    # Backfill the given time range from the prometheus history instead of monitoring
+    if backfill_start is not None:
+        backfill(backfill_start, backfill_end, chunk=max(backfill_chunk, BACKFILL_STEP))
+        if kruize_ingest is not None:
+            kruize_ingest.finish()
+        return
     
     # Create a scheduler object
     scheduler = sched.scheduler(time.time, time.sleep)
@@ -241,6 +524,9 @@ def main(argv):
         # Start the scheduler
         scheduler.run()
 
+    if kruize_ingest is not None:
+        kruize_ingest.finish()
+
 
 
 if __name__ == '__main__':
@@ -15,17 +15,25 @@ limitations under the License.
 """
 
 import sys, getopt
+import asyncio
+import collections
 import json
 import os
 import time
 import csv
+import functools
+import io
 import itertools
+import tempfile
 import pandas as pd
-import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from recommendations_demo.kruize.kruize import *
+from recommendations_demo.kruize.kruize_async import AsyncKruizeClient, DEFAULT_CONCURRENCY
+from recommendations_demo.kruize.checkpoint import DEFAULT_CHECKPOINT_FILE, IngestCheckpoint
+from recommendations_demo.kruize.experiment_template import ExperimentTemplate
 from recommendations_demo import recommendation_validation
 
 def match_experiments(listexperimentsjson,inputcsv):
@@ -81,153 +89,503 @@ def match_experiments(listexperimentsjson,inputcsv):
             if experiments == counter:
                print("The experiment is not matching with any existing ones.")
 
-def create_expjson(filename, exp_type=None):
+# Fills in the experiment columns missing in a results row
+def fill_experiment_columns(row, exp_type=None):
+    ## Hardcoding for tfb-results and demo benchmark. Updating them only if these columns are not available.
+    ## Keep this until the metrics queries are fixed in benchmark to get the below column data
     if exp_type == "namespace":
-        with open("./recommendations_demo/json_files/create_namespace_exp_template.json", 'r') as jsonfile:
-            data = json.load(jsonfile)
+        columns_tocheck = [ "namespace" , "cluster_name" ]
     else:
-        with open("./recommendations_demo/json_files/create_exp_template.json", 'r') as jsonfile:
-            data = json.load(jsonfile)
+        columns_tocheck = [ "image_name" , "container_name" , "k8_object_type" , "k8_object_name" , "namespace" , "cluster_name" ]
+    image_name = "kruize/tfb-qrh:2.9.1.F"
+    container_name = "tfb-server"
+    k8_object_type = "deployment"
+    k8_object_name = "tfb-qrh-sample-0"
+    namespace = "tfb-perf"
+    cluster_name = "e23-alias"
 
+    for col in columns_tocheck:
+        if col not in row:
+            if col == "image_name":
+                row[col] = image_name
+            elif col == "container_name":
+                row[col] = container_name
+            elif col == "k8_object_type":
+                row[col] = k8_object_type
+            elif col == "k8_object_name":
+                row[col] = k8_object_name
+            elif col == "namespace":
+                row[col] = namespace
+            elif col == "cluster_name":
+                row[col] = cluster_name
+    return row
+
+# Name of the experiment a results row belongs to, as set in its experiment json
+def experiment_name_of(row, exp_type=None):
+    row = fill_experiment_columns(dict(row), exp_type)
+    if exp_type == "namespace":
+        return row["cluster_name"] + '|' + row["namespace"]
+    return row["container_name"] + '|' + row["k8_object_name"] + '|' + row["k8_object_type"] + '|' + row["namespace"] + '|' + row["cluster_name"]
+
+EXP_TEMPLATE = "./recommendations_demo/json_files/create_exp_template.json"
+NAMESPACE_EXP_TEMPLATE = "./recommendations_demo/json_files/create_namespace_exp_template.json"
+EXP_PLACEHOLDERS = ["EXP_NAME", "CLUSTER_NAME", "k8Object_TYPE", "k8Object_NAME", "k8ObjectNAMESPACE",
+                    "k8Object_CONTAINER_IMAGE", "k8Object_CONTAINER_NAME"]
+NAMESPACE_EXP_PLACEHOLDERS = ["EXP_NAME", "CLUSTER_NAME", "k8Object_NAMESPACE_NAME"]
+
+# Experiment template of the experiment type, loaded once per process
+@functools.lru_cache(maxsize=None)
+def experiment_template(exp_type=None):
+    if exp_type == "namespace":
+        return ExperimentTemplate(NAMESPACE_EXP_TEMPLATE, NAMESPACE_EXP_PLACEHOLDERS)
+    return ExperimentTemplate(EXP_TEMPLATE, EXP_PLACEHOLDERS)
+
+# Creates the experiment json from the template for a results row
+def experiment_json(row, exp_type=None):
+    fill_experiment_columns(row, exp_type)
+    if exp_type == "namespace":
+        replacements = {
+            "EXP_NAME": experiment_name_of(row, exp_type),
+            "CLUSTER_NAME": row["cluster_name"],
+            "k8Object_NAMESPACE_NAME": row["namespace"],
+            }
+    else:
+        replacements = {
+            "EXP_NAME": experiment_name_of(row, exp_type),
+            "CLUSTER_NAME": row["cluster_name"],
+            "k8Object_TYPE": row["k8_object_type"],
+            "k8Object_NAME": row["k8_object_name"],
+            "k8ObjectNAMESPACE": row["namespace"],
+            "k8Object_CONTAINER_IMAGE": row["image_name"],
+            "k8Object_CONTAINER_NAME": row["container_name"]
+            }
+
+    return experiment_template(exp_type).render(replacements)
+
+def create_expjson(filename, exp_type=None, outputfile="./recommendations_demo/json_files/create_exp.json"):
     with open(filename, 'r') as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
-            ## Hardcoding for tfb-results and demo benchmark. Updating them only if these columns are not available.
-            ## Keep this until the metrics queries are fixed in benchmark to get the below column data
-            if exp_type == "namespace":
-                columns_tocheck = [ "namespace" , "cluster_name" ]
-            else:
-                columns_tocheck = [ "image_name" , "container_name" , "k8_object_type" , "k8_object_name" , "namespace" , "cluster_name" ]
-            image_name = "kruize/tfb-qrh:2.9.1.F"
-            container_name = "tfb-server"
-            k8_object_type = "deployment"
-            k8_object_name = "tfb-qrh-sample-0"
-            namespace = "tfb-perf"
-            cluster_name = "e23-alias"
-	
-            for col in columns_tocheck:
-                if col not in row:
-                    if col == "image_name":
-                        row[col] = image_name
-                    elif col == "container_name":
-                        row[col] = container_name
-                    elif col == "k8_object_type":
-                        row[col] = k8_object_type
-                    elif col == "k8_object_name":
-                        row[col] = k8_object_name
-                    elif col == "namespace":
-                        row[col] = namespace
-                    elif col == "cluster_name":
-                        row[col] = cluster_name
-
-            if exp_type == "namespace":
-                replacements = {
-                    "EXP_NAME": row["cluster_name"] + '|' + row["namespace"],
-                    "CLUSTER_NAME": row["cluster_name"],
-                    "k8Object_NAMESPACE_NAME": row["namespace"],
-                    }
-            else:
-                replacements = {
-                    "EXP_NAME": row["container_name"] + '|' + row["k8_object_name"] + '|' + row["k8_object_type"] + '|' + row["namespace"] + '|' + row["cluster_name"],
-                    "CLUSTER_NAME": row["cluster_name"],
-                    "k8Object_TYPE": row["k8_object_type"],
-                    "k8Object_NAME": row["k8_object_name"],
-                    "k8ObjectNAMESPACE": row["namespace"],
-                    "k8Object_CONTAINER_IMAGE": row["image_name"],
-                    "k8Object_CONTAINER_NAME": row["container_name"]
-                    }
-
-    # Perform replacements
-    for key, value in replacements.items():
-        for obj in data:
-            json_str = json.dumps(obj)
-            json_str = json_str.replace(key, value)
-            obj.update(json.loads(json_str))
-
-    newdata = json.dumps(data)
-    with open("./recommendations_demo/json_files/create_exp.json", 'w') as file:
+            pass
+
+    newdata = json.dumps(experiment_json(row, exp_type))
+    with open(outputfile, 'w') as file:
         file.write(newdata)
 
-def createExpAndupdateResults(resultscsv,days=None,bulk=None,exp_type=None):
+# Columns identifying the experiment a results row belongs to
+def experiment_key(header, row, exp_type=None):
+    row = dict(zip(header, row))
+    if exp_type == "namespace":
+        columns = [ "cluster_name" , "namespace" ]
+    else:
+        columns = [ "container_name" , "k8_object_name" , "k8_object_type" , "namespace" , "cluster_name" ]
+    return tuple(row.get(col) for col in columns)
+
+# Creates the experiment json and the results json for a single csv row.
+# Returns the experiment json, the results json and the experiment name.
+# The experiment json is not created and None is returned for it if the experiment exists in Kruize.
+def prepare_row(header, row, exp_type=None, workdir="."):
+    if workdir == ".":
+        intermediate_csv = "intermediate.csv"
+        results_json = "./recommendations_demo/results/results.json"
+    else:
+        intermediate_csv = os.path.join(workdir, "intermediate.csv")
+        results_json = os.path.join(workdir, "results.json")
+
+    with open(intermediate_csv, mode='w', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(header)
+        writer.writerow(row)
+    ## Assuming there is one container for a template.
+    experiment_name = experiment_name_of(dict(zip(header, row)), exp_type)
+    if experiment_cache.exists(experiment_name):
+        exp_json = None
+    elif exp_type == "namespace":
+        # Create Experiment json for that row.
+        print("\nCreating the experiment...")
+        exp_json = experiment_json(dict(zip(header, row)), "namespace")
+        namespace = exp_json[0]['kubernetes_objects'][0]['namespaces']['namespace']
+        print("Experiment_name = ", experiment_name, " Namespace = ", namespace)
+    else:
+        # Create Experiment json for that row.
+        print("\nCreating the experiment...")
+        exp_json = experiment_json(dict(zip(header, row)))
+        k8ObjectName = exp_json[0]['kubernetes_objects'][0]['name']
+        k8ObjectType = exp_json[0]['kubernetes_objects'][0]['type']
+        namespace = exp_json[0]['kubernetes_objects'][0]['namespace']
+        print("Experiment_name = ", experiment_name, " K8_Object_name = ", k8ObjectName, " K8_Object_type = ",k8ObjectType, " Namespace = ", namespace)
+
+    if exp_type == "namespace":
+        # Convert the results csv to json
+        print("\nConvert the results csv to json...")
+        recommendation_validation.create_namespace_json_from_csv(intermediate_csv, results_json)
+    else:
+        # Convert the results csv to json
+        print("\nConvert the results csv to json...")
+        recommendation_validation.create_json_from_csv(intermediate_csv, results_json)
+    return exp_json, results_json, experiment_name
+
+# Max no. of results accepted by a single updateResults call
+MAX_RESULTS_PER_UPDATE = 100
+
+# Splits the rows of an experiment into updateResults jsons of MAX_RESULTS_PER_UPDATE results each
+def results_chunks(group):
+    for start in range(0, len(group), MAX_RESULTS_PER_UPDATE):
+        yield list(recommendation_validation.container_results_from_frame(group.iloc[start:start + MAX_RESULTS_PER_UPDATE]))
+
+# Groups the rows of a results frame by experiment
+def experiment_groups(df):
+    for col, default in recommendation_validation.CONTAINER_COLUMN_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = default
+
+    # Rows missing any of the experiment columns are not part of an experiment
+    sort_columns = ['namespace', 'k8_object_type', 'k8_object_name', 'container_name']
+    df = df[(df[sort_columns] != "").all(axis=1)]
+    for key, group in df.groupby(sort_columns, sort=True):
+        yield group
+
+# Reads the results csv once and groups its rows by experiment in memory
+def bulk_groups(resultscsv):
+    return experiment_groups(recommendation_validation.read_results_csv(resultscsv))
+
+# Reads the results csv once and groups its rows by experiment in memory.
+# Yields the experiment json and the updateResults jsons of each experiment.
+def bulk_experiments(resultscsv):
+    for group in bulk_groups(resultscsv):
+        yield experiment_json(group.iloc[0].to_dict()), results_chunks(group)
+
+# Converts the rows of an experiment to its experiment json and updateResults jsons.
+# Runs in a worker process of the bulk ingest process pool.
+def convert_experiment(group):
+    return experiment_json(group.iloc[0].to_dict()), list(results_chunks(group))
+
+# When updateRecommendations is run while the results of an experiment are posted in bulk mode
+DEFAULT_RECOMMENDATION_CADENCE = "chunk"
+RECOMMENDATION_CADENCES = ["interval", "chunk", "day", "end"]
+
+class RecommendationCadence:
+    """Picks the interval end times to update the recommendations of an experiment at.
+
+    interval: after every interval, N: after every N intervals, chunk: once per
+    updateResults call at its latest end time, day: at the last interval of each
+    day, end: only after all the results are posted. Whatever the cadence, the
+    recommendations are always updated at the latest end time of the experiment,
+    so the final recommendation is the same for all of them.
+    """
+
+    def __init__(self, cadence=DEFAULT_RECOMMENDATION_CADENCE):
+        if cadence not in RECOMMENDATION_CADENCES and not (cadence.isdigit() and int(cadence) > 0):
+            raise ValueError(f"Invalid recommendation cadence: {cadence}. Valid values are {RECOMMENDATION_CADENCES} or a no. of intervals")
+        self.cadence = cadence
+        self.intervals = 0
+        self.previous_end_time = None
+        self.latest_end_time = None
+        self.updated_end_time = None
+
+    # Returns the end times to update the recommendations at, after posting a chunk of results.
+    # End times are in the "%Y-%m-%dT%H:%M:%S.%fZ" format and compare as strings.
+    def end_times(self, chunk_end_times):
+        if self.cadence == "interval":
+            end_times = list(chunk_end_times)
+        elif self.cadence == "chunk":
+            end_times = [max(chunk_end_times)]
+        elif self.cadence == "end":
+            end_times = []
+        elif self.cadence == "day":
+            end_times = []
+            for end_time in chunk_end_times:
+                if self.previous_end_time is not None and end_time[:10] != self.previous_end_time[:10]:
+                    end_times.append(self.previous_end_time)
+                self.previous_end_time = end_time
+        else:
+            every = int(self.cadence)
+            end_times = [end_time for i, end_time in enumerate(chunk_end_times, self.intervals + 1) if i % every == 0]
+
+        self.intervals += len(chunk_end_times)
+        self.latest_end_time = max([self.latest_end_time or ""] + list(chunk_end_times))
+        if end_times:
+            self.updated_end_time = end_times[-1]
+        return end_times
+
+    # Returns the end time to update the recommendations at once all the results are posted, if any
+    def final_end_times(self):
+        if self.latest_end_time is None or self.updated_end_time == self.latest_end_time:
+            return []
+        self.updated_end_time = self.latest_end_time
+        return [self.latest_end_time]
+
+# updateResults calls made for a chunk of the incremental ingest before its intervals are dropped
+MAX_UPDATE_ATTEMPTS = 3
+
+class IncrementalIngest:
+    """Posts the intervals collected by metrics_promql to Kruize after every tick.
+
+    The rows of a tick are aggregated per workload as aggregateWorkloads does,
+    experiments are created the first time one of their rows is seen. Given an
+    IngestCheckpoint, only the intervals after the watermark of an experiment
+    are posted and the watermarks are kept in it. The recommendations are
+    updated with the given cadence, after the chunks Kruize accepted only. A
+    chunk that failed is posted again at the start of the next ticks, after
+    MAX_UPDATE_ATTEMPTS calls its intervals are dropped and the watermark moves
+    past them.
+    """
+
+    def __init__(self, recommendation_cadence=DEFAULT_RECOMMENDATION_CADENCE, checkpoint=None):
+        # Fail early on an invalid cadence
+        RecommendationCadence(recommendation_cadence)
+        self.recommendation_cadence = recommendation_cadence
+        self.checkpoint = checkpoint
+        # Cadence of each experiment created so far, by experiment name
+        self.cadences = {}
+        # (experiment name, results json, attempts) of the chunks to post again
+        self.failed_chunks = []
+
+    # Ingests the rows of a metrics_promql tick, with the columns in csv_headers, after posting again the chunks that failed
+    def ingest_rows(self, rows, fieldnames):
+        self.retry_failed_chunks()
+        if not rows:
+            return
+        # Go through the csv text so the rows are typed exactly as when aggregateWorkloads reads the csv
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+        buffer.seek(0)
+        df = recommendation_validation.aggregate_workloads_frame(pd.read_csv(buffer))
+        # Same column names as replaceheaders.sh gives the aggregated csv
+        df = df.rename(columns={'interval_start': 'start_timestamp', 'interval_end': 'end_timestamp'})
+
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False)
+        buffer.seek(0)
+        self.ingest(recommendation_validation.read_results_csv(buffer))
+
+    # Posts the new intervals of a results frame
+    def ingest(self, df):
+        for group in experiment_groups(df):
+            exp_json = experiment_json(group.iloc[0].to_dict())
+            experiment_name = exp_json[0]['experiment_name']
+            if experiment_name not in self.cadences:
+                create_experiment_once(exp_json)
+                self.cadences[experiment_name] = RecommendationCadence(self.recommendation_cadence)
+            cadence = self.cadences[experiment_name]
+
+            for results_json in results_chunks(group):
+                if self.checkpoint is not None:
+                    results_json = list(self.checkpoint.pending(results_json))
+                if results_json:
+                    self.post(experiment_name, results_json)
+
+    # Posts a chunk of results of an experiment and updates its recommendations if Kruize accepted it
+    def post(self, experiment_name, results_json, attempts=0):
+        response = update_results(results_json)
+        if self.checkpoint is not None:
+            self.checkpoint.acknowledge(results_json, response)
+        attempts += 1
+        if response is None or response.status_code >= 300:
+            if attempts < MAX_UPDATE_ATTEMPTS:
+                self.failed_chunks.append((experiment_name, results_json, attempts))
+            else:
+                print("\nDropping ", len(results_json), " intervals of ", experiment_name, " up to ",
+                      results_json[-1]['interval_end_time'], " after ", attempts, " failed updateResults calls")
+                if self.checkpoint is not None:
+                    self.checkpoint.drop(results_json)
+            return
+        for end_time in self.cadences[experiment_name].end_times([item['interval_end_time'] for item in results_json]):
+            update_recommendations(experiment_name, end_time)
+
+    # Posts again the chunks that failed on the previous ticks
+    def retry_failed_chunks(self):
+        failed_chunks, self.failed_chunks = self.failed_chunks, []
+        for experiment_name, results_json, attempts in failed_chunks:
+            self.post(experiment_name, results_json, attempts)
+
+    # Updates the recommendations at the latest interval of every experiment, if the cadence has not yet
+    def finish(self):
+        self.retry_failed_chunks()
+        for experiment_name, cadence in self.cadences.items():
+            for end_time in cadence.final_end_times():
+                update_recommendations(experiment_name, end_time)
+
+# Counts of a bulk ingest, printed at the end of it
+def new_ingest_summary():
+    return {"experiments": 0, "intervals": 0, "recommendation_updates": 0, "failures": 0}
+
+# Counts a Kruize API call as failed if it got no response or an error status code
+def count_response(summary, response):
+    if response is None or response.status_code >= 400:
+        summary["failures"] += 1
+
+def print_ingest_summary(summary, recommendation_cadence, wall_time):
+    print("\n************************************************************")
+    print("Experiments = ", summary["experiments"], " Intervals = ", summary["intervals"])
+    print("Recommendation updates = ", summary["recommendation_updates"], " (", recommendation_cadence, " cadence)")
+    print("Failures = ", summary["failures"], " Wall time = ", round(wall_time, 2), "s")
+    print("************************************************************")
+
+# Writes a json posted in bulk mode to the debug directory
+def dump_debug_json(debug_dir, filename, data):
+    with open(os.path.join(debug_dir, filename), 'w') as f:
+        json.dump(data, f)
+
+# Returns the latest interval_end_time of a results json in the format expected by updateRecommendations
+def max_interval_end_time(json_file):
+    resultsjson = json.load(open(json_file))
+    for item in resultsjson:
+        item['interval_start_time'] = datetime.strptime(item['interval_start_time'],"%Y-%m-%dT%H:%M:%S.%fZ")
+        item['interval_end_time'] = datetime.strptime(item['interval_end_time'], "%Y-%m-%dT%H:%M:%S.%fZ")
+    max_time = max(resultsjson, key=lambda x: x['interval_end_time'])['interval_end_time']
+    return max_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z"
+
+# Converts a csv row to the experiment json and the results json, read back from the file written by prepare_row
+def prepare_row_results(header, row, exp_type=None, workdir="."):
+    exp_json, json_file, experiment_name = prepare_row(header, row, exp_type, workdir)
+    with open(json_file) as f:
+        results_json = json.load(f)
+    return exp_json, results_json, experiment_name, max_interval_end_time(json_file)
+
+# Posts the rows of one experiment in order through the async client. The conversion of the rows, which
+# writes and reads files, and the checkpoint saves run on worker threads to keep the event loop free.
+async def updateExperimentResultsAsync(client, header, rows, exp_type=None, checkpoint=None):
+    with tempfile.TemporaryDirectory() as workdir:
+        for row in rows:
+            exp_json, results_json, experiment_name, end_time = await asyncio.to_thread(prepare_row_results, header, row, exp_type, workdir)
+            if checkpoint is not None:
+                results_json = list(checkpoint.pending(results_json))
+                if not results_json:
+                    continue
+            if exp_json is not None:
+                await client.create_experiment_once(exp_json)
+            print("\nUpdating the results to Kruize API...")
+            response = await client.update_results(results_json)
+            if checkpoint is not None:
+                await asyncio.to_thread(checkpoint.acknowledge, results_json, response)
+            await client.update_recommendations(experiment_name, end_time)
+
+# Converts the rows of an experiment in the process pool and posts them in order through the async client
+async def ingestExperimentAsync(client, pool, counter, group, recommendation_cadence, summary, checkpoint, debug_dir=None):
+    try:
+        exp_json, chunks = await asyncio.get_running_loop().run_in_executor(pool, convert_experiment, group)
+        cadence = RecommendationCadence(recommendation_cadence)
+        experiment_name = exp_json[0]['experiment_name']
+        if debug_dir is not None:
+            dump_debug_json(debug_dir, f"exp_{counter}.json", exp_json)
+        response = await client.create_experiment_once(exp_json)
+        if response is not None:
+            count_response(summary, response)
+        summary["experiments"] += 1
+        for i, results_json in enumerate(chunks, 1):
+            if checkpoint is not None:
+                results_json = list(checkpoint.pending(results_json))
+                if not results_json:
+                    continue
+            if debug_dir is not None:
+                dump_debug_json(debug_dir, f"exp_{counter}_results_{i}.json", results_json)
+            response = await client.update_results(results_json)
+            count_response(summary, response)
+            if checkpoint is not None:
+                await asyncio.to_thread(checkpoint.acknowledge, results_json, response)
+            summary["intervals"] += len(results_json)
+            for end_time in cadence.end_times([item['interval_end_time'] for item in results_json]):
+                count_response(summary, await client.update_recommendations(experiment_name, end_time))
+                summary["recommendation_updates"] += 1
+        for end_time in cadence.final_end_times():
+            count_response(summary, await client.update_recommendations(experiment_name, end_time))
+            summary["recommendation_updates"] += 1
+    except Exception as e:
+        print("\nFailed to ingest experiment ", counter, " : ", e)
+        summary["failures"] += 1
+
+# Ingests the experiments of the queue one after another until it gets None
+async def ingestExperimentsFromQueue(queue, client, pool, recommendation_cadence, summary, checkpoint, debug_dir=None):
+    while (item := await queue.get()) is not None:
+        counter, group = item
+        await ingestExperimentAsync(client, pool, counter, group, recommendation_cadence, summary, checkpoint, debug_dir)
+
+# Shards the experiments of a bulk ingest across a process pool for the csv to json conversion and
+# posts them through the async client. The calls of an experiment are still made in order.
+# The experiments are split off the results frame as the consumers take them from a bounded queue, so at
+# about 2 x (workers + concurrency) of them are held besides the frame, whatever the size of the csv.
+async def bulkIngestConcurrently(resultscsv, workers, concurrency, recommendation_cadence, checkpoint, debug_dir=None):
+    client = AsyncKruizeClient(concurrency)
+    summary = new_ingest_summary()
+    consumers = workers + concurrency
+    queue = asyncio.Queue(maxsize=consumers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tasks = [asyncio.ensure_future(ingestExperimentsFromQueue(queue, client, pool, recommendation_cadence, summary, checkpoint, debug_dir))
+                 for i in range(consumers)]
+        for item in enumerate(bulk_groups(resultscsv), 1):
+            await queue.put(item)
+        for task in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    return summary
+
+# Groups the rows by experiment and runs the experiments in parallel
+async def updateResultsConcurrently(header, rows, exp_type=None, concurrency=1, checkpoint=None):
+    experiments = {}
+    for row in rows:
+        experiments.setdefault(experiment_key(header, row, exp_type), []).append(row)
+    client = AsyncKruizeClient(concurrency)
+    await asyncio.gather(*(updateExperimentResultsAsync(client, header, exp_rows, exp_type, checkpoint) for exp_rows in experiments.values()))
+
+def createExpAndupdateResults(resultscsv,days=None,bulk=None,exp_type=None,concurrency=1,debug_dir=None,recommendation_cadence=DEFAULT_RECOMMENDATION_CADENCE,workers=1,resume=False,checkpoint_file=None):
+    # Record the results acknowledged by Kruize, to skip them if the ingest is resumed. Only kept when asked for,
+    # a plain ingest doesn't write a checkpoint file.
+    checkpoint = None
+    if resume or checkpoint_file is not None:
+        checkpoint = IngestCheckpoint(checkpoint_file or DEFAULT_CHECKPOINT_FILE, resume)
     if days is not None and days != "None":
         num_entries = int(days) * 96
         num_entries += 1
     if bulk == "1":
-        df = pd.read_csv(resultscsv)
-        sort_columns = ['namespace', 'k8_object_type', 'k8_object_name', 'container_name']
-        sorted_df = df.sort_values(sort_columns)
-        grouped = sorted_df.groupby(sort_columns)
-        temp_dir = 'temp'
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
-        counter = 0
-        for key, group in grouped:
-            counter += 1
-            filename = f"file_{counter}.csv"
-            filepath = os.path.join(temp_dir, filename)
-            group.to_csv(filepath, index=False)
-            
-        header_row = df.columns.tolist()
-        new_df = pd.DataFrame(columns=header_row)
-        for filename in os.listdir(temp_dir):
-            if filename.endswith('.csv'):
-                filepath = os.path.join(temp_dir, filename)
-                df = pd.read_csv(filepath)
-                with open(filepath, 'r') as input_csv:
-                    csv_reader = csv.reader(input_csv)
-                    header = next(csv_reader)
-                    for row in csv_reader:
-                        with open('intermediate.csv', mode='w', newline='') as outfile:
-                            writer = csv.writer(outfile)
-                            writer.writerow(header)
-                            writer.writerow(row)
-                            break
-                print("\nCreating the experiment...")
-                create_expjson("intermediate.csv")
-                create_experiment("./recommendations_demo/json_files/create_exp.json")
-                json_data = json.load(open("./recommendations_demo/json_files/create_exp.json"))
-                experiment_name = json_data[0]['experiment_name']
-                k8ObjectName = json_data[0]['kubernetes_objects'][0]['name']
-                k8ObjectType = json_data[0]['kubernetes_objects'][0]['type']
-                namespace = json_data[0]['kubernetes_objects'][0]['namespace']
-                print("Experiment_name = ", experiment_name, " K8_Object_name = ", k8ObjectName, " K8_Object_type = ",k8ObjectType, " Namespace = ", namespace)
-                # Split the csv's into multiples as updateResults doesn't support greater than 100 results.
-                max_lines_per_csv = 100
-                df = pd.read_csv(filepath)
-                bulksplit_directory = 'bulksplitfiles/'
-                os.makedirs(bulksplit_directory, exist_ok=True)
-                num_output_files = (len(df) + max_lines_per_csv - 1) // max_lines_per_csv
-                for i in range(num_output_files):
-                    start_idx = i * max_lines_per_csv
-                    end_idx = min((i + 1) * max_lines_per_csv, len(df))  # Ensure the last file includes remaining rows
-                    split_df = df.iloc[start_idx:end_idx]
-                    split_df.to_csv(f'{bulksplit_directory}output_{i + 1}.csv', index=False)
-
-                    
-                for filename1 in os.listdir(bulksplit_directory):
-                    if os.path.isfile(os.path.join(bulksplit_directory, filename1)):
-                        filepath1 = os.path.join(bulksplit_directory, filename1)
-                        # Convert the results csv to json
-                        print("\nConvert the results csv to json...")
-                        recommendation_validation.create_json_from_csv(filepath1,"./recommendations_demo/results/results.json")
-                        json_file = "./recommendations_demo/results/results.json"
-                        print("\nUpdating the results to Kruize API...")
-                        update_results(json_file)
-                        #update_recommendations(experiment_name)
-                        resultsjson = json.load(open(json_file))
-                        for item in resultsjson:
-                            item['interval_start_time'] = datetime.strptime(item['interval_start_time'],"%Y-%m-%dT%H:%M:%S.%fZ")
-                            item['interval_end_time'] = datetime.strptime(item['interval_end_time'], "%Y-%m-%dT%H:%M:%S.%fZ")
-                            update_recommendations(experiment_name, item['interval_end_time'].strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z")
-                        #max_time = max(resultsjson, key=lambda x: x['interval_end_time'])['interval_end_time']
-                        #update_recommendations(experiment_name, max_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z")
-                if os.path.exists(bulksplit_directory) and os.path.isdir(bulksplit_directory):
-                    shutil.rmtree(bulksplit_directory)
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
+        start_time = time.time()
+        # Fail early on an invalid cadence
+        RecommendationCadence(recommendation_cadence)
+        if debug_dir is not None:
+            os.makedirs(debug_dir, exist_ok=True)
+        if workers > 1 or concurrency > 1:
+            summary = asyncio.run(bulkIngestConcurrently(resultscsv, workers, concurrency, recommendation_cadence, checkpoint, debug_dir))
+            print_ingest_summary(summary, recommendation_cadence, time.time() - start_time)
+            return
+
+        summary = new_ingest_summary()
+        for counter, (exp_json, chunks) in enumerate(bulk_experiments(resultscsv), 1):
+            cadence = RecommendationCadence(recommendation_cadence)
+            print("\nCreating the experiment...")
+            if debug_dir is not None:
+                dump_debug_json(debug_dir, f"exp_{counter}.json", exp_json)
+            response = create_experiment_once(exp_json)
+            if response is not None:
+                count_response(summary, response)
+            summary["experiments"] += 1
+            experiment_name = exp_json[0]['experiment_name']
+            k8ObjectName = exp_json[0]['kubernetes_objects'][0]['name']
+            k8ObjectType = exp_json[0]['kubernetes_objects'][0]['type']
+            namespace = exp_json[0]['kubernetes_objects'][0]['namespace']
+            print("Experiment_name = ", experiment_name, " K8_Object_name = ", k8ObjectName, " K8_Object_type = ",k8ObjectType, " Namespace = ", namespace)
+            # updateResults doesn't support greater than 100 results, the results are posted in chunks.
+            for i, results_json in enumerate(chunks, 1):
+                if checkpoint is not None:
+                    results_json = list(checkpoint.pending(results_json))
+                    if not results_json:
+                        continue
+                if debug_dir is not None:
+                    dump_debug_json(debug_dir, f"exp_{counter}_results_{i}.json", results_json)
+                print("\nUpdating the results to Kruize API...")
+                response = update_results(results_json)
+                count_response(summary, response)
+                if checkpoint is not None:
+                    checkpoint.acknowledge(results_json, response)
+                summary["intervals"] += len(results_json)
+                for end_time in cadence.end_times([item['interval_end_time'] for item in results_json]):
+                    count_response(summary, update_recommendations(experiment_name, end_time))
+                    summary["recommendation_updates"] += 1
+            for end_time in cadence.final_end_times():
+                count_response(summary, update_recommendations(experiment_name, end_time))
+                summary["recommendation_updates"] += 1
+        print_ingest_summary(summary, recommendation_cadence, time.time() - start_time)
     else:
         # Create json using each row of a csv and update results
         with open(resultscsv, newline='') as csvfile:
@@ -235,72 +593,52 @@ def createExpAndupdateResults(resultscsv,days=None,bulk=None,exp_type=None):
             header = next(reader)
             if days is not None and days != "None":
                 reader = itertools.islice(reader, num_entries)
+            if concurrency > 1:
+                rows = [row for row in reader if any(row)]
+                asyncio.run(updateResultsConcurrently(header, rows, exp_type, concurrency, checkpoint))
+                return
             for row in reader:
-                recommendations_json_arr = []
                 if not any(row):
                     continue
-                with open('intermediate.csv', mode='w', newline='') as outfile:
-                    writer = csv.writer(outfile)
-                    writer.writerow(header)
-                    writer.writerow(row)         
-                ## Assuming there is one container for a template.
-                # Create Experiment json for that row.
-                print("\nCreating the experiment...")
-                if exp_type == "namespace":
-                    create_expjson("intermediate.csv","namespace")
-                    create_experiment("./recommendations_demo/json_files/create_exp.json")
-                    json_data = json.load(open("./recommendations_demo/json_files/create_exp.json"))
-                    experiment_name = json_data[0]['experiment_name']
-                    namespace = json_data[0]['kubernetes_objects'][0]['namespaces']['namespace']
-                    print("Experiment_name = ", experiment_name, " Namespace = ", namespace)
-                    # Convert the results csv to json
-                    print("\nConvert the results csv to json...")
-                    recommendation_validation.create_namespace_json_from_csv("./intermediate.csv","./recommendations_demo/results/results.json")
-
-                else:
-                    create_expjson("intermediate.csv")
-                    create_experiment("./recommendations_demo/json_files/create_exp.json")
-                    json_data = json.load(open("./recommendations_demo/json_files/create_exp.json"))
-                    experiment_name = json_data[0]['experiment_name']
-                    k8ObjectName = json_data[0]['kubernetes_objects'][0]['name']
-                    k8ObjectType = json_data[0]['kubernetes_objects'][0]['type']
-                    namespace = json_data[0]['kubernetes_objects'][0]['namespace']
-                    print("Experiment_name = ", experiment_name, " K8_Object_name = ", k8ObjectName, " K8_Object_type = ",k8ObjectType, " Namespace = ", namespace)
-                    # Convert the results csv to json
-                    print("\nConvert the results csv to json...")
-                    recommendation_validation.create_json_from_csv("./intermediate.csv","./recommendations_demo/results/results.json")
-                json_file = "./recommendations_demo/results/results.json"
+                exp_json, json_file, experiment_name = prepare_row(header, row, exp_type)
+                results_json = json.load(open(json_file))
+                if checkpoint is not None:
+                    results_json = list(checkpoint.pending(results_json))
+                    if not results_json:
+                        continue
+                if exp_json is not None:
+                    create_experiment_once(exp_json)
                 print("\nUpdating the results to Kruize API...")
-                update_results(json_file)
-                #update_recommendations(experiment_name) 
-                resultsjson = json.load(open(json_file))
-                for item in resultsjson:
-                    item['interval_start_time'] = datetime.strptime(item['interval_start_time'],"%Y-%m-%dT%H:%M:%S.%fZ")
-                    item['interval_end_time'] = datetime.strptime(item['interval_end_time'], "%Y-%m-%dT%H:%M:%S.%fZ")
-                max_time = max(resultsjson, key=lambda x: x['interval_end_time'])['interval_end_time']
-                update_recommendations(experiment_name, max_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z")
-                
+                response = update_results(results_json)
+                if checkpoint is not None:
+                    checkpoint.acknowledge(results_json, response)
+                update_recommendations(experiment_name, max_interval_end_time(json_file))
+
     return
 
 
 def getMetricsWithRecommendations(cluster_type,experiment_name):
     form_kruize_url(cluster_type)
-    list_metricsrec_json = list_metrics_with_recommendations(experiment_name)
-    with open('metrics_recommendations_data.json', 'w') as f:
-            json.dump(list_metricsrec_json, f, indent=4)
+    # Written as returned by Kruize, the flatteners in recommendation_validation parse it incrementally
+    list_metrics_with_recommendations(experiment_name, output_file='metrics_recommendations_data.json')
     return 
 
-def getExperimentNames(cluster_type):
+# Returns the names of the experiments in Kruize
+def experiment_names():
     experiment_names = []
-    form_kruize_url(cluster_type)
     list_experiments_json = list_experiments(rm=True)
     for obj in list_experiments_json:
         name = obj.get('experiment_name');
         if name:
             experiment_names.append(name)
-    print(experiment_names)
     return experiment_names
 
+def getExperimentNames(cluster_type):
+    form_kruize_url(cluster_type)
+    names = experiment_names()
+    print(names)
+    return names
+
 def getRecommendations(cluster_type,experiment_name):
     form_kruize_url(cluster_type)
     recommendations_json = list_recommendations(experiment_name, rm=True)
@@ -329,41 +667,93 @@ def summarizeNamespaceData(cluster_type, namespace_name=None):
             json.dump(namespace_data_json, f, indent=4)
     return
 
+# Summarizes a cluster and then each of its namespaces, the namespace summaries are fetched concurrently
+async def summarizeClusterAsync(client, cluster):
+    print(cluster)
+    cluster_data_json = await client.summarize_cluster_data(cluster)
+    namespaces = cluster_data_json[0].get('namespaces', {}).get('names', []) if cluster_data_json else []
+    namespace_data_jsons = await asyncio.gather(*(client.summarize_cluster_data(cluster, namespace) for namespace in namespaces))
+    return cluster_data_json, namespace_data_jsons
+
+async def summarizeClustersConcurrently(clusters, concurrency):
+    client = AsyncKruizeClient(concurrency)
+    return await asyncio.gather(*(summarizeClusterAsync(client, cluster) for cluster in clusters))
+
 ## Temporary function to get list of clusters and parse individually as /summarize has issues.
-def summarizeAllData(cluster_type):
+# The /summarize calls of all the clusters and namespaces go through a pool of concurrency requests, the csvs are
+# written once all of them returned, in the order of the clusters and of their namespaces.
+def summarizeAllData(cluster_type, concurrency=DEFAULT_CONCURRENCY):
     form_kruize_url(cluster_type)
     list_clusters_data = list_clusters()
+    summaries = asyncio.run(summarizeClustersConcurrently(list_clusters_data, concurrency))
     recommendation_validation.create_cluster_data_csv('cluster','clusterData.csv')
     recommendation_validation.create_cluster_data_csv('clusterNamespace','clusterNamespaceData.csv')
-    for cluster in list_clusters_data:
-        print(cluster)
-        cluster_data_json = summarize_cluster_data(cluster)
-        with open('cluster_data.json', 'w') as f:
-            json.dump(cluster_data_json, f, indent=4)
-        recommendation_validation.get_cluster_data_csv('cluster','cluster_data.json','clusterData.csv')
-        #print(cluster_data_json)
-        namespaces = cluster_data_json[0].get('namespaces', {}).get('names', [])
-        for namespace in namespaces:
-            print(namespace)
-            cluster_namespace_data_json = summarize_cluster_data(cluster,namespace)
-            print(cluster_namespace_data_json)
-            with open('cluster_namespace_data.json', 'w') as f:
-                json.dump(cluster_namespace_data_json, f, indent=4)
-            recommendation_validation.get_cluster_data_csv('clusterNamespace','cluster_namespace_data.json','clusterNamespaceData.csv')
-
-def getAllExperimentsRecommendations(cluster_type):
+    recommendation_validation.write_cluster_data_csv('cluster', [cluster_data_json for cluster_data_json, namespace_data_jsons in summaries], 'clusterData.csv')
+    recommendation_validation.write_cluster_data_csv('clusterNamespace', [namespace_data_json for cluster_data_json, namespace_data_jsons in summaries
+                                                                          for namespace_data_json in namespace_data_jsons], 'clusterNamespaceData.csv')
+
+# Fetches the recommendations of an experiment and flattens them in memory, returns the rows or the error
+async def experimentRecommendationsAsync(client, experiment_name):
+    try:
+        recommendation_json = await client.list_recommendations(experiment_name, rm=True)
+        if not isinstance(recommendation_json, list):
+            # Kruize returns a json with the error message if the call failed
+            raise ValueError(recommendation_json.get("message", recommendation_json) if isinstance(recommendation_json, dict) else recommendation_json)
+        return experiment_name, recommendation_validation.recommendation_rows(recommendation_json), None
+    except Exception as e:
+        return experiment_name, None, e
+
+# Fetches the recommendations of the experiments concurrently and appends their rows to outputfile in the order
+# of exp_names. At most window experiments are fetched or waiting to be written at a time, so the rows kept in
+# memory are bounded when an experiment is slow. The experiments that failed are logged to error_log with their error.
+async def fetchRecommendationsConcurrently(exp_names, concurrency, outputfile, error_log, window=None):
+    client = AsyncKruizeClient(concurrency)
+    window = window or 2 * concurrency
+    failures = []
+    # Remove the log of a previous run, it is only written if an experiment fails
+    if os.path.exists(error_log):
+        os.remove(error_log)
+    with open(outputfile, 'a', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=recommendation_validation.RECOMMENDATIONS_FIELDNAMES)
+        writer.writeheader()
+        names = iter(exp_names)
+        pending = collections.deque(asyncio.ensure_future(experimentRecommendationsAsync(client, name))
+                                    for name in itertools.islice(names, window))
+        done = 0
+        while pending:
+            experiment_name, rows, error = await pending.popleft()
+            for name in itertools.islice(names, 1):
+                pending.append(asyncio.ensure_future(experimentRecommendationsAsync(client, name)))
+            if error is None:
+                writer.writerows(rows)
+            else:
+                print("\nFailed to get the recommendations of ", experiment_name, " : ", error)
+                failures.append((experiment_name, error))
+            done += 1
+            print("Recommendations fetched for ", done, "/", len(exp_names), " experiments")
+    if failures:
+        with open(error_log, 'w') as f:
+            for experiment_name, error in failures:
+                f.write(experiment_name + " : " + str(error) + "\n")
+        print(len(failures), " experiments failed, see ", error_log)
+    return failures
+
+def getAllExperimentsRecommendations(cluster_type, concurrency=DEFAULT_CONCURRENCY, outputfile='experimentRecommendations.csv',
+                                     error_log='experimentRecommendations_errors.log'):
     form_kruize_url(cluster_type)
-    exp_names = getExperimentNames(cluster_type)
-    for name in exp_names:
-        recommendation_json = list_recommendations(name, rm=True)
-        with open('exp_recommendation_data.json', 'w') as f:
-            json.dump(recommendation_json, f, indent=4)
-        recommendation_validation.get_recommondations('exp_recommendation_data.json')
+    exp_names = experiment_names()
+    asyncio.run(fetchRecommendationsConcurrently(exp_names, concurrency, outputfile, error_log))
 
 
 def main(argv):
+    concurrency = 1
+    debug_dir = None
+    recommendation_cadence = DEFAULT_RECOMMENDATION_CADENCE
+    workers = 1
+    resume = False
+    checkpoint_file = None
     try:
-        opts, args = getopt.getopt(argv,"h:c:p:e:r:b:d:t:")
+        opts, args = getopt.getopt(argv,"h:c:p:e:r:b:d:t:",["concurrency=","debug-dir=","recommendation-cadence=","workers=","resume","checkpoint="])
     except getopt.GetoptError:
         print("recommendation_experiment.py -c <cluster type>")
         sys.exit(2)
@@ -385,6 +775,18 @@ def main(argv):
             days_data = arg
         elif opt == '-t':
             exp_type = arg
+        elif opt == '--concurrency':
+            concurrency = int(arg)
+        elif opt == '--debug-dir':
+            debug_dir = arg
+        elif opt == '--recommendation-cadence':
+            recommendation_cadence = arg
+        elif opt == '--workers':
+            workers = int(arg)
+        elif opt == '--resume':
+            resume = True
+        elif opt == '--checkpoint':
+            checkpoint_file = arg
     
     if '-r' not in sys.argv:
         resultscsv = 'metrics.csv'
@@ -399,7 +801,7 @@ def main(argv):
     # Create the performance profile
     create_performance_profile(perf_profile_json_file)
     # Create and updateResults
-    createExpAndupdateResults(resultscsv,days_data,bulk_results,exp_type)
+    createExpAndupdateResults(resultscsv,days_data,bulk_results,exp_type,concurrency,debug_dir,recommendation_cadence,workers,resume,checkpoint_file)
 
 if __name__ == '__main__':
     main(sys.argv[1:])
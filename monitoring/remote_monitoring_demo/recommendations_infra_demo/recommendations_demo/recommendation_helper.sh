@@ -326,8 +326,8 @@ function validate_experiment_recommendations() {
                         recommendation_filepath="${BENCHMARK_RESULTS_DIR}/recommendations/${recommendation_file}"
                         boxplot_filepath="${BENCHMARK_RESULTS_DIR}/boxplots/${recommendation_file}"
                         if [[ -f ${recommendation_filepath} ]]; then
-                                python3 -c "import recommendations_demo.recommendation_validation; recommendations_demo.recommendation_validation.validate_experiment_recommendations_boxplots('${exp_name}', '${EXP_TYPE}', \"experimentMetrics_sorted.csv\", '${recommendation_filepath}',\"RECOMMENDATIONS\")"
-                                python3 -c "import recommendations_demo.recommendation_validation; recommendations_demo.recommendation_validation.validate_experiment_recommendations_boxplots('${exp_name}', '${EXP_TYPE}', \"experimentPlotData_sorted.csv\", '${boxplot_filepath}',\"BOX PLOTS\")"
+                                python3 -c "import recommendations_demo.recommendation_validation; recommendations_demo.recommendation_validation.validate_experiment_recommendations_boxplots('${exp_name}', '${EXP_TYPE}', \"experimentMetrics_sorted.csv\", '${recommendation_filepath}',\"RECOMMENDATIONS\", report_file='${parts[1]}_recommendations_diff.csv')"
+                                python3 -c "import recommendations_demo.recommendation_validation; recommendations_demo.recommendation_validation.validate_experiment_recommendations_boxplots('${exp_name}', '${EXP_TYPE}', \"experimentPlotData_sorted.csv\", '${boxplot_filepath}',\"BOX PLOTS\", report_file='${parts[1]}_boxplots_diff.csv')"
                                 exit_code=$?
                                 validate_status=$((validate_status + exit_code))
                                 echo "=================================="
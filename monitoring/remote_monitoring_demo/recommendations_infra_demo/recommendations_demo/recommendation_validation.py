@@ -15,49 +15,77 @@ limitations under the License.
 """
 
 import pandas as pd
+import numpy as np
 import json
 import csv
+import io
 import sys
 import os
 import datetime
+import itertools
 import getopt
 import subprocess
 import filecmp
-import shutil
 import subprocess
-import math
+# Optional, the listExperiments jsons too big to be loaded at once are parsed incrementally when it is installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Size in bytes from which a listExperiments json is parsed incrementally. Below it json.load is faster than
+# matching the ijson events one by one in python.
+STREAM_MIN_SIZE = 256 * 1024 * 1024
+
+RECOMMENDATION_KEY_COLUMNS = ['experiment_name', 'container_name', 'time_zone', 'term']
+RECOMMENDATION_CHECK_COLUMNS = ['cpu_limits', 'memory_limits', 'cpu_requests', 'memory_requests']
+
+# Flattens the duration based recommendations of listRecommendations responses into a frame,
+# one row per experiment, container, time zone and term that has a recommended config
+def recommendations_frame(data):
+    rows = []
+    for json_data in data:
+        for experiment in json_data:
+            for kubernetes_object in experiment["kubernetes_objects"]:
+                for container in kubernetes_object["containers"]:
+                    for time_zone, recommendations in container["recommendations"]["data"].items():
+                        for duration_type, recommendation in recommendations["duration_based"].items():
+                            if "config" not in recommendation:
+                                continue
+                            config = recommendation["config"]
+                            rows.append((experiment["experiment_name"], container["container_name"], time_zone, duration_type,
+                                         config["limits"]["cpu"]["amount"], config["limits"]["memory"]["amount"],
+                                         config["requests"]["cpu"]["amount"], config["requests"]["memory"]["amount"]))
+    return pd.DataFrame(rows, columns=RECOMMENDATION_KEY_COLUMNS + RECOMMENDATION_CHECK_COLUMNS)
+
+# Joins the recommendations with the check table on (time_zone, term) and compares the values rounded to 4 digits.
+# Returns the status of each recommendation: "match", "mismatch" or "no match found" if the check table has no row for it.
+def check_recommendations(recommendations, check):
+    # The first row of the check table is used for a (time_zone, term)
+    check = check.drop_duplicates(['time_zone', 'term'])[['time_zone', 'term'] + RECOMMENDATION_CHECK_COLUMNS]
+    merged = recommendations.merge(check, on=['time_zone', 'term'], how='left', suffixes=('', '_csv'), indicator=True)
+
+    equal = np.ones(len(merged), dtype=bool)
+    for col in RECOMMENDATION_CHECK_COLUMNS:
+        equal &= np.round(merged[col].to_numpy(dtype=float), 4) == np.round(merged[col + '_csv'].to_numpy(dtype=float), 4)
+    found = (merged['_merge'] == 'both').to_numpy()
+    merged['status'] = np.select([~found, equal], ["no match found", "match"], "mismatch")
+    return merged.drop(columns=['_merge'])
 
 # Validate the recommendations generated to the csv created by scripts(which contains the recommendation logic)
-def validate_recomm(filename):
+def validate_recomm(filename, check_file='recommendation_check.csv', report_file=None):
     with open(filename, 'r') as f:
        data = json.load(f)
-    df = pd.read_csv('recommendation_check.csv')
-    # Compare the data for each time zone
-    for json_data in data:
-        for kubernetes_object in json_data[0]["kubernetes_objects"]:
-            for container in kubernetes_object["containers"]:
-                for time_zone in container["recommendations"]["data"]:
-                    for duration_type in container["recommendations"]["data"][time_zone]["duration_based"]:
-                        recommendations = container["recommendations"]["data"][time_zone]
-                        if "config" in recommendations["duration_based"][duration_type]:
-                            cpu_limits_json = round(recommendations["duration_based"][duration_type]["config"]["limits"]["cpu"]["amount"], 4)
-                            memory_limits_json = round(recommendations["duration_based"][duration_type]["config"]["limits"]["memory"]["amount"], 4)
-                            cpu_requests_json = round(recommendations["duration_based"][duration_type]["config"]["requests"]["cpu"]["amount"], 4)
-                            memory_requests_json = round(recommendations["duration_based"][duration_type]["config"]["requests"]["memory"]["amount"], 4)
-                            
-                            
-                            # Compare the CPU and memory values with the corresponding values in the CSV file
-                            csv_row = df.loc[(df["time_zone"] == time_zone) & (df["term"] == duration_type)]
-                            if len(csv_row) > 0:
-                                cpu_limits_csv = round(csv_row["cpu_limits"].values[0], 4)
-                                memory_limits_csv = round(csv_row["memory_limits"].values[0], 4)
-                                cpu_requests_csv = round(csv_row["cpu_requests"].values[0], 4)
-                                memory_requests_csv = round(csv_row["memory_requests"].values[0], 4)
-                                
-                                if cpu_limits_json == cpu_limits_csv and memory_limits_json == memory_limits_csv and cpu_requests_json == cpu_requests_csv and memory_requests_json == memory_requests_csv :
-                                    print(f"Match found for timezone {time_zone} and duration type {duration_type}")
-                            else:
-                                print(f"No match found for timezone {time_zone} and duration type {duration_type}")
+    results = check_recommendations(recommendations_frame(data), pd.read_csv(check_file))
+
+    for status, count in results['status'].value_counts().items():
+        print(status, " : ", count)
+    failed = results[results['status'] != "match"]
+    if not failed.empty:
+        print(failed[RECOMMENDATION_KEY_COLUMNS + ['status']].to_string(index=False))
+    if report_file is not None:
+        results.to_csv(report_file, index=False)
+    return results
 
 # Validate the recommendations and boxplots generated by Kruize by comparing with existing files
 def validate_experiment_recommendations_boxplots_actuals(exp_name, exp_type, inputfile, validatefile, match_type):
@@ -69,56 +97,86 @@ def validate_experiment_recommendations_boxplots_actuals(exp_name, exp_type, inp
         print(match_type, " DOESN'T MATCH for ", exp_type, " experiment ", exp_name)
         exit(1)
 
-def round_values(value, precision=5):
-    """Round the value to a specified precision if it is numeric."""
-    if isinstance(value, (int, float)):
-        return round(value, precision)
-    return value
-
-def validate_experiment_recommendations_boxplots(exp_name, exp_type, inputfile, validatefile, match_type, precision=5):
+# Columns identifying a row of the recommendations and box plots csvs, the ones present in both csvs are used
+COMPARISON_KEY_COLUMNS = ['experiment_name', 'container_name', 'timezone']
+DIFF_REPORT_COLUMNS = ['row_key', 'column', 'expected', 'actual']
+# Max no. of differences printed when the csvs don't match
+MAX_PRINTED_DIFFERENCES = 50
+
+# Compares a column of the expected and the actual rows. Numeric columns are equal if they match when rounded
+# to the precision or are close within the tolerances, the other columns must be equal as strings.
+# Missing values are equal to each other.
+def equal_values(expected, actual, precision=5, rel_tol=1e-6, abs_tol=1e-8):
+    both_missing = expected.isna().to_numpy() & actual.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(expected) and pd.api.types.is_numeric_dtype(actual):
+        expected = expected.to_numpy(dtype=float)
+        actual = actual.to_numpy(dtype=float)
+        equal = (np.round(expected, precision) == np.round(actual, precision)) | \
+                np.isclose(expected, actual, rtol=rel_tol, atol=abs_tol)
+    else:
+        equal = expected.astype(str).to_numpy() == actual.astype(str).to_numpy()
+    return equal | both_missing
+
+# Readable key of a row, the occurrence is only added for the rows sharing a key
+def row_key(key, key_columns):
+    *values, occurrence = key if isinstance(key, tuple) else (key,)
+    text = ",".join(str(value) for value in values)
+    return text + "[" + str(occurrence) + "]" if occurrence else text
+
+# Aligns the expected and the actual frames by the key columns and compares them column by column.
+# Returns the differences as a frame of row key, column, expected and actual value, empty if they match.
+def compare_frames(expected, actual, key_columns=None, precision=5, rel_tol=1e-6, abs_tol=1e-8):
+    if key_columns is None:
+        key_columns = [col for col in COMPARISON_KEY_COLUMNS if col in expected.columns and col in actual.columns]
+
+    # Rows sharing a key are matched in the order they appear
+    frames = []
+    for df in (expected, actual):
+        df = df.copy()
+        df[key_columns] = df[key_columns].fillna("")
+        df['occurrence'] = df.groupby(key_columns).cumcount() if key_columns else np.arange(len(df))
+        frames.append(df.set_index(key_columns + ['occurrence']))
+    expected, actual = frames
+
+    differences = []
+    for key in expected.index.difference(actual.index):
+        differences.append((row_key(key, key_columns), "<row>", "present", "missing"))
+    for key in actual.index.difference(expected.index):
+        differences.append((row_key(key, key_columns), "<row>", "missing", "present"))
+    for column in expected.columns.difference(actual.columns, sort=False):
+        differences.append(("<all>", column, "present", "missing"))
+    for column in actual.columns.difference(expected.columns, sort=False):
+        differences.append(("<all>", column, "missing", "present"))
+
+    common = expected.index.intersection(actual.index)
+    expected = expected.loc[common]
+    actual = actual.loc[common]
+    for column in expected.columns.intersection(actual.columns, sort=False):
+        equal = equal_values(expected[column], actual[column], precision, rel_tol, abs_tol)
+        for i in np.flatnonzero(~equal):
+            differences.append((row_key(common[i], key_columns), column, expected[column].iat[i], actual[column].iat[i]))
+
+    return pd.DataFrame(differences, columns=DIFF_REPORT_COLUMNS)
+
+# Compares the recommendations or the box plots csv of an experiment with the expected csv and exits with 0 if
+# they match. Otherwise prints the differences, writes them to the report file if one is given and exits with 1.
+def validate_experiment_recommendations_boxplots(exp_name, exp_type, inputfile, validatefile, match_type, precision=5, report_file=None):
     validate_files = filecmp.cmp(inputfile, validatefile)
     if validate_files:
         print(match_type, " MATCH for ", exp_type , " experiment ", exp_name)
         exit(0)
-    else:
-        df1 = pd.read_csv(inputfile)
-        df2 = pd.read_csv(validatefile)
-
-        if df1.shape != df2.shape:
-            print(match_type, " DOESN'T MATCH for ", exp_type , " experiment ", exp_name)
-            exit(1)
 
-        differences_found = False
-        for idx, row1 in df1.iterrows():
-            row2 = df2.iloc[idx]
-
-            differing_columns = []
-
-            for col in df1.columns:
-                val1 = row1[col]
-                val2 = row2[col]
-
-                if pd.isna(val1) and pd.isna(val2):
-                    continue
-
-                val1_rounded = round_values(val1, precision)
-                val2_rounded = round_values(val2, precision)
-                if val1_rounded == val2_rounded:
-                    continue
-                if math.isclose(val1, val2, rel_tol=1e-6, abs_tol=1e-8):
-                    continue
-
-                differing_columns.append(col)
-
-            if differing_columns:
-                differences_found = True
+    differences = compare_frames(pd.read_csv(validatefile), pd.read_csv(inputfile), precision=precision)
+    if differences.empty:
+        print(match_type, " MATCH for ", exp_type , " experiment ", exp_name)
+        exit(0)
 
-        if not differences_found:
-            print(match_type, " MATCH for ", exp_type , " experiment ", exp_name)
-            exit(0)
-        else:
-            print(match_type, " DOESN'T MATCH for ", exp_type , " experiment ", exp_name)
-            exit(1)
+    print(match_type, " DOESN'T MATCH for ", exp_type , " experiment ", exp_name)
+    print(len(differences), " differences, expected: ", validatefile, " actual: ", inputfile)
+    print(differences.head(MAX_PRINTED_DIFFERENCES).to_string(index=False))
+    if report_file is not None:
+        differences.to_csv(report_file, index=False)
+    exit(1)
 
 
 def getUniquek8Objects(inputcsvfile):
@@ -133,12 +191,19 @@ def getUniquek8Objects(inputcsvfile):
     return unique_values
 
 
+# Aggregation applied to a metric column of a workload, from the suffix of the column name
+AGGREGATIONS_BY_SUFFIX = {'avg': 'mean', 'min': 'min', 'max': 'max', 'sum': 'sum'}
+
 def aggregateWorkloads(filename, outputResults):
 
     print("Aggregating the data for file : ", filename)
 
     # Load the CSV file into a pandas DataFrame
     df = pd.read_csv(filename)
+    aggregate_workloads_frame(df).to_csv(outputResults, index=False)
+
+# Aggregates the per pod rows of a metrics_promql csv to a row per container of a workload and interval
+def aggregate_workloads_frame(df):
 
     #Remove the rows if there is no owner_kind, owner_name and workload
     # Expected to ignore rows which can be pods / invalid
@@ -153,89 +218,34 @@ def aggregateWorkloads(filename, outputResults):
     # If owner_kind is 'ReplicaSet' and workload is '<none>', actual workload_type is ReplicaSet
     # If owner_kind is 'ReplicationCOntroller' and workload is '<none>', actual workload_type is ReplicationController
     # If owner_kind and workload has some names, workload_type is same as derived through queries.
-
-    df['k8_object_type'] = ''
-    for i, row in df.iterrows():
-        if row['owner_kind'] == 'ReplicaSet' and row['workload'] == '<none>':
-            df.at[i, 'k8_object_type'] = 'replicaset'
-        elif row['owner_kind'] == 'ReplicationController' and row['workload'] == '<none>':
-            df.at[i, 'k8_object_type'] = 'replicationcontroller'
-        else:
-            df.at[i, 'k8_object_type'] = row['workload_type']
+    no_workload = df['workload'] == '<none>'
+    df['k8_object_type'] = np.where(no_workload & (df['owner_kind'] == 'ReplicaSet'), 'replicaset',
+                                    np.where(no_workload & (df['owner_kind'] == 'ReplicationController'),
+                                             'replicationcontroller', df['workload_type']))
 
     # Update k8_object_name based on the type and workload.
     # If the workload is <none> (which indicates ReplicaSet and ReplicationCOntroller - ignoring pods/invalid cases), the name of the k8_object can be owner_name.
     # If the workload has some other name, the k8_object_name is same as workload. In this case, owner_name cannot be used as there can be multiple owner_names for the same deployment(considering there are multiple replicasets)
-
-    df['k8_object_name'] = ''
-    for i, row in df.iterrows():
-        if row['workload'] != '<none>':
-            df.at[i, 'k8_object_name'] = row['workload']
-        else:
-            df.at[i, 'k8_object_name'] = row['owner_name']
-
-    df.to_csv('cop-withobjType.csv', index=False)
-
-    # Specify the columns to sort by
-    # Sort and grpup the data based on below columns to get a container for a workload and for an interval.
-    # Each file generated is for a single timestamp and a container for a workload and will be aggregated to a single metrics value.
-    sort_columns = ['namespace', 'k8_object_type', 'workload', 'container_name', 'interval_start']
-    sorted_df = df.sort_values(sort_columns)
-
-    # Group the rows by the unique values
-    grouped = sorted_df.groupby(sort_columns)
-
-    # Create a directory to store the output CSV files
-    output_dir = 'output'
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    # Write each group to a separate CSV file
-    counter = 0
-    for key, group in grouped:
-        counter += 1
-        filename = f"file_{counter}.csv"
-        filepath = os.path.join(output_dir, filename)
-        group.to_csv(filepath, index=False)
-
-    #Create a temporary file with a header to append the aggregate data from multiple files.
-    header_row = df.columns.tolist()
-    agg_df = pd.DataFrame(columns=header_row)
+    df['k8_object_name'] = np.where(no_workload, df['owner_name'], df['workload'])
+
+    # Specify the columns to group by
+    # Group the data based on below columns to get a container for a workload and for an interval.
+    # The rows of each group are aggregated to a single metrics value.
+    group_columns = ['namespace', 'k8_object_type', 'workload', 'container_name', 'interval_start']
+    df = df.dropna(subset=group_columns).sort_values(group_columns, kind='stable')
+
+    # Replace each metric with the aggregate of its group, based on the suffix of the column
+    grouped = df.groupby(group_columns, sort=False)
+    for suffix, aggregation in AGGREGATIONS_BY_SUFFIX.items():
+        metric_columns = [column for column in df.columns if column.endswith(suffix)]
+        if metric_columns:
+            df[metric_columns] = grouped[metric_columns].transform(aggregation)
+
+    # Drop the per pod columns, the rows of a group are then duplicates of each other
     columns_to_ignore = ['pod', 'owner_name', 'node']
     if 'resource_id' in df.columns:
         columns_to_ignore.append('resource_id')
-
-    for filename in os.listdir(output_dir):
-        if filename.endswith('.csv'):
-            filepath = os.path.join(output_dir, filename)
-            df = pd.read_csv(filepath)
-
-            # Calculate the average and minimum values for specific columns
-            for column in df.columns:
-                if column.endswith('avg'):
-                    avg = df[column].mean()
-                    df[column] = avg
-                elif column.endswith('min'):
-                    minimum = df[column].min()
-                    df[column] = minimum
-                elif column.endswith('max'):
-                    maximum = df[column].max()
-                    df[column] = maximum
-                elif column.endswith('sum'):
-                    total = df[column].sum()
-                    df[column] = total
-
-            df = df.drop_duplicates(subset=[col for col in df.columns if col not in columns_to_ignore])
-            #agg_df = agg_df.append(df)
-            agg_df = pd.concat([agg_df, df], ignore_index=True)
-
-    agg_df.to_csv('./final.csv', index=False)
-    df1 = pd.read_csv('final.csv')
-    df1.drop(columns_to_ignore, axis=1, inplace=True)
-    df1.to_csv(outputResults, index=False)
-    os.remove('final.csv')
+    return df.drop(columns=columns_to_ignore).drop_duplicates()
 
 
 def convert_date_format(input_date_str):
@@ -428,6 +438,123 @@ def create_namespace_json_from_csv(csv_file_path, outputjsonfile):
     with open(outputjsonfile, "w") as json_file:
         json.dump(json_data, json_file)
 
+MEBIBYTE = 1048576
+
+# Container metrics in the order they appear in the results json.
+# (metric name, csv column prefix, aggregations, format, column that must be non-empty for the metric to be sent)
+CONTAINER_METRICS = [
+    ("cpuRequest", "cpu_request_container", ("sum", "avg"), "cores", "cpu_request_container_avg"),
+    ("cpuLimit", "cpu_limit_container", ("sum", "avg"), "cores", "cpu_limit_container_avg"),
+    ("cpuThrottle", "cpu_throttle_container", ("sum", "max", "avg"), "cores", "cpu_throttle_container_max"),
+    ("cpuUsage", "cpu_usage_container", ("sum", "min", "max", "avg"), "cores", "cpu_usage_container_avg"),
+    ("memoryRequest", "memory_request_container", ("sum", "avg"), "MiB", "memory_request_container_avg"),
+    ("memoryLimit", "memory_limit_container", ("sum", "avg"), "MiB", "memory_limit_container_avg"),
+    ("memoryUsage", "memory_usage_container", ("min", "max", "sum", "avg"), "MiB", "memory_usage_container_avg"),
+    ("memoryRSS", "memory_rss_usage_container", ("min", "max", "sum", "avg"), "MiB", "memory_usage_container_avg"),
+]
+
+# Accelerator metrics are sent only if their columns exist in the csv, along with the accelerator metadata
+ACCELERATOR_METRICS = [
+    ("acceleratorCoreUsage", "accelerator_core_usage_percentage", ("min", "max", "avg"), "percentage", "accelerator_core_usage_percentage_max"),
+    ("acceleratorMemoryUsage", "accelerator_memory_copy_percentage", ("min", "max", "avg"), "percentage", "accelerator_memory_copy_percentage_max"),
+    ("acceleratorFrameBufferUsage", "accelerator_frame_buffer_usage", ("min", "max", "avg"), "percentage", "accelerator_frame_buffer_usage_max"),
+]
+
+## Hardcoding for tfb-results and demo benchmark. Used only if these columns are not available.
+## Keep this until the metrics queries are fixed in benchmark to get the below column data
+CONTAINER_COLUMN_DEFAULTS = {
+    "image_name": "kruize/tfb-qrh:2.9.1.F",
+    "container_name": "tfb-server",
+    "k8_object_type": "deployment",
+    "k8_object_name": "tfb-qrh-sample-0",
+    "namespace": "tfb-perf",
+    "cluster_name": "e23-alias",
+}
+
+# Convert the metric columns of a csv at once. Cells are parsed only where the mask column is set,
+# and memory columns are converted from bytes to MiB as whole arrays.
+# Returns (name, format, mask, {aggregation: values}, metadata) per metric present in the csv.
+def metric_columns(df, metrics, with_metadata=False):
+    num_rows = len(df)
+    columns = []
+    for name, prefix, aggregations, unit, mask_column in metrics:
+        if with_metadata and mask_column not in df.columns:
+            continue
+        mask = (df[mask_column] != "").to_numpy()
+
+        values = {}
+        for aggregation in aggregations:
+            parsed = np.full(num_rows, np.nan)
+            parsed[mask] = df[prefix + "_" + aggregation].to_numpy()[mask].astype(float)
+            if unit == "MiB":
+                parsed /= MEBIBYTE
+            values[aggregation] = parsed.tolist()
+
+        metadata = None
+        if with_metadata:
+            model_names = df["accelerator_model_name"].tolist()
+            nodes = df["node"].tolist() if "node" in df.columns else [""] * num_rows
+            metadata = [{"accelerator_model_name": model_name, "node": node} if node
+                        else {"accelerator_model_name": model_name}
+                        for model_name, node in zip(model_names, nodes)]
+        columns.append((name, unit, mask.tolist(), values, metadata))
+    return columns
+
+# Build the container metrics of every row of a csv from the converted columns
+def container_metrics_from_frame(df):
+    columns = metric_columns(df, CONTAINER_METRICS) + metric_columns(df, ACCELERATOR_METRICS, with_metadata=True)
+    for i in range(len(df)):
+        container_metrics = []
+        for name, unit, mask, values, metadata in columns:
+            if not mask[i]:
+                continue
+            aggregation_info = {aggregation: column[i] for aggregation, column in values.items()}
+            aggregation_info["format"] = unit
+            results = {}
+            if metadata is not None:
+                results["metadata"] = metadata[i]
+            results["aggregation_info"] = aggregation_info
+            container_metrics.append({"name": name, "results": results})
+        yield container_metrics
+
+# Convert a csv frame to the updateResults json of container experiments, one dict per row
+def container_results_from_frame(df):
+    for col, default in CONTAINER_COLUMN_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = default
+
+    rows = zip(container_metrics_from_frame(df), df["image_name"], df["container_name"], df["k8_object_type"],
+               df["k8_object_name"], df["namespace"], df["cluster_name"], df["start_timestamp"], df["end_timestamp"])
+    for container_metrics, image_name, container_name, k8_object_type, k8_object_name, namespace, cluster_name, start, end in rows:
+        # Create a dictionary to hold the container information
+        container = {
+            "container_image_name": image_name,
+            "container_name": container_name,
+            "metrics": container_metrics
+        }
+
+        # Create a dictionary to hold the deployment information
+        kubernetes_object = {
+            "type": k8_object_type,
+            "name": k8_object_name,
+            "namespace": namespace,
+            "containers": [container]
+        }
+
+        # Create a dictionary to hold the experiment data
+        yield {
+            "version": "1.0",
+            "experiment_name": container_name + '|' + k8_object_name + '|' + k8_object_type + '|' + namespace + '|' + cluster_name,
+            "interval_start_time": convert_date_format(start),
+            "interval_end_time": convert_date_format(end),
+            "kubernetes_objects": [kubernetes_object]
+        }
+
+# Read a results csv once into string columns; empty cells stay as empty strings and blank rows are dropped
+def read_results_csv(csv_file_path):
+    df = pd.read_csv(csv_file_path, dtype=str, keep_default_na=False)
+    return df[(df != "").any(axis=1)].copy()
+
 # Create results json for container experiment from csv
 def create_json_from_csv(csv_file_path, outputjsonfile):
 
@@ -436,865 +563,516 @@ def create_json_from_csv(csv_file_path, outputjsonfile):
     if os.path.exists(outputjsonfile):
         os.remove(outputjsonfile)
 
-    # Define the list that will hold the final JSON data
-    json_data = []
-
-    # Create an empty list to hold the deployments
-    deployments = []
-    mebibyte = 1048576
+    json_data = list(container_results_from_frame(read_results_csv(csv_file_path)))
 
-    with open(csv_file_path, 'r') as csvfile:
-        csvreader = csv.DictReader(csvfile)
-
-        for row in csvreader:
-            container_metrics_all = {}
-            container_metrics = []
-
-	## Hardcoding for tfb-results and demo benchmark. Updating them only if these columns are not available.
-        ## Keep this until the metrics queries are fixed in benchmark to get the below column data
-            columns_tocheck = [ "image_name" , "container_name" , "k8_object_type" , "k8_object_name" , "namespace" , "cluster_name" ]
-            image_name = "kruize/tfb-qrh:2.9.1.F"
-            container_name = "tfb-server"
-            k8_object_type = "deployment"
-            k8_object_name = "tfb-qrh-sample-0"
-            namespace = "tfb-perf"
-            cluster_name = "e23-alias"
-
-            for col in columns_tocheck:
-                if col not in row:
-                    if col == "image_name":
-                        row[col] = image_name
-                    elif col == "container_name":
-                        row[col] = container_name
-                    elif col == "k8_object_type":
-                        row[col] = k8_object_type
-                    elif col == "k8_object_name":
-                        row[col] = k8_object_name
-                    elif col == "namespace":
-                        row[col] = namespace
-                    elif col == "cluster_name":
-                        row[col] = cluster_name
-
-            if row["cpu_request_container_avg"]:
-                container_metrics.append({
-			"name": "cpuRequest",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["cpu_request_container_sum"]),
-                                "avg": float(row["cpu_request_container_avg"]),
-                                "format": "cores"
-                                }
-                            }
-			})
-            if row["cpu_limit_container_avg"]:
-                container_metrics.append({
-			"name" : "cpuLimit",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["cpu_limit_container_sum"]),
-                                "avg": float(row["cpu_limit_container_avg"]),
-                                "format": "cores"
-                                }
-                            }
-                        })
-            if row["cpu_throttle_container_max"]:
-                container_metrics.append({
-			"name" : "cpuThrottle",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["cpu_throttle_container_sum"]),
-                                "max": float(row["cpu_throttle_container_max"]),
-                                "avg": float(row["cpu_throttle_container_avg"]),
-                                "format": "cores"
-                                }
-                            }
-                        })
-            if row["cpu_usage_container_avg"]:
-                container_metrics.append({
-                    "name" : "cpuUsage",
-                    "results": {
-                        "aggregation_info": {
-                            "sum": float(row["cpu_usage_container_sum"]),
-                            "min": float(row["cpu_usage_container_min"]),
-                            "max": float(row["cpu_usage_container_max"]),
-                            "avg": float(row["cpu_usage_container_avg"]),
-                            "format": "cores"
-                            }
-                        }
-                    })
-            if row["memory_request_container_avg"]:
-                container_metrics.append({
-			"name" : "memoryRequest",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["memory_request_container_sum"])/mebibyte,
-                                "avg": float(row["memory_request_container_avg"])/mebibyte,
-                                "format": "MiB"
-                                }
-                            }
-                        })
-            if row["memory_limit_container_avg"]:
-                container_metrics.append({
-			"name" : "memoryLimit",
-                        "results": {
-                            "aggregation_info": {
-                                "sum": float(row["memory_limit_container_sum"])/mebibyte,
-                                "avg": float(row["memory_limit_container_avg"])/mebibyte,
-                                "format": "MiB"
-                                }
-                            }
-                        })
-            if row["memory_usage_container_avg"]:
-                container_metrics.append({
-                        "name" : "memoryUsage",
-                        "results": {
-                            "aggregation_info": {
-                                "min": float(row["memory_usage_container_min"])/mebibyte,
-                                "max": float(row["memory_usage_container_max"])/mebibyte,
-                                "sum": float(row["memory_usage_container_sum"])/mebibyte,
-                                "avg": float(row["memory_usage_container_avg"])/mebibyte,
-                                "format": "MiB"
-                                }
-                            }
-                        })   
-            if row["memory_usage_container_avg"]:
-                container_metrics.append({
-                        "name" : "memoryRSS",
-                        "results": {
-                            "aggregation_info": {
-                                "min": float(row["memory_rss_usage_container_min"])/mebibyte,
-                                "max": float(row["memory_rss_usage_container_max"])/mebibyte,
-                                "sum": float(row["memory_rss_usage_container_sum"])/mebibyte,
-                                "avg": float(row["memory_rss_usage_container_avg"])/mebibyte,
-                                "format": "MiB"
-                                }
-                            }
-                        })
-            if "accelerator_core_usage_percentage_max" in row and row["accelerator_core_usage_percentage_max"]:
-                if "node" in row and row["node"]:
-                    container_metrics.append({
-                        "name" : "acceleratorCoreUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"],
-                                "node": row["node"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_core_usage_percentage_min"]),
-                                "max": float(row["accelerator_core_usage_percentage_max"]),
-                                "avg": float(row["accelerator_core_usage_percentage_avg"]),
-                                "format": "percentage"
-                                }
-                            }
-                        })
-                else:
-                    container_metrics.append({
-                        "name" : "acceleratorCoreUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_core_usage_percentage_min"]),
-                                "max": float(row["accelerator_core_usage_percentage_max"]),
-                                "avg": float(row["accelerator_core_usage_percentage_avg"]),
-                                "format": "percentage"
-                                }
-                            }
-                        })
-
-            if "accelerator_memory_copy_percentage_max" in row and row["accelerator_memory_copy_percentage_max"]:
-                if "node" in row and row["node"]:
-                    container_metrics.append({
-                        "name" : "acceleratorMemoryUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"],
-                                "node": row["node"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_memory_copy_percentage_min"]),
-                                "max": float(row["accelerator_memory_copy_percentage_max"]),
-                                "avg": float(row["accelerator_memory_copy_percentage_avg"]),
-                                "format": "percentage"
-                                }
-                            }
-                        })
-                else:
-                    container_metrics.append({
-                        "name" : "acceleratorMemoryUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_memory_copy_percentage_min"]),
-                                "max": float(row["accelerator_memory_copy_percentage_max"]),
-                                "avg": float(row["accelerator_memory_copy_percentage_avg"]),
-                                "format": "percentage"
-                                }
-                            }
-                        })
-            if "accelerator_frame_buffer_usage_max" in row and row["accelerator_frame_buffer_usage_max"]:
-                if "node" in row and row["node"]:
-                    container_metrics.append({
-                        "name" : "acceleratorFrameBufferUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"],
-                                "node": row["node"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_frame_buffer_usage_min"]),
-                                "max": float(row["accelerator_frame_buffer_usage_max"]),
-                                "avg": float(row["accelerator_frame_buffer_usage_avg"]),
-                                "format": "percentage"
-                                }
-                            }
-                        })
-                else:
-                    container_metrics.append({
-                        "name" : "acceleratorFrameBufferUsage",
-                        "results": {
-                            "metadata": {
-                                "accelerator_model_name": row["accelerator_model_name"]
-                            },
-                            "aggregation_info": {
-                                "min": float(row["accelerator_frame_buffer_usage_min"]),
-                                "max": float(row["accelerator_frame_buffer_usage_max"]),
-                                "avg": float(row["accelerator_frame_buffer_usage_avg"]),
-                                "format": "percentage"
-                                }
-                            }
-                        })
-
-
-            # Create a dictionary to hold the container information
-            container = {
-                "container_image_name": row["image_name"],
-                "container_name": row["container_name"],
-                "metrics": container_metrics
-            }
-
-            # Create a list to hold the containers
-            containers = [container]
-
-            # Create a dictionary to hold the deployment information
-            kubernetes_object = {
-                "type": row["k8_object_type"],
-                "name": row["k8_object_name"],
-                "namespace": row["namespace"],
-                "containers": containers
-            }
-            kubernetes_objects = [kubernetes_object]
+    with open(outputjsonfile, "w") as json_file:
+        json.dump(json_data, json_file)
 
-            # Create a dictionary to hold the experiment data
-            experiment = {
-                "version": "1.0",
-                "experiment_name": row["container_name"] + '|' + row["k8_object_name"] + '|' + row["k8_object_type"] + '|' + row["namespace"] + '|' + row["cluster_name"],
-                "interval_start_time": convert_date_format(row["start_timestamp"]),
-                "interval_end_time": convert_date_format(row["end_timestamp"]),
-                "kubernetes_objects": kubernetes_objects
-            }
+NAMESPACE_METRICS_FIELDNAMES = [
+    'experiment_name', 'namespace', 'timezone', 'namespaceCpuRequest_sum', 'namespaceCpuLimit_sum',
+    'namespaceMemoryRequest_sum', 'namespaceMemoryLimit_sum', 'namespaceCpuUsage_avg', 'namespaceCpuUsage_min',
+    'namespaceCpuUsage_max', 'namespaceCpuThrottle_avg', 'namespaceCpuThrottle_min', 'namespaceCpuThrottle_max',
+    'namespaceMemoryRSS_avg', 'namespaceMemoryRSS_min', 'namespaceMemoryRSS_max', 'namespaceMemoryUsage_avg',
+    'namespaceMemoryUsage_min', 'namespaceMemoryUsage_max', 'cost_short_term_cpu_requests',
+    'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits',
+    'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits',
+    'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests',
+    'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation',
+    'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation',
+    'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation',
+    'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation',
+    'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation',
+    'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation',
+    'cost_long_term_memory_limits_variation', 'performance_short_term_cpu_requests',
+    'performance_short_term_memory_requests', 'performance_short_term_cpu_limits',
+    'performance_short_term_memory_limits', 'performance_medium_term_cpu_requests',
+    'performance_medium_term_memory_requests', 'performance_medium_term_cpu_limits',
+    'performance_medium_term_memory_limits', 'performance_long_term_cpu_requests',
+    'performance_long_term_memory_requests', 'performance_long_term_cpu_limits', 'performance_long_term_memory_limits',
+    'performance_short_term_cpu_requests_variation', 'performance_short_term_memory_requests_variation',
+    'performance_short_term_cpu_limits_variation', 'performance_short_term_memory_limits_variation',
+    'performance_medium_term_cpu_requests_variation', 'performance_medium_term_memory_requests_variation',
+    'performance_medium_term_cpu_limits_variation', 'performance_medium_term_memory_limits_variation',
+    'performance_long_term_cpu_requests_variation', 'performance_long_term_memory_requests_variation',
+    'performance_long_term_cpu_limits_variation', 'performance_long_term_memory_limits_variation',
+    'namespaceCpuUsage_format', 'namespaceMemoryUsage_format'
+]
+
+CONTAINER_METRICS_FIELDNAMES = [
+    'experiment_name', 'namespace', 'type', 'name', 'container_name', 'timezone', 'cpuUsage_sum', 'cpuUsage_avg',
+    'cpuUsage_max', 'cpuUsage_min', 'cpuThrottle_sum', 'cpuThrottle_avg', 'cpuThrottle_max', 'cpuRequest_sum',
+    'cpuRequest_avg', 'cpuLimit_sum', 'cpuLimit_avg', 'memoryRSS_sum', 'memoryRSS_avg', 'memoryRSS_max',
+    'memoryRSS_min', 'memoryUsage_sum', 'memoryUsage_avg', 'memoryUsage_max', 'memoryUsage_min', 'memoryRequest_sum',
+    'memoryRequest_avg', 'memoryLimit_sum', 'memoryLimit_avg', 'cost_short_term_cpu_requests',
+    'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits',
+    'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits',
+    'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests',
+    'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation',
+    'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation',
+    'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation',
+    'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation',
+    'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation',
+    'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation',
+    'cost_long_term_memory_limits_variation', 'performance_short_term_cpu_requests',
+    'performance_short_term_memory_requests', 'performance_short_term_cpu_limits',
+    'performance_short_term_memory_limits', 'performance_medium_term_cpu_requests',
+    'performance_medium_term_memory_requests', 'performance_medium_term_cpu_limits',
+    'performance_medium_term_memory_limits', 'performance_long_term_cpu_requests',
+    'performance_long_term_memory_requests', 'performance_long_term_cpu_limits', 'performance_long_term_memory_limits',
+    'performance_short_term_cpu_requests_variation', 'performance_short_term_memory_requests_variation',
+    'performance_short_term_cpu_limits_variation', 'performance_short_term_memory_limits_variation',
+    'performance_medium_term_cpu_requests_variation', 'performance_medium_term_memory_requests_variation',
+    'performance_medium_term_cpu_limits_variation', 'performance_medium_term_memory_limits_variation',
+    'performance_long_term_cpu_requests_variation', 'performance_long_term_memory_requests_variation',
+    'performance_long_term_cpu_limits_variation', 'performance_long_term_memory_limits_variation', 'cpuUsage_format',
+    'memoryUsage_format'
+]
+
+# Added to the container metrics csv if the experiment has accelerator metrics
+ACCELERATOR_METRICS_FIELDNAMES = [
+    'acceleratorFrameBufferUsage_min', 'acceleratorFrameBufferUsage_max', 'acceleratorFrameBufferUsage_avg',
+    'acceleratorMemoryUsage_min', 'acceleratorMemoryUsage_max', 'acceleratorMemoryUsage_avg',
+    'acceleratorCoreUsage_min', 'acceleratorCoreUsage_max', 'acceleratorCoreUsage_avg',
+    'cost_short_term_accelerator_limits', 'cost_medium_term_accelerator_limits', 'cost_long_term_accelerator_limits',
+    'performance_short_term_accelerator_limits', 'performance_medium_term_accelerator_limits',
+    'performance_long_term_accelerator_limits'
+]
+
+RECOMMENDATIONS_FIELDNAMES = [
+    'experiment_name', 'cluster_name', 'namespace', 'type', 'name', 'container_name', 'timezone',
+    'current_cpu_requests', 'current_memory_requests', 'current_cpu_limits', 'current_memory_limits',
+    'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits',
+    'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests',
+    'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests',
+    'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits',
+    'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation',
+    'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation',
+    'cost_medium_term_cpu_requests_variation', 'cost_medium_term_memory_requests_variation',
+    'cost_medium_term_cpu_limits_variation', 'cost_medium_term_memory_limits_variation',
+    'cost_long_term_cpu_requests_variation', 'cost_long_term_memory_requests_variation',
+    'cost_long_term_cpu_limits_variation', 'cost_long_term_memory_limits_variation',
+    'performance_short_term_cpu_requests', 'performance_short_term_memory_requests',
+    'performance_short_term_cpu_limits', 'performance_short_term_memory_limits', 'performance_medium_term_cpu_requests',
+    'performance_medium_term_memory_requests', 'performance_medium_term_cpu_limits',
+    'performance_medium_term_memory_limits', 'performance_long_term_cpu_requests',
+    'performance_long_term_memory_requests', 'performance_long_term_cpu_limits', 'performance_long_term_memory_limits',
+    'performance_short_term_cpu_requests_variation', 'performance_short_term_memory_requests_variation',
+    'performance_short_term_cpu_limits_variation', 'performance_short_term_memory_limits_variation',
+    'performance_medium_term_cpu_requests_variation', 'performance_medium_term_memory_requests_variation',
+    'performance_medium_term_cpu_limits_variation', 'performance_medium_term_memory_limits_variation',
+    'performance_long_term_cpu_requests_variation', 'performance_long_term_memory_requests_variation',
+    'performance_long_term_cpu_limits_variation', 'performance_long_term_memory_limits_variation',
+    'cost_short_term_cpu_requests_format', 'cost_short_term_memory_requests_format',
+    'cost_short_term_cpu_limits_format', 'cost_short_term_memory_limits_format', 'cost_medium_term_cpu_requests_format',
+    'cost_medium_term_memory_requests_format', 'cost_medium_term_cpu_limits_format',
+    'cost_medium_term_memory_limits_format', 'cost_long_term_cpu_requests_format',
+    'cost_long_term_memory_requests_format', 'cost_long_term_cpu_limits_format', 'cost_long_term_memory_limits_format'
+]
+
+# Columns of the flattened rows that are not in the metrics csvs
+METRICS_IGNORED_COLUMNS = ['cluster_name']
+
+# Box plot columns of a term: its time zone and the quartiles of each resource for each of its datapoints
+PLOT_TERMS = [("short_term", "st", 4), ("medium_term", "mt", 7), ("long_term", "lt", 15)]
+PLOT_RESOURCES = {"cpuUsage": "cpu", "memoryUsage": "mem"}
+PLOT_STATS = ["min", "q1", "median", "q3", "max"]
+BOXPLOT_COLUMNS = [column for term, prefix, datapoints in PLOT_TERMS for datapoint in range(1, datapoints + 1)
+                   for column in [term + '_tz' + str(datapoint)] +
+                   [prefix + '_tz' + str(datapoint) + '_' + resource + '_' + stat
+                    for resource in PLOT_RESOURCES.values() for stat in PLOT_STATS]]
+NAMESPACE_BOXPLOT_FIELDNAMES = ['cluster_name', 'experiment_name', 'namespace', 'timezone'] + BOXPLOT_COLUMNS
+CONTAINER_BOXPLOT_FIELDNAMES = ['cluster_name', 'experiment_name', 'type', 'name', 'namespace', 'container_name', 'timezone'] + BOXPLOT_COLUMNS
+
+# Keys of the containers (or namespaces) of a kubernetes object and of the columns identifying them
+UNIT_KEYS = {"container": "containers", "namespace": "namespaces"}
+KOBJ_IDENTITY_COLUMNS = {"container": ['type', 'name', 'namespace'], "namespace": []}
+UNIT_IDENTITY_COLUMNS = {"container": ['container_name'], "namespace": ['namespace']}
+
+# Returns the value at the path of keys in a json, an empty dict if any of the keys is missing
+def json_path(data, path):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return {}
+        data = data[key]
+    return data
+
+# The containers of a container experiment or the namespaces of a namespace experiment, listExperiments
+# returns them by name while listRecommendations returns a list
+def experiment_units(kobj, experiment_type):
+    units = kobj[UNIT_KEYS[experiment_type]]
+    return units.values() if isinstance(units, dict) else units
+
+def unit_identity(experiment_name, kobj, unit, experiment_type):
+    identity = {'experiment_name': experiment_name}
+    identity.update({column: kobj[column] for column in KOBJ_IDENTITY_COLUMNS[experiment_type]})
+    identity.update({column: unit[column] for column in UNIT_IDENTITY_COLUMNS[experiment_type]})
+    return identity
+
+# Builds the rows of a container (or namespace) from the columns of each of its time zones, as a list with
+# a timezone => columns dict per source. The time zones of the rows are the ones of the first source, a
+# container without time zones gets a row with only the columns identifying it.
+def unit_rows(identity, cluster_name, source_columns):
+    if not source_columns[0]:
+        yield identity
+        return
+    for timezone, columns in source_columns[0].items():
+        row = dict(identity, cluster_name=cluster_name, timezone=timezone)
+        row.update(columns)
+        for other_columns in source_columns[1:]:
+            row.update(other_columns.get(timezone, {}))
+        yield row
+
+# Walks the listExperiments or listRecommendations json of the experiments once and yields a flat row for each
+# container (or namespace) and time zone. Each source is a path of keys in the container to a timezone => data
+# json and a function returning the columns of the data of a time zone.
+def flatten_experiments(experiments, experiment_type, sources):
+    for experiment in experiments:
+        for kobj in experiment["kubernetes_objects"]:
+            for unit in experiment_units(kobj, experiment_type):
+                source_columns = [{timezone: fields(timezone_data) for timezone, timezone_data in json_path(unit, path).items()}
+                                  for path, fields in sources]
+                identity = unit_identity(experiment["experiment_name"], kobj, unit, experiment_type)
+                yield from unit_rows(identity, experiment.get("cluster_name"), source_columns)
+
+JSON_DEPTH_CHANGES = {'start_map': 1, 'start_array': 1, 'end_map': -1, 'end_array': -1}
+
+# Yields (path, value) for the values of a json file at the paths matching one of the patterns, as a tuple of
+# keys where '*' matches any key or array item. A matched value is built on its own, so only one of them is in
+# memory at a time, and (path, None) is yielded at the end of the values matching one of the end_patterns.
+def stream_json_values(jsonfile, patterns, end_patterns=()):
+    def matches(path, pattern_list):
+        return any(len(path) == len(pattern) and all(key == '*' or key == path_key for key, path_key in zip(pattern, path))
+                   for pattern in pattern_list)
+
+    path = []
+    events = iter(ijson.basic_parse(jsonfile, use_float=True))
+    for event, value in events:
+        if event == 'map_key':
+            path[-1] = value
+            continue
+        if event in ('end_map', 'end_array'):
+            path.pop()
+            if path and matches(path, end_patterns):
+                yield tuple(path), None
+            continue
+        if matches(path, patterns):
+            if event in ('start_map', 'start_array'):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                depth = 1
+                while depth:
+                    event, value = next(events)
+                    depth += JSON_DEPTH_CHANGES.get(event, 0)
+                    builder.event(event, value)
+                value = builder.value
+            yield tuple(path), value
+        elif event in ('start_map', 'start_array'):
+            path.append(None)
+
+# Yields the rows of flatten_experiments for the experiments of a listExperiments or listRecommendations json file,
+# parsing it incrementally. Only the data of one time zone is built at a time, and the containers of a kubernetes
+# object are kept until it ends, as the keys identifying them may come after the containers in the json. The rows
+# are yielded at the end of the kubernetes object once the experiment_name and cluster_name are known, otherwise
+# at the end of the experiment.
+def stream_experiments(filename, experiment_type, sources):
+    kobj_pattern = ('*', 'kubernetes_objects', '*')
+    unit_pattern = kobj_pattern + (UNIT_KEYS[experiment_type], '*')
+    patterns = [('*', 'experiment_name'), ('*', 'cluster_name')]
+    patterns += [kobj_pattern + (column,) for column in KOBJ_IDENTITY_COLUMNS[experiment_type]]
+    patterns += [unit_pattern + (column,) for column in UNIT_IDENTITY_COLUMNS[experiment_type]]
+    source_patterns = [unit_pattern + tuple(path) + ('*',) for path, fields in sources]
+
+    def kobj_rows(kobj, units):
+        for unit, source_columns in units:
+            identity = unit_identity(experiment.get("experiment_name"), kobj, unit, experiment_type)
+            yield from unit_rows(identity, experiment.get("cluster_name"), source_columns)
+
+    experiment, kobj, unit = {}, {}, {}
+    units, pending_kobjs = [], []
+    source_columns = [{} for source in sources]
+    with open(filename, 'rb') as jsonfile:
+        for path, value in stream_json_values(jsonfile, patterns + source_patterns, [('*',), kobj_pattern, unit_pattern]):
+            if len(path) == len(unit_pattern) and value is None:
+                units.append((unit, source_columns))
+                unit, source_columns = {}, [{} for source in sources]
+            elif len(path) == len(kobj_pattern) and value is None:
+                pending_kobjs.append((kobj, units))
+                kobj, units = {}, []
+                if "experiment_name" in experiment and "cluster_name" in experiment:
+                    for pending_kobj, pending_units in pending_kobjs:
+                        yield from kobj_rows(pending_kobj, pending_units)
+                    pending_kobjs = []
+            elif len(path) == 1:
+                for pending_kobj, pending_units in pending_kobjs:
+                    yield from kobj_rows(pending_kobj, pending_units)
+                # Only the first experiment of the json is flattened
+                return
+            elif len(path) == 2:
+                experiment[path[-1]] = value
+            elif len(path) == len(kobj_pattern) + 1:
+                kobj[path[-1]] = value
+            elif len(path) == len(unit_pattern) + 1:
+                unit[path[-1]] = value
+            else:
+                source = next(index for index, pattern in enumerate(source_patterns) if len(pattern) == len(path)
+                              and path[len(unit_pattern):-1] == pattern[len(unit_pattern):-1])
+                source_columns[source][path[-1]] = sources[source][1](value)
+
+# Columns of the aggregated metrics of a time zone, the format is kept only for the format_columns
+def metric_fields(metrics, format_columns):
+    row = {}
+    for metric_name, metric_data in metrics.items():
+        for agg_name, agg_value in metric_data["aggregation_info"].items():
+            column = metric_name + '_' + agg_name
+            if agg_name != "format" or column in format_columns:
+                row[column] = str(agg_value)
+    return row
+
+# Columns of the recommended config and variation of each term and engine of a time zone. With accelerator_columns
+# the name of a recommended accelerator is set instead of an amount, with formats the format of the amounts is added.
+def recommendation_fields(recommendation, accelerator_columns=False, formats=False):
+    row = {}
+    for term, term_data in recommendation.get("recommendation_terms", {}).items():
+        for engine, engine_data in term_data.get("recommendation_engines", {}).items():
+            for config, resources in engine_data.get("config", {}).items():
+                for resource, resource_data in resources.items():
+                    if accelerator_columns and resource not in ["cpu", "memory"]:
+                        row[engine + '_' + term + '_accelerator_' + config] = str(resource)
+                        continue
+                    column = engine + '_' + term + '_' + resource + '_' + config
+                    row[column] = str(resource_data["amount"])
+                    if formats and engine != "performance":
+                        row[column + '_format'] = str(resource_data["format"])
+            for config, resources in engine_data.get("variation", {}).items():
+                for resource, resource_data in resources.items():
+                    row[engine + '_' + term + '_' + resource + '_' + config + '_variation'] = str(resource_data["amount"])
+    return row
+
+# Columns of the current requests and limits of a time zone
+def current_fields(current):
+    row = {}
+    for current_data in current.values():
+        for config in ["requests", "limits"]:
+            for resource in ["cpu", "memory"]:
+                if resource in current_data.get(config, {}):
+                    row["current_" + resource + "_" + config] = str(current_data[config][resource]["amount"])
+    return row
+
+# Columns of the box plot quartiles of each term of a time zone, numbered by datapoint within the term
+def boxplot_fields(recommendation):
+    row = {}
+    prefixes = {term: prefix for term, prefix, datapoints in PLOT_TERMS}
+    for term, term_data in recommendation.get("recommendation_terms", {}).items():
+        if "plots" not in term_data or term not in prefixes:
+            continue
+        plots_data = term_data["plots"].get("plots_data", {})
+        for datapoint, (plot_timezone, plot_data) in enumerate(plots_data.items(), 1):
+            for resource_name, plot in plot_data.items():
+                if resource_name not in PLOT_RESOURCES:
+                    continue
+                row[term + '_tz' + str(datapoint)] = str(plot_timezone)
+                for stat in PLOT_STATS:
+                    row[prefixes[term] + '_tz' + str(datapoint) + '_' + PLOT_RESOURCES[resource_name] + '_' + stat] = str(plot[stat])
+    return row
+
+# Sorts the rows in chronological order of timezone in memory, writes them to output_file and appends them to
+# append_file. The optional_fieldnames are added to the header if one of the rows has a value for them, the
+# ignored_columns are dropped and any other column missing from the header raises ValueError.
+def write_sorted_rows(rows, fieldnames, output_file=None, append_file=None, optional_fieldnames=(), ignored_columns=()):
+    fieldnames = list(fieldnames)
+    rows = list(rows)
+    rows.sort(key=lambda row: row.get('timezone') or '')
+    optional_fieldnames = [column for column in optional_fieldnames if column not in fieldnames]
+    if any(row.get(column) is not None for row in rows for column in optional_fieldnames):
+        fieldnames.extend(optional_fieldnames)
+    for row in rows:
+        for column in ignored_columns:
+            row.pop(column, None)
+    # The csv text is formatted once for both files
+    text = io.StringIO(newline='')
+    writer = csv.DictWriter(text, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    for filename, mode in [(output_file, 'w'), (append_file, 'a')]:
+        if filename is None:
+            continue
+        with open(filename, mode, newline='') as csvfile:
+            csvfile.write(text.getvalue())
 
-            json_data.append(experiment)
+# Rows of the experiments of a json file, parsed incrementally if ijson is installed and the file is big
+def experiment_rows(filename, experiment_type, sources):
+    if ijson is not None and os.path.getsize(filename) >= STREAM_MIN_SIZE:
+        return stream_experiments(filename, experiment_type, sources)
+    with open(filename, 'r') as f:
+        # Only the first experiment of the json is flattened
+        experiments = json.load(f)[:1]
+    return flatten_experiments(experiments, experiment_type, sources)
+
+def namespace_metric_fields(timezone_data):
+    return metric_fields(timezone_data["metrics"], ["namespaceCpuUsage_format", "namespaceMemoryUsage_format"])
+
+def container_metric_fields(timezone_data):
+    return metric_fields(timezone_data["metrics"], ["cpuUsage_format", "memoryUsage_format"])
+
+def recommendation_with_current_fields(timezone_data):
+    row = current_fields(timezone_data.get("current", {}))
+    row.update(recommendation_fields(timezone_data, formats=True))
+    return row
+
+# Writes the rows of the experiment in a json file to its csv files, returns the name of the experiment
+def write_experiment_rows(filename, experiment_type, sources, fieldnames, output_file=None, append_file=None,
+                          optional_fieldnames=(), ignored_columns=()):
+    rows = experiment_rows(filename, experiment_type, sources)
+    first_row = next(rows, None)
+    if first_row is None:
+        print("No experiments found!")
+        return None
+    write_sorted_rows(itertools.chain([first_row], rows), fieldnames, output_file, append_file, optional_fieldnames, ignored_columns)
+    return first_row["experiment_name"]
 
-    with open(outputjsonfile, "w") as json_file:
-        json.dump(json_data, json_file)
+# Flattens the listRecommendations json of an experiment in memory, in chronological order of timezone
+def recommendation_rows(data):
+    # Only the first experiment of the json is flattened
+    rows = flatten_experiments(data[:1], "container", [(["recommendations", "data"], recommendation_with_current_fields)])
+    return sorted(rows, key=lambda row: row.get('timezone') or '')
 
 ## Get the metrics and recommendations data from listExperiments for namespace experiment_type
 def getNamespaceExperimentMetrics(filename):
-    with open(filename, 'r') as f:
-      data = json.load(f)
-    if not data:
-        print("No experiments found!")
-    else:
-        with open('experimentMetrics_temp.csv', 'w', newline='') as f:
-            fieldnames = ['experiment_name', 'namespace', 'timezone', 'namespaceCpuRequest_sum', 'namespaceCpuLimit_sum', 'namespaceMemoryRequest_sum', 'namespaceMemoryLimit_sum', 'namespaceCpuUsage_avg', 'namespaceCpuUsage_min', 'namespaceCpuUsage_max',  'namespaceCpuThrottle_avg', 'namespaceCpuThrottle_min', 'namespaceCpuThrottle_max', 'namespaceMemoryRSS_avg',  'namespaceMemoryRSS_min', 'namespaceMemoryRSS_max', 'namespaceMemoryUsage_avg',  'namespaceMemoryUsage_min', 'namespaceMemoryUsage_max', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'performance_short_term_cpu_requests', 'performance_short_term_memory_requests', 'performance_short_term_cpu_limits', 'performance_short_term_memory_limits', 'performance_medium_term_cpu_requests', 'performance_medium_term_memory_requests', 'performance_medium_term_cpu_limits', 'performance_medium_term_memory_limits', 'performance_long_term_cpu_requests', 'performance_long_term_memory_requests', 'performance_long_term_cpu_limits', 'performance_long_term_memory_limits', 'performance_short_term_cpu_requests_variation', 'performance_short_term_memory_requests_variation', 'performance_short_term_cpu_limits_variation', 'performance_short_term_memory_limits_variation', 'performance_medium_term_cpu_requests_variation' , 'performance_medium_term_memory_requests_variation', 'performance_medium_term_cpu_limits_variation' , 'performance_medium_term_memory_limits_variation', 'performance_long_term_cpu_requests_variation' , 'performance_long_term_memory_requests_variation', 'performance_long_term_cpu_limits_variation' , 'performance_long_term_memory_limits_variation', 'namespaceCpuUsage_format', 'namespaceMemoryUsage_format']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-
-            datadict = data[0]
-            for key, value in datadict.items():
-                if key == "experiment_name":
-                    experiment_name = value
-                if key == "kubernetes_objects":
-                    for kobj in value:
-                        namespaceNames = []
-                        namespace = kobj["namespace"]
-                        for namespace_name,namespace_data in kobj["namespaces"].items():
-                            namespaceName = namespace_data["namespace"]
-                            namespaceNames.append(namespaceName)
-                            if "results" in namespace_data:
-                                for timezone, timezone_data in namespace_data["results"].items():
-                                    kobj_dict = {
-                                            'experiment_name': experiment_name,
-                                            'namespace': kobj["namespace"],
-                                            'timezone': timezone
-                                            }
-                                    metric_dict = {}
-                                    recomm_dict = {}
-                                    for metric_name, metric_data in timezone_data["metrics"].items():
-                                        for agg_name, agg_value in metric_data["aggregation_info"].items():
-                                            metric_agg_var_name = metric_name + '_' + agg_name
-                                            if agg_name != "format":
-                                                metric_dict[metric_agg_var_name] = str(agg_value)
-                                            elif metric_agg_var_name == "namespaceCpuUsage_format" or metric_agg_var_name == "namespaceMemoryUsage_format":
-                                                metric_dict[metric_agg_var_name] = str(agg_value)
-                                    for recomm_timezone, recomm_data in namespace_data["recommendations"]["data"].items():
-                                        if recomm_timezone == timezone:
-                                            for recomm_type, recomm_typedata in recomm_data["recommendation_terms"].items():
-                                                if 'recommendation_engines' in recomm_typedata:
-                                                    for recomm_engine, recomm_enginedata in recomm_typedata["recommendation_engines"].items():
-                                                        if "config" in recomm_enginedata:
-                                                            for recomm_config, recomm_configmetrics in recomm_enginedata["config"].items():
-                                                                for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                                                    recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config
-                                                                    recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                                                        if "variation" in recomm_enginedata:
-                                                            for recomm_config, recomm_configmetrics in recomm_enginedata["variation"].items():
-                                                                for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                                                    recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config + '_variation'
-                                                                    recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                                    kobj_dict.update(metric_dict)
-                                    kobj_dict.update(recomm_dict)
-                                    writer.writerow(kobj_dict)
-                            else:
-                                kobj_dict = {
-                                            'experiment_name': experiment_name,
-                                            'namespace': kobj["namespace"]
-                                            }
-                                writer.writerow(kobj_dict)
-
-        # Sort the data in chronological order of timezone
-        with open('experimentMetrics_temp.csv', 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            Edata = list(reader)
-        data_sorted = sorted(Edata, key=lambda x: x['timezone'])
-        with open('experimentMetrics_sorted.csv', 'w', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
-
-        # Write the sorted data back to the CSV file
-        with open('experimentOutput.csv', 'a', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
+    write_experiment_rows(filename, "namespace", [(["results"], namespace_metric_fields),
+                                                  (["recommendations", "data"], recommendation_fields)],
+                          NAMESPACE_METRICS_FIELDNAMES, 'experimentMetrics_sorted.csv', 'experimentOutput.csv',
+                          ignored_columns=METRICS_IGNORED_COLUMNS)
 
 
 ## Get the metrics and recommendations data from listExperiments
 def getExperimentMetrics(filename):
-    with open(filename, 'r') as f:
-      data = json.load(f)
-    if not data:
-        print("No experiments found!")
-    else:
-        with open('experimentMetrics_temp.csv', 'w', newline='') as f:
-            datadict = data[0]
-            containsAcceleratordata=False
-
-            ## Check if it has GPU recommendations
-            for key, value in datadict.items():
-                if key == "kubernetes_objects":
-                    for kobj in value:
-                        for container_name,container_data in kobj["containers"].items():
-                            if "results" in container_data:
-                                for timezone, timezone_data in container_data["results"].items():
-                                    for metric_name, metric_data in timezone_data["metrics"].items():
-                                        if metric_name in ["acceleratorCoreUsage", "acceleratorMemoryUsage", "acceleratorFrameBufferUsage"]:
-                                            containsAcceleratordata=True
-                                            break
-
-            fieldnames = [
-                    'experiment_name', 'namespace', 'type', 'name', 'container_name', 'timezone',
-                    'cpuUsage_sum', 'cpuUsage_avg', 'cpuUsage_max', 'cpuUsage_min',
-                    'cpuThrottle_sum', 'cpuThrottle_avg', 'cpuThrottle_max',
-                    'cpuRequest_sum', 'cpuRequest_avg',
-                    'cpuLimit_sum', 'cpuLimit_avg',
-                    'memoryRSS_sum', 'memoryRSS_avg', 'memoryRSS_max', 'memoryRSS_min',
-                    'memoryUsage_sum', 'memoryUsage_avg', 'memoryUsage_max', 'memoryUsage_min',
-                    'memoryRequest_sum', 'memoryRequest_avg',
-                    'memoryLimit_sum', 'memoryLimit_avg',
-                    # Cost fields
-                    'cost_short_term_cpu_requests', 'cost_short_term_memory_requests',
-                    'cost_short_term_cpu_limits', 'cost_short_term_memory_limits',
-                    'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests',
-                    'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits',
-                    'cost_long_term_cpu_requests', 'cost_long_term_memory_requests',
-                    'cost_long_term_cpu_limits', 'cost_long_term_memory_limits',
-
-                    # Cost variation fields
-                    'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation',
-                    'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation',
-                    'cost_medium_term_cpu_requests_variation', 'cost_medium_term_memory_requests_variation',
-                    'cost_medium_term_cpu_limits_variation', 'cost_medium_term_memory_limits_variation',
-                    'cost_long_term_cpu_requests_variation', 'cost_long_term_memory_requests_variation',
-                    'cost_long_term_cpu_limits_variation', 'cost_long_term_memory_limits_variation',
-
-                    # Performance fields
-                    'performance_short_term_cpu_requests', 'performance_short_term_memory_requests',
-                    'performance_short_term_cpu_limits', 'performance_short_term_memory_limits',
-                    'performance_medium_term_cpu_requests', 'performance_medium_term_memory_requests',
-                    'performance_medium_term_cpu_limits', 'performance_medium_term_memory_limits',
-                    'performance_long_term_cpu_requests', 'performance_long_term_memory_requests',
-                    'performance_long_term_cpu_limits', 'performance_long_term_memory_limits',
-
-                    # Performance variation fields
-                    'performance_short_term_cpu_requests_variation', 'performance_short_term_memory_requests_variation',
-                    'performance_short_term_cpu_limits_variation', 'performance_short_term_memory_limits_variation',
-                    'performance_medium_term_cpu_requests_variation', 'performance_medium_term_memory_requests_variation',
-                    'performance_medium_term_cpu_limits_variation', 'performance_medium_term_memory_limits_variation',
-                    'performance_long_term_cpu_requests_variation', 'performance_long_term_memory_requests_variation',
-                    'performance_long_term_cpu_limits_variation', 'performance_long_term_memory_limits_variation',
-
-                    # Final formatting fields
-                    'cpuUsage_format', 'memoryUsage_format'
-                    ]
-            # Additional GPU-related fields
-            accelerator_fields = [
-                    'acceleratorFrameBufferUsage_min', 'acceleratorFrameBufferUsage_max', 'acceleratorFrameBufferUsage_avg',
-                    'acceleratorMemoryUsage_min', 'acceleratorMemoryUsage_max', 'acceleratorMemoryUsage_avg',
-                    'acceleratorCoreUsage_min', 'acceleratorCoreUsage_max', 'acceleratorCoreUsage_avg',
-
-                    # Cost and performance GPU fields
-                    'cost_short_term_accelerator_limits', 'cost_medium_term_accelerator_limits', 'cost_long_term_accelerator_limits',
-                    'performance_short_term_accelerator_limits', 'performance_medium_term_accelerator_limits', 'performance_long_term_accelerator_limits'
-                    ]
-            # Conditionally extend the field list with GPU data
-            if containsAcceleratordata:
-                fieldnames.extend(accelerator_fields)
-
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-
-
-            for key, value in datadict.items():
-                if key == "experiment_name":
-                    experiment_name = value
-                if key == "kubernetes_objects":
-                    for kobj in value:
-                        containerNames=[]
-                        k8ObjectName = ""
-                        namespace = ""
-                        k8ObjectType = ""
-                        k8ObjectName = kobj["name"]
-                        namespace = kobj["namespace"]
-                        k8ObjectType = kobj["type"]
-                        for container_name,container_data in kobj["containers"].items():
-                            containerName = container_data["container_name"]
-                            containerNames.append(containerName)
-                            if "results" in container_data:
-                                for timezone, timezone_data in container_data["results"].items():
-                                    kobj_dict = {
-                                            'experiment_name': experiment_name,
-                                            'type': kobj["type"],
-                                            'name': kobj["name"],
-                                            'namespace': kobj["namespace"],
-                                            'container_name': container_data["container_name"],
-                                            'timezone': timezone,
-                                            }
-                                    metric_dict = {}
-                                    recomm_dict = {}
-                                    for metric_name, metric_data in timezone_data["metrics"].items():
-                                        for agg_name, agg_value in metric_data["aggregation_info"].items():
-                                            metric_agg_var_name = metric_name + '_' + agg_name
-                                            if agg_name != "format":
-                                                metric_dict[metric_agg_var_name] = str(agg_value)
-                                            elif metric_agg_var_name == "cpuUsage_format" or metric_agg_var_name == "memoryUsage_format":
-                                                metric_dict[metric_agg_var_name] = str(agg_value)
-                                    for recomm_timezone, recomm_data in container_data["recommendations"]["data"].items():
-                                        if recomm_timezone == timezone:
-                                            for recomm_type, recomm_typedata in recomm_data["recommendation_terms"].items():
-                                                if 'recommendation_engines' in recomm_typedata:
-                                                    for recomm_engine, recomm_enginedata in recomm_typedata["recommendation_engines"].items():
-                                                        if "config" in recomm_enginedata:
-                                                            for recomm_config, recomm_configmetrics in recomm_enginedata["config"].items():
-                                                                for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                                                    if recomm_resource not in ["cpu", "memory"]:
-                                                                        recomm_var_name = recomm_engine + '_' + recomm_type + '_accelerator_' + recomm_config
-                                                                        recomm_dict[recomm_var_name] = str(recomm_resource)
-                                                                    else:
-                                                                        recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config
-                                                                        recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                                                        if "variation" in recomm_enginedata:
-                                                            for recomm_config, recomm_configmetrics in recomm_enginedata["variation"].items():
-                                                                for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                                                    recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config + '_variation'
-                                                                    recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                                    kobj_dict.update(metric_dict)
-                                    kobj_dict.update(recomm_dict)
-                                    writer.writerow(kobj_dict)
-                            else:
-                                kobj_dict = {
-                                            'experiment_name': experiment_name,
-                                            'type': kobj["type"],
-                                            'name': kobj["name"],
-                                            'namespace': kobj["namespace"],
-                                            'container_name': container_data["container_name"],
-                                            }
-                                writer.writerow(kobj_dict)
-                                
-        # Sort the data in chronological order of timezone
-        with open('experimentMetrics_temp.csv', 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            Edata = list(reader)
-        data_sorted = sorted(Edata, key=lambda x: x['timezone'])
-        with open('experimentMetrics_sorted.csv', 'w', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
-
-        # Write the sorted data back to the CSV file
-        with open('experimentOutput.csv', 'a', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
+    # The GPU columns are added only if the experiment has GPU metrics or recommendations
+    write_experiment_rows(filename, "container", [(["results"], container_metric_fields),
+                                                  (["recommendations", "data"], lambda timezone_data: recommendation_fields(timezone_data, accelerator_columns=True))],
+                          CONTAINER_METRICS_FIELDNAMES, 'experimentMetrics_sorted.csv', 'experimentOutput.csv',
+                          optional_fieldnames=ACCELERATOR_METRICS_FIELDNAMES, ignored_columns=METRICS_IGNORED_COLUMNS)
 
 
 def get_recommondations(filename):
-    with open(filename, 'r') as f:
-      data = json.load(f)
-    if not data:
-        print("No experiments found!")
-    else:
-        with open('experimentRecommendations_temp.csv', 'w', newline='') as f:
-            fieldnames = ['experiment_name', 'cluster_name', 'namespace', 'type', 'name', 'container_name', 'timezone', 'current_cpu_requests', 'current_memory_requests', 'current_cpu_limits', 'current_memory_limits', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'performance_short_term_cpu_requests', 'performance_short_term_memory_requests', 'performance_short_term_cpu_limits', 'performance_short_term_memory_limits', 'performance_medium_term_cpu_requests', 'performance_medium_term_memory_requests', 'performance_medium_term_cpu_limits', 'performance_medium_term_memory_limits', 'performance_long_term_cpu_requests', 'performance_long_term_memory_requests', 'performance_long_term_cpu_limits', 'performance_long_term_memory_limits', 'performance_short_term_cpu_requests_variation', 'performance_short_term_memory_requests_variation', 'performance_short_term_cpu_limits_variation', 'performance_short_term_memory_limits_variation', 'performance_medium_term_cpu_requests_variation' , 'performance_medium_term_memory_requests_variation', 'performance_medium_term_cpu_limits_variation' , 'performance_medium_term_memory_limits_variation', 'performance_long_term_cpu_requests_variation' , 'performance_long_term_memory_requests_variation', 'performance_long_term_cpu_limits_variation' , 'performance_long_term_memory_limits_variation', 'cost_short_term_cpu_requests_format', 'cost_short_term_memory_requests_format', 'cost_short_term_cpu_limits_format', 'cost_short_term_memory_limits_format', 'cost_medium_term_cpu_requests_format' , 'cost_medium_term_memory_requests_format', 'cost_medium_term_cpu_limits_format' , 'cost_medium_term_memory_limits_format', 'cost_long_term_cpu_requests_format' , 'cost_long_term_memory_requests_format', 'cost_long_term_cpu_limits_format' , 'cost_long_term_memory_limits_format' ]
-
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            experiment_name = ""
-            datadict = data[0]
-
-            experiment_name = datadict["experiment_name"]
-            for key, value in datadict.items():
-                if key == "experiment_name":
-                    print("experiment_name = ", value)
-                    experiment_name = value
-                if key == "cluster_name":
-                    cluster_name = value
-                if key == "kubernetes_objects":
-                    for kobj in value:
-                        containerNames=[]
-                        k8ObjectName = ""
-                        namespace = ""
-                        k8ObjectType = ""
-                        k8ObjectName = kobj["name"]
-                        namespace = kobj["namespace"]
-                        k8ObjectType = kobj["type"]
-                        for index, container_data in enumerate(kobj["containers"]):
-                            containerName = container_data.get("container_name")
-                            containerNames.append(containerName)
-                            containerData = container_data.get("recommendations", {}).get("data", {})
-                            if not containerData:
-                                kobj_dict = {
-                                'experiment_name': experiment_name,
-                                'type': kobj["type"],
-                                'name': kobj["name"],
-                                'namespace': kobj["namespace"],
-                                'container_name': container_data["container_name"],
-                                }
-                                writer.writerow(kobj_dict)
-                            for timezone, timezone_data in containerData.items():
-                                kobj_dict = {
-                                'experiment_name': experiment_name,
-                                'cluster_name': cluster_name,
-                                'type': kobj["type"],
-                                'name': kobj["name"],
-                                'namespace': kobj["namespace"],
-                                'container_name': container_data["container_name"],
-                                'timezone': timezone,
-                                }
-                                recomm_dict = {}
-                                for current_resource, current_resourcedata in timezone_data["current"].items():
-                                    if 'requests' in current_resourcedata:
-                                        if 'cpu' in current_resourcedata["requests"]:
-                                            recomm_dict["current_cpu_requests"] = str(current_resourcedata["requests"]["cpu"]["amount"])
-                                        if 'memory' in current_resourcedata["requests"]:
-                                            recomm_dict["current_memory_requests"] = str(current_resourcedata["requests"]["memory"]["amount"])
-                                    if 'limits' in current_resourcedata:
-                                        if 'cpu' in current_resourcedata["limits"]:
-                                            recomm_dict["current_cpu_limits"] = str(current_resourcedata["limits"]["cpu"]["amount"])
-                                        if 'memory' in current_resourcedata["limits"]:
-                                            recomm_dict["current_memory_limits"] = str(current_resourcedata["limits"]["memory"]["amount"])
-
-
-                                for recomm_type, recomm_typedata in timezone_data["recommendation_terms"].items():
-                                    if 'recommendation_engines' in recomm_typedata:
-                                        for recomm_engine, recomm_enginedata in recomm_typedata["recommendation_engines"].items():
-                                            if "config" in recomm_enginedata:
-                                                for recomm_config, recomm_configmetrics in recomm_enginedata["config"].items():
-                                                    for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                                        recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config
-                                                        recomm_var_format = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config + '_format'
-                                                        recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                                                        if recomm_engine != "performance":
-                                                            recomm_dict[recomm_var_format] = str(recomm_resourcedata["format"])
-                                            if "variation" in recomm_enginedata:
-                                                for recomm_config, recomm_configmetrics in recomm_enginedata["variation"].items():
-                                                    for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                                        recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config +  '_variation'
-                                                        recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                                kobj_dict.update(recomm_dict)
-                                writer.writerow(kobj_dict)
-        # Sort the data in chronological order of timezone
-        with open('experimentRecommendations_temp.csv', 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            Edata = list(reader)
-        data_sorted = sorted(Edata, key=lambda x: x['timezone'])
-        
-        with open('experimentRecommendations_sorted_temp.csv', 'w', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
-
-        # Write the sorted data back to the CSV file
-        with open('experimentRecommendations.csv', 'a', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
-
-        os.remove('experimentRecommendations_temp.csv')
-        os.remove('experimentRecommendations_sorted_temp.csv')
-
-def getExperimentBoxPlots(filename, experiment_type):
-    with open(filename, 'r') as f:
-      data = json.load(f)
-    if not data:
-        print("No experiments found!")
-    else:
-        with open('experimentPlotData_temp.csv', 'w', newline='') as f:
-            if experiment_type == "namespace":
-                fieldnames = ['cluster_name', 'experiment_name', 'namespace', 'timezone', 'short_term_tz1' , 'st_tz1_cpu_min', 'st_tz1_cpu_q1', 'st_tz1_cpu_median', 'st_tz1_cpu_q3', 'st_tz1_cpu_max', 'st_tz1_mem_min', 'st_tz1_mem_q1', 'st_tz1_mem_median', 'st_tz1_mem_q3', 'st_tz1_mem_max', 'short_term_tz2', 'st_tz2_cpu_min', 'st_tz2_cpu_q1', 'st_tz2_cpu_median', 'st_tz2_cpu_q3', 'st_tz2_cpu_max', 'st_tz2_mem_min', 'st_tz2_mem_q1', 'st_tz2_mem_median', 'st_tz2_mem_q3', 'st_tz2_mem_max', 'short_term_tz3', 'st_tz3_cpu_min', 'st_tz3_cpu_q1', 'st_tz3_cpu_median', 'st_tz3_cpu_q3', 'st_tz3_cpu_max', 'st_tz3_mem_min', 'st_tz3_mem_q1', 'st_tz3_mem_median', 'st_tz3_mem_q3', 'st_tz3_mem_max', 'short_term_tz4', 'st_tz4_cpu_min', 'st_tz4_cpu_q1', 'st_tz4_cpu_median', 'st_tz4_cpu_q3', 'st_tz4_cpu_max', 'st_tz4_mem_min', 'st_tz4_mem_q1', 'st_tz4_mem_median', 'st_tz4_mem_q3', 'st_tz4_mem_max', 'medium_term_tz1' , 'mt_tz1_cpu_min', 'mt_tz1_cpu_q1', 'mt_tz1_cpu_median', 'mt_tz1_cpu_q3', 'mt_tz1_cpu_max', 'mt_tz1_mem_min', 'mt_tz1_mem_q1', 'mt_tz1_mem_median', 'mt_tz1_mem_q3', 'mt_tz1_mem_max', 'medium_term_tz2', 'mt_tz2_cpu_min', 'mt_tz2_cpu_q1', 'mt_tz2_cpu_median', 'mt_tz2_cpu_q3', 'mt_tz2_cpu_max', 'mt_tz2_mem_min', 'mt_tz2_mem_q1', 'mt_tz2_mem_median', 'mt_tz2_mem_q3', 'mt_tz2_mem_max', 'medium_term_tz3', 'mt_tz3_cpu_min', 'mt_tz3_cpu_q1', 'mt_tz3_cpu_median', 'mt_tz3_cpu_q3', 'mt_tz3_cpu_max', 'mt_tz3_mem_min', 'mt_tz3_mem_q1', 'mt_tz3_mem_median', 'mt_tz3_mem_q3', 'mt_tz3_mem_max', 'medium_term_tz4', 'mt_tz4_cpu_min', 'mt_tz4_cpu_q1', 'mt_tz4_cpu_median', 'mt_tz4_cpu_q3', 'mt_tz4_cpu_max', 'mt_tz4_mem_min', 'mt_tz4_mem_q1', 'mt_tz4_mem_median', 'mt_tz4_mem_q3', 'mt_tz4_mem_max', 'medium_term_tz5', 'mt_tz5_cpu_min', 'mt_tz5_cpu_q1', 'mt_tz5_cpu_median', 'mt_tz5_cpu_q3', 'mt_tz5_cpu_max', 'mt_tz5_mem_min', 'mt_tz5_mem_q1', 'mt_tz5_mem_median', 'mt_tz5_mem_q3', 'mt_tz5_mem_max', 'medium_term_tz6', 'mt_tz6_cpu_min', 'mt_tz6_cpu_q1', 'mt_tz6_cpu_median', 'mt_tz6_cpu_q3', 'mt_tz6_cpu_max', 'mt_tz6_mem_min', 'mt_tz6_mem_q1', 'mt_tz6_mem_median', 'mt_tz6_mem_q3', 'mt_tz6_mem_max', 'medium_term_tz7', 'mt_tz7_cpu_min', 'mt_tz7_cpu_q1', 'mt_tz7_cpu_median', 'mt_tz7_cpu_q3', 'mt_tz7_cpu_max', 'mt_tz7_mem_min', 'mt_tz7_mem_q1', 'mt_tz7_mem_median', 'mt_tz7_mem_q3', 'mt_tz7_mem_max', 'long_term_tz1' , 'lt_tz1_cpu_min', 'lt_tz1_cpu_q1', 'lt_tz1_cpu_median', 'lt_tz1_cpu_q3', 'lt_tz1_cpu_max', 'lt_tz1_mem_min', 'lt_tz1_mem_q1', 'lt_tz1_mem_median', 'lt_tz1_mem_q3', 'lt_tz1_mem_max', 'long_term_tz2', 'lt_tz2_cpu_min', 'lt_tz2_cpu_q1', 'lt_tz2_cpu_median', 'lt_tz2_cpu_q3', 'lt_tz2_cpu_max', 'lt_tz2_mem_min', 'lt_tz2_mem_q1', 'lt_tz2_mem_median', 'lt_tz2_mem_q3', 'lt_tz2_mem_max', 'long_term_tz3', 'lt_tz3_cpu_min', 'lt_tz3_cpu_q1', 'lt_tz3_cpu_median', 'lt_tz3_cpu_q3', 'lt_tz3_cpu_max', 'lt_tz3_mem_min', 'lt_tz3_mem_q1', 'lt_tz3_mem_median', 'lt_tz3_mem_q3', 'lt_tz3_mem_max', 'long_term_tz4', 'lt_tz4_cpu_min', 'lt_tz4_cpu_q1', 'lt_tz4_cpu_median', 'lt_tz4_cpu_q3', 'lt_tz4_cpu_max', 'lt_tz4_mem_min', 'lt_tz4_mem_q1', 'lt_tz4_mem_median', 'lt_tz4_mem_q3', 'lt_tz4_mem_max', 'long_term_tz5', 'lt_tz5_cpu_min', 'lt_tz5_cpu_q1', 'lt_tz5_cpu_median', 'lt_tz5_cpu_q3', 'lt_tz5_cpu_max', 'lt_tz5_mem_min', 'lt_tz5_mem_q1', 'lt_tz5_mem_median', 'lt_tz5_mem_q3', 'lt_tz5_mem_max', 'long_term_tz6', 'lt_tz6_cpu_min', 'lt_tz6_cpu_q1', 'lt_tz6_cpu_median', 'lt_tz6_cpu_q3', 'lt_tz6_cpu_max', 'lt_tz6_mem_min', 'lt_tz6_mem_q1', 'lt_tz6_mem_median', 'lt_tz6_mem_q3', 'lt_tz6_mem_max', 'long_term_tz7', 'lt_tz7_cpu_min', 'lt_tz7_cpu_q1', 'lt_tz7_cpu_median', 'lt_tz7_cpu_q3', 'lt_tz7_cpu_max', 'lt_tz7_mem_min', 'lt_tz7_mem_q1', 'lt_tz7_mem_median', 'lt_tz7_mem_q3', 'lt_tz7_mem_max', 'long_term_tz8' , 'lt_tz8_cpu_min', 'lt_tz8_cpu_q1', 'lt_tz8_cpu_median', 'lt_tz8_cpu_q3', 'lt_tz8_cpu_max', 'lt_tz8_mem_min', 'lt_tz8_mem_q1', 'lt_tz8_mem_median', 'lt_tz8_mem_q3', 'lt_tz8_mem_max', 'long_term_tz9', 'lt_tz9_cpu_min', 'lt_tz9_cpu_q1', 'lt_tz9_cpu_median', 'lt_tz9_cpu_q3', 'lt_tz9_cpu_max', 'lt_tz9_mem_min', 'lt_tz9_mem_q1', 'lt_tz9_mem_median', 'lt_tz9_mem_q3', 'lt_tz9_mem_max', 'long_term_tz10', 'lt_tz10_cpu_min', 'lt_tz10_cpu_q1', 'lt_tz10_cpu_median', 'lt_tz10_cpu_q3', 'lt_tz10_cpu_max', 'lt_tz10_mem_min', 'lt_tz10_mem_q1', 'lt_tz10_mem_median', 'lt_tz10_mem_q3', 'lt_tz10_mem_max', 'long_term_tz11', 'lt_tz11_cpu_min', 'lt_tz11_cpu_q1', 'lt_tz11_cpu_median', 'lt_tz11_cpu_q3', 'lt_tz11_cpu_max', 'lt_tz11_mem_min', 'lt_tz11_mem_q1', 'lt_tz11_mem_median', 'lt_tz11_mem_q3', 'lt_tz11_mem_max', 'long_term_tz12', 'lt_tz12_cpu_min', 'lt_tz12_cpu_q1', 'lt_tz12_cpu_median', 'lt_tz12_cpu_q3', 'lt_tz12_cpu_max', 'lt_tz12_mem_min', 'lt_tz12_mem_q1', 'lt_tz12_mem_median', 'lt_tz12_mem_q3', 'lt_tz12_mem_max', 'long_term_tz13', 'lt_tz13_cpu_min', 'lt_tz13_cpu_q1', 'lt_tz13_cpu_median', 'lt_tz13_cpu_q3', 'lt_tz13_cpu_max', 'lt_tz13_mem_min', 'lt_tz13_mem_q1', 'lt_tz13_mem_median', 'lt_tz13_mem_q3', 'lt_tz13_mem_max', 'long_term_tz14', 'lt_tz14_cpu_min', 'lt_tz14_cpu_q1', 'lt_tz14_cpu_median', 'lt_tz14_cpu_q3', 'lt_tz14_cpu_max', 'lt_tz14_mem_min', 'lt_tz14_mem_q1', 'lt_tz14_mem_median', 'lt_tz14_mem_q3', 'lt_tz14_mem_max', 'long_term_tz15', 'lt_tz15_cpu_min', 'lt_tz15_cpu_q1', 'lt_tz15_cpu_median', 'lt_tz15_cpu_q3', 'lt_tz15_cpu_max', 'lt_tz15_mem_min', 'lt_tz15_mem_q1', 'lt_tz15_mem_median', 'lt_tz15_mem_q3', 'lt_tz15_mem_max']
-            else:
-                fieldnames = ['cluster_name', 'experiment_name', 'type', 'name', 'namespace', 'container_name', 'timezone', 'short_term_tz1' , 'st_tz1_cpu_min', 'st_tz1_cpu_q1', 'st_tz1_cpu_median', 'st_tz1_cpu_q3', 'st_tz1_cpu_max', 'st_tz1_mem_min', 'st_tz1_mem_q1', 'st_tz1_mem_median', 'st_tz1_mem_q3', 'st_tz1_mem_max', 'short_term_tz2', 'st_tz2_cpu_min', 'st_tz2_cpu_q1', 'st_tz2_cpu_median', 'st_tz2_cpu_q3', 'st_tz2_cpu_max', 'st_tz2_mem_min', 'st_tz2_mem_q1', 'st_tz2_mem_median', 'st_tz2_mem_q3', 'st_tz2_mem_max', 'short_term_tz3', 'st_tz3_cpu_min', 'st_tz3_cpu_q1', 'st_tz3_cpu_median', 'st_tz3_cpu_q3', 'st_tz3_cpu_max', 'st_tz3_mem_min', 'st_tz3_mem_q1', 'st_tz3_mem_median', 'st_tz3_mem_q3', 'st_tz3_mem_max', 'short_term_tz4', 'st_tz4_cpu_min', 'st_tz4_cpu_q1', 'st_tz4_cpu_median', 'st_tz4_cpu_q3', 'st_tz4_cpu_max', 'st_tz4_mem_min', 'st_tz4_mem_q1', 'st_tz4_mem_median', 'st_tz4_mem_q3', 'st_tz4_mem_max', 'medium_term_tz1' , 'mt_tz1_cpu_min', 'mt_tz1_cpu_q1', 'mt_tz1_cpu_median', 'mt_tz1_cpu_q3', 'mt_tz1_cpu_max', 'mt_tz1_mem_min', 'mt_tz1_mem_q1', 'mt_tz1_mem_median', 'mt_tz1_mem_q3', 'mt_tz1_mem_max', 'medium_term_tz2', 'mt_tz2_cpu_min', 'mt_tz2_cpu_q1', 'mt_tz2_cpu_median', 'mt_tz2_cpu_q3', 'mt_tz2_cpu_max', 'mt_tz2_mem_min', 'mt_tz2_mem_q1', 'mt_tz2_mem_median', 'mt_tz2_mem_q3', 'mt_tz2_mem_max', 'medium_term_tz3', 'mt_tz3_cpu_min', 'mt_tz3_cpu_q1', 'mt_tz3_cpu_median', 'mt_tz3_cpu_q3', 'mt_tz3_cpu_max', 'mt_tz3_mem_min', 'mt_tz3_mem_q1', 'mt_tz3_mem_median', 'mt_tz3_mem_q3', 'mt_tz3_mem_max', 'medium_term_tz4', 'mt_tz4_cpu_min', 'mt_tz4_cpu_q1', 'mt_tz4_cpu_median', 'mt_tz4_cpu_q3', 'mt_tz4_cpu_max', 'mt_tz4_mem_min', 'mt_tz4_mem_q1', 'mt_tz4_mem_median', 'mt_tz4_mem_q3', 'mt_tz4_mem_max', 'medium_term_tz5', 'mt_tz5_cpu_min', 'mt_tz5_cpu_q1', 'mt_tz5_cpu_median', 'mt_tz5_cpu_q3', 'mt_tz5_cpu_max', 'mt_tz5_mem_min', 'mt_tz5_mem_q1', 'mt_tz5_mem_median', 'mt_tz5_mem_q3', 'mt_tz5_mem_max', 'medium_term_tz6', 'mt_tz6_cpu_min', 'mt_tz6_cpu_q1', 'mt_tz6_cpu_median', 'mt_tz6_cpu_q3', 'mt_tz6_cpu_max', 'mt_tz6_mem_min', 'mt_tz6_mem_q1', 'mt_tz6_mem_median', 'mt_tz6_mem_q3', 'mt_tz6_mem_max', 'medium_term_tz7', 'mt_tz7_cpu_min', 'mt_tz7_cpu_q1', 'mt_tz7_cpu_median', 'mt_tz7_cpu_q3', 'mt_tz7_cpu_max', 'mt_tz7_mem_min', 'mt_tz7_mem_q1', 'mt_tz7_mem_median', 'mt_tz7_mem_q3', 'mt_tz7_mem_max', 'long_term_tz1' , 'lt_tz1_cpu_min', 'lt_tz1_cpu_q1', 'lt_tz1_cpu_median', 'lt_tz1_cpu_q3', 'lt_tz1_cpu_max', 'lt_tz1_mem_min', 'lt_tz1_mem_q1', 'lt_tz1_mem_median', 'lt_tz1_mem_q3', 'lt_tz1_mem_max', 'long_term_tz2', 'lt_tz2_cpu_min', 'lt_tz2_cpu_q1', 'lt_tz2_cpu_median', 'lt_tz2_cpu_q3', 'lt_tz2_cpu_max', 'lt_tz2_mem_min', 'lt_tz2_mem_q1', 'lt_tz2_mem_median', 'lt_tz2_mem_q3', 'lt_tz2_mem_max', 'long_term_tz3', 'lt_tz3_cpu_min', 'lt_tz3_cpu_q1', 'lt_tz3_cpu_median', 'lt_tz3_cpu_q3', 'lt_tz3_cpu_max', 'lt_tz3_mem_min', 'lt_tz3_mem_q1', 'lt_tz3_mem_median', 'lt_tz3_mem_q3', 'lt_tz3_mem_max', 'long_term_tz4', 'lt_tz4_cpu_min', 'lt_tz4_cpu_q1', 'lt_tz4_cpu_median', 'lt_tz4_cpu_q3', 'lt_tz4_cpu_max', 'lt_tz4_mem_min', 'lt_tz4_mem_q1', 'lt_tz4_mem_median', 'lt_tz4_mem_q3', 'lt_tz4_mem_max', 'long_term_tz5', 'lt_tz5_cpu_min', 'lt_tz5_cpu_q1', 'lt_tz5_cpu_median', 'lt_tz5_cpu_q3', 'lt_tz5_cpu_max', 'lt_tz5_mem_min', 'lt_tz5_mem_q1', 'lt_tz5_mem_median', 'lt_tz5_mem_q3', 'lt_tz5_mem_max', 'long_term_tz6', 'lt_tz6_cpu_min', 'lt_tz6_cpu_q1', 'lt_tz6_cpu_median', 'lt_tz6_cpu_q3', 'lt_tz6_cpu_max', 'lt_tz6_mem_min', 'lt_tz6_mem_q1', 'lt_tz6_mem_median', 'lt_tz6_mem_q3', 'lt_tz6_mem_max', 'long_term_tz7', 'lt_tz7_cpu_min', 'lt_tz7_cpu_q1', 'lt_tz7_cpu_median', 'lt_tz7_cpu_q3', 'lt_tz7_cpu_max', 'lt_tz7_mem_min', 'lt_tz7_mem_q1', 'lt_tz7_mem_median', 'lt_tz7_mem_q3', 'lt_tz7_mem_max', 'long_term_tz8' , 'lt_tz8_cpu_min', 'lt_tz8_cpu_q1', 'lt_tz8_cpu_median', 'lt_tz8_cpu_q3', 'lt_tz8_cpu_max', 'lt_tz8_mem_min', 'lt_tz8_mem_q1', 'lt_tz8_mem_median', 'lt_tz8_mem_q3', 'lt_tz8_mem_max', 'long_term_tz9', 'lt_tz9_cpu_min', 'lt_tz9_cpu_q1', 'lt_tz9_cpu_median', 'lt_tz9_cpu_q3', 'lt_tz9_cpu_max', 'lt_tz9_mem_min', 'lt_tz9_mem_q1', 'lt_tz9_mem_median', 'lt_tz9_mem_q3', 'lt_tz9_mem_max', 'long_term_tz10', 'lt_tz10_cpu_min', 'lt_tz10_cpu_q1', 'lt_tz10_cpu_median', 'lt_tz10_cpu_q3', 'lt_tz10_cpu_max', 'lt_tz10_mem_min', 'lt_tz10_mem_q1', 'lt_tz10_mem_median', 'lt_tz10_mem_q3', 'lt_tz10_mem_max', 'long_term_tz11', 'lt_tz11_cpu_min', 'lt_tz11_cpu_q1', 'lt_tz11_cpu_median', 'lt_tz11_cpu_q3', 'lt_tz11_cpu_max', 'lt_tz11_mem_min', 'lt_tz11_mem_q1', 'lt_tz11_mem_median', 'lt_tz11_mem_q3', 'lt_tz11_mem_max', 'long_term_tz12', 'lt_tz12_cpu_min', 'lt_tz12_cpu_q1', 'lt_tz12_cpu_median', 'lt_tz12_cpu_q3', 'lt_tz12_cpu_max', 'lt_tz12_mem_min', 'lt_tz12_mem_q1', 'lt_tz12_mem_median', 'lt_tz12_mem_q3', 'lt_tz12_mem_max', 'long_term_tz13', 'lt_tz13_cpu_min', 'lt_tz13_cpu_q1', 'lt_tz13_cpu_median', 'lt_tz13_cpu_q3', 'lt_tz13_cpu_max', 'lt_tz13_mem_min', 'lt_tz13_mem_q1', 'lt_tz13_mem_median', 'lt_tz13_mem_q3', 'lt_tz13_mem_max', 'long_term_tz14', 'lt_tz14_cpu_min', 'lt_tz14_cpu_q1', 'lt_tz14_cpu_median', 'lt_tz14_cpu_q3', 'lt_tz14_cpu_max', 'lt_tz14_mem_min', 'lt_tz14_mem_q1', 'lt_tz14_mem_median', 'lt_tz14_mem_q3', 'lt_tz14_mem_max', 'long_term_tz15', 'lt_tz15_cpu_min', 'lt_tz15_cpu_q1', 'lt_tz15_cpu_median', 'lt_tz15_cpu_q3', 'lt_tz15_cpu_max', 'lt_tz15_mem_min', 'lt_tz15_mem_q1', 'lt_tz15_mem_median', 'lt_tz15_mem_q3', 'lt_tz15_mem_max']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            iexperiment_name = ""
-            datadict = data[0]
-            experiment_name = datadict["experiment_name"]
-            for key, value in datadict.items():
-                if key == "experiment_name":
-                    print("experiment_name = ", value)
-                    experiment_name = value
-                if key == "cluster_name":
-                    cluster_name = value
-                if key == "kubernetes_objects":
-                    for kobj in value:
-                        containerNames=[]
-                        k8ObjectName = ""
-                        namespace = ""
-                        k8ObjectType = ""
-                        if experiment_type == "container":
-                            k8ObjectName = kobj["name"]
-                            k8ObjectType = kobj["type"]
-                            namespace = kobj["namespace"]
-                            loopOverItems = kobj["containers"].items()
-                        elif experiment_type == "namespace":
-                            loopOverItems = kobj["namespaces"].items()
-                        for containerName, container_data in loopOverItems:
-                            containerData = container_data.get("recommendations", {}).get("data", {})
-                            if not containerData:
-                                if experiment_type == "container":
-                                    kobj_dict = {
-                                    'experiment_name': experiment_name,
-                                    'type': kobj["type"],
-                                    'name': kobj["name"],
-                                    'namespace': kobj["namespace"],
-                                    'container_name': container_data["container_name"],
-                                    }
-                                if experiment_type == "namespace":
-                                    kobj_dict = {
-                                    'experiment_name': experiment_name,
-                                    'namespace': container_data["namespace"],
-                                    }
-                                writer.writerow(kobj_dict)
-                            for timezone, timezone_data in containerData.items():
-                                if experiment_type == "container":
-                                    kobj_dict = {
-                                    'experiment_name': experiment_name,
-                                    'cluster_name': cluster_name,
-                                    'type': kobj["type"],
-                                    'name': kobj["name"],
-                                    'namespace': kobj["namespace"],
-                                    'container_name': container_data["container_name"],
-                                    'timezone': timezone,
-                                    }
-                                if experiment_type == "namespace":
-                                    kobj_dict = {
-                                    'experiment_name': experiment_name,
-                                    'cluster_name': cluster_name,
-                                    'namespace': container_data["namespace"],
-                                    'timezone': timezone,
-                                    }
-                                plot_dict = {}
-                                datapoint = 0
-
-                                for recomm_type, recomm_typedata in timezone_data["recommendation_terms"].items():
-                                    if "plots" in recomm_typedata:
-                                        plotsData = recomm_typedata.get("plots", {}).get("plots_data", {})
-                                        plot_datapoints = recomm_typedata["plots"]["datapoints"]
-                                        datapoint = 0
-                                        for plot_timezone, plot_timezone_data in plotsData.items():
-                                            datapoint = datapoint + 1
-                                            for plotresource_name, plotresource in plot_timezone_data.items():
-                                                if plotresource_name == "cpuUsage":
-                                                    plot_resource = 'cpu'
-                                                if plotresource_name == "memoryUsage":
-                                                    plot_resource = 'mem'
-
-                                                if recomm_type == "short_term":
-                                                    recomm_type_p = 'st'
-                                                if recomm_type == "medium_term":
-                                                    recomm_type_p = 'mt'
-                                                if recomm_type == "long_term":
-                                                    recomm_type_p = 'lt'
-
-                                                plot_tz_var_name = recomm_type + '_tz' + str(datapoint)
-                                                plot_min_var_name = recomm_type_p + '_tz' + str(datapoint) + '_' + plot_resource + '_min'
-                                                plot_q1_var_name = recomm_type_p + '_tz' + str(datapoint) + '_' + plot_resource + '_q1'
-                                                plot_median_var_name = recomm_type_p + '_tz' + str(datapoint) + '_' + plot_resource + '_median'
-                                                plot_q3_var_name = recomm_type_p + '_tz' + str(datapoint) + '_' + plot_resource + '_q3'
-                                                plot_max_var_name = recomm_type_p + '_tz' + str(datapoint) + '_' + plot_resource + '_max'
-
-                                                plot_dict[plot_tz_var_name] = str(plot_timezone)
-                                                plot_dict[plot_min_var_name] = str(plot_timezone_data[plotresource_name]["min"])
-                                                plot_dict[plot_q1_var_name] = str(plot_timezone_data[plotresource_name]["q1"])
-                                                plot_dict[plot_median_var_name] = str(plot_timezone_data[plotresource_name]["median"])
-                                                plot_dict[plot_q3_var_name] = str(plot_timezone_data[plotresource_name]["q3"])
-                                                plot_dict[plot_max_var_name] = str(plot_timezone_data[plotresource_name]["max"])
-
-                                kobj_dict.update(plot_dict)
-                                writer.writerow(kobj_dict)
-        # Sort the data in chronological order of timezone
-        with open('experimentPlotData_temp.csv', 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            Edata = list(reader)
-        data_sorted = sorted(Edata, key=lambda x: x['timezone'])
-
-        with open('experimentPlotData_sorted.csv', 'w', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
-
-        # Write the sorted data back to the CSV file
-        with open('experimentPlotData.csv', 'a', newline='') as csvfile:
-            fieldnames = reader.fieldnames
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data_sorted)
+    experiment_name = write_experiment_rows(filename, "container", [(["recommendations", "data"], recommendation_with_current_fields)],
+                                            RECOMMENDATIONS_FIELDNAMES, append_file='experimentRecommendations.csv')
+    if experiment_name is not None:
+        print("experiment_name = ", experiment_name)
+
+def getExperimentBoxPlots(filename, experiment_type="container"):
+    fieldnames = NAMESPACE_BOXPLOT_FIELDNAMES if experiment_type == "namespace" else CONTAINER_BOXPLOT_FIELDNAMES
+    experiment_name = write_experiment_rows(filename, experiment_type, [(["recommendations", "data"], boxplot_fields)],
+                                            fieldnames, 'experimentPlotData_sorted.csv', 'experimentPlotData.csv')
+    if experiment_name is not None:
+        print("experiment_name = ", experiment_name)
+
 
+CLUSTER_DATA_FIELDNAMES = ['cluster_name', 'timezone', 'namespaces' , 'namespace_count', 'workloads', 'workload_count', 'short_term_current_cpu_requests', 'short_term_current_memory_requests', 'medium_term_current_cpu_requests', 'medium_term_current_memory_requests', 'long_term_current_cpu_requests', 'long_term_current_memory_requests', 'short_term_current_cpu_limits', 'short_term_current_memory_limits', 'medium_term_current_cpu_limits', 'medium_term_current_memory_limits', 'long_term_current_cpu_limits', 'long_term_current_memory_limits', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'cost_short_term_idle_cpu', 'cost_short_term_critical_cpu', 'cost_short_term_optimizable_cpu', 'cost_short_term_optimized_cpu', 'cost_short_term_error_cpu', 'cost_short_term_no_data_cpu', 'cost_short_term_total_cpu', 'cost_short_term_idle_memory', 'cost_short_term_critical_memory', 'cost_short_term_optimizable_memory', 'cost_short_term_optimized_memory', 'cost_short_term_error_memory', 'cost_short_term_no_data_memory', 'cost_short_term_total_memory', 'cost_short_term_error_general', 'cost_short_term_no_data_general', 'cost_short_term_total_general', 'cost_medium_term_idle_cpu', 'cost_medium_term_critical_cpu', 'cost_medium_term_optimizable_cpu', 'cost_medium_term_optimized_cpu', 'cost_medium_term_error_cpu', 'cost_medium_term_no_data_cpu', 'cost_medium_term_total_cpu', 'cost_medium_term_idle_memory', 'cost_medium_term_critical_memory', 'cost_medium_term_optimizable_memory', 'cost_medium_term_optimized_memory', 'cost_medium_term_error_memory', 'cost_medium_term_no_data_memory', 'cost_medium_term_total_memory', 'cost_medium_term_error_general', 'cost_medium_term_no_data_general', 'cost_medium_term_total_general', 'cost_long_term_idle_cpu', 'cost_long_term_critical_cpu', 'cost_long_term_optimizable_cpu', 'cost_long_term_optimized_cpu', 'cost_long_term_error_cpu', 'cost_long_term_no_data_cpu', 'cost_long_term_total_cpu', 'cost_long_term_idle_memory', 'cost_long_term_critical_memory', 'cost_long_term_optimizable_memory', 'cost_long_term_optimized_memory', 'cost_long_term_error_memory', 'cost_long_term_no_data_memory', 'cost_long_term_total_memory', 'cost_long_term_error_general', 'cost_long_term_no_data_general', 'cost_long_term_total_general', 'action_summary_no_data_general' ]
+CLUSTER_NAMESPACE_DATA_FIELDNAMES = ['namespace_name', 'timezone', 'clusters' , 'cluster_count' , 'workloads', 'workload_count', 'containers', 'container_count',  'short_term_current_cpu_requests', 'short_term_current_memory_requests', 'medium_term_current_cpu_requests', 'medium_term_current_memory_requests', 'long_term_current_cpu_requests', 'long_term_current_memory_requests', 'short_term_current_cpu_limits', 'short_term_current_memory_limits', 'medium_term_current_cpu_limits', 'medium_term_current_memory_limits', 'long_term_current_cpu_limits', 'long_term_current_memory_limits', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'cost_short_term_idle_cpu', 'cost_short_term_critical_cpu', 'cost_short_term_optimizable_cpu', 'cost_short_term_optimized_cpu', 'cost_short_term_error_cpu', 'cost_short_term_no_data_cpu', 'cost_short_term_total_cpu', 'cost_short_term_idle_memory', 'cost_short_term_critical_memory', 'cost_short_term_optimizable_memory', 'cost_short_term_optimized_memory', 'cost_short_term_error_memory', 'cost_short_term_no_data_memory', 'cost_short_term_total_memory', 'cost_short_term_error_general', 'cost_short_term_no_data_general', 'cost_short_term_total_general', 'cost_medium_term_idle_cpu', 'cost_medium_term_critical_cpu', 'cost_medium_term_optimizable_cpu', 'cost_medium_term_optimized_cpu', 'cost_medium_term_error_cpu', 'cost_medium_term_no_data_cpu', 'cost_medium_term_total_cpu', 'cost_medium_term_idle_memory', 'cost_medium_term_critical_memory', 'cost_medium_term_optimizable_memory', 'cost_medium_term_optimized_memory', 'cost_medium_term_error_memory', 'cost_medium_term_no_data_memory', 'cost_medium_term_total_memory', 'cost_medium_term_error_general', 'cost_medium_term_no_data_general', 'cost_medium_term_total_general', 'cost_long_term_idle_cpu', 'cost_long_term_critical_cpu', 'cost_long_term_optimizable_cpu', 'cost_long_term_optimized_cpu', 'cost_long_term_error_cpu', 'cost_long_term_no_data_cpu', 'cost_long_term_total_cpu', 'cost_long_term_idle_memory', 'cost_long_term_critical_memory', 'cost_long_term_optimizable_memory', 'cost_long_term_optimized_memory', 'cost_long_term_error_memory', 'cost_long_term_no_data_memory', 'cost_long_term_total_memory', 'cost_long_term_error_general', 'cost_long_term_no_data_general', 'cost_long_term_total_general', 'action_summary_no_data_general' ]
+CLUSTER_DATA_CSV_FIELDNAMES = {"cluster": CLUSTER_DATA_FIELDNAMES, "clusterNamespace": CLUSTER_NAMESPACE_DATA_FIELDNAMES}
 
 def create_cluster_data_csv(csvtype,outputfile):
-    if csvtype == "cluster":
-        fieldnames = ['cluster_name', 'timezone', 'namespaces' , 'namespace_count', 'workloads', 'workload_count', 'short_term_current_cpu_requests', 'short_term_current_memory_requests', 'medium_term_current_cpu_requests', 'medium_term_current_memory_requests', 'long_term_current_cpu_requests', 'long_term_current_memory_requests', 'short_term_current_cpu_limits', 'short_term_current_memory_limits', 'medium_term_current_cpu_limits', 'medium_term_current_memory_limits', 'long_term_current_cpu_limits', 'long_term_current_memory_limits', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'cost_short_term_idle_cpu', 'cost_short_term_critical_cpu', 'cost_short_term_optimizable_cpu', 'cost_short_term_optimized_cpu', 'cost_short_term_error_cpu', 'cost_short_term_no_data_cpu', 'cost_short_term_total_cpu', 'cost_short_term_idle_memory', 'cost_short_term_critical_memory', 'cost_short_term_optimizable_memory', 'cost_short_term_optimized_memory', 'cost_short_term_error_memory', 'cost_short_term_no_data_memory', 'cost_short_term_total_memory', 'cost_short_term_error_general', 'cost_short_term_no_data_general', 'cost_short_term_total_general', 'cost_medium_term_idle_cpu', 'cost_medium_term_critical_cpu', 'cost_medium_term_optimizable_cpu', 'cost_medium_term_optimized_cpu', 'cost_medium_term_error_cpu', 'cost_medium_term_no_data_cpu', 'cost_medium_term_total_cpu', 'cost_medium_term_idle_memory', 'cost_medium_term_critical_memory', 'cost_medium_term_optimizable_memory', 'cost_medium_term_optimized_memory', 'cost_medium_term_error_memory', 'cost_medium_term_no_data_memory', 'cost_medium_term_total_memory', 'cost_medium_term_error_general', 'cost_medium_term_no_data_general', 'cost_medium_term_total_general', 'cost_long_term_idle_cpu', 'cost_long_term_critical_cpu', 'cost_long_term_optimizable_cpu', 'cost_long_term_optimized_cpu', 'cost_long_term_error_cpu', 'cost_long_term_no_data_cpu', 'cost_long_term_total_cpu', 'cost_long_term_idle_memory', 'cost_long_term_critical_memory', 'cost_long_term_optimizable_memory', 'cost_long_term_optimized_memory', 'cost_long_term_error_memory', 'cost_long_term_no_data_memory', 'cost_long_term_total_memory', 'cost_long_term_error_general', 'cost_long_term_no_data_general', 'cost_long_term_total_general', 'action_summary_no_data_general' ]
-    elif csvtype == "clusterNamespace":
-        fieldnames = ['namespace_name', 'timezone', 'clusters' , 'cluster_count' , 'workloads', 'workload_count', 'containers', 'container_count',  'short_term_current_cpu_requests', 'short_term_current_memory_requests', 'medium_term_current_cpu_requests', 'medium_term_current_memory_requests', 'long_term_current_cpu_requests', 'long_term_current_memory_requests', 'short_term_current_cpu_limits', 'short_term_current_memory_limits', 'medium_term_current_cpu_limits', 'medium_term_current_memory_limits', 'long_term_current_cpu_limits', 'long_term_current_memory_limits', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'cost_short_term_idle_cpu', 'cost_short_term_critical_cpu', 'cost_short_term_optimizable_cpu', 'cost_short_term_optimized_cpu', 'cost_short_term_error_cpu', 'cost_short_term_no_data_cpu', 'cost_short_term_total_cpu', 'cost_short_term_idle_memory', 'cost_short_term_critical_memory', 'cost_short_term_optimizable_memory', 'cost_short_term_optimized_memory', 'cost_short_term_error_memory', 'cost_short_term_no_data_memory', 'cost_short_term_total_memory', 'cost_short_term_error_general', 'cost_short_term_no_data_general', 'cost_short_term_total_general', 'cost_medium_term_idle_cpu', 'cost_medium_term_critical_cpu', 'cost_medium_term_optimizable_cpu', 'cost_medium_term_optimized_cpu', 'cost_medium_term_error_cpu', 'cost_medium_term_no_data_cpu', 'cost_medium_term_total_cpu', 'cost_medium_term_idle_memory', 'cost_medium_term_critical_memory', 'cost_medium_term_optimizable_memory', 'cost_medium_term_optimized_memory', 'cost_medium_term_error_memory', 'cost_medium_term_no_data_memory', 'cost_medium_term_total_memory', 'cost_medium_term_error_general', 'cost_medium_term_no_data_general', 'cost_medium_term_total_general', 'cost_long_term_idle_cpu', 'cost_long_term_critical_cpu', 'cost_long_term_optimizable_cpu', 'cost_long_term_optimized_cpu', 'cost_long_term_error_cpu', 'cost_long_term_no_data_cpu', 'cost_long_term_total_cpu', 'cost_long_term_idle_memory', 'cost_long_term_critical_memory', 'cost_long_term_optimizable_memory', 'cost_long_term_optimized_memory', 'cost_long_term_error_memory', 'cost_long_term_no_data_memory', 'cost_long_term_total_memory', 'cost_long_term_error_general', 'cost_long_term_no_data_general', 'cost_long_term_total_general', 'action_summary_no_data_general' ]
     with open(outputfile, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=CLUSTER_DATA_CSV_FIELDNAMES[csvtype])
         writer.writeheader()
 
+# Converts a /summarize response of clusters (or namespaces) to the rows of its csv, one per time zone
+def cluster_data_rows(csvtype, data):
+    for cluster in data:
+        if not cluster:
+            continue
+        if csvtype == "cluster":
+            cluster_name = cluster['cluster_name']
+            namespaces = ', '.join(cluster['namespaces']['names'])
+            namespace_count = cluster['namespaces']['count']
+            workloads = ', '.join(cluster['workloads']['names'])
+            workload_count = cluster['workloads']['count']
+        elif csvtype == "clusterNamespace":
+            namespace_name = cluster['namespace']
+            clusters = ''
+            cluster_count = ''
+            if 'clusters' in cluster:
+                clusters = ', '.join(cluster['clusters']['names'])
+                cluster_count = cluster['clusters']['count']
+            elif 'cluster_name' in cluster:
+                clusters = cluster['cluster_name']
+            workloads = ''
+            workload_count = ''
+            if 'workloads' in cluster:
+                workloads = ', '.join(cluster['workloads']['names'])
+                workload_count = cluster['workloads']['count']
 
+            containers = ''
+            container_count = ''
+            if 'containers' in cluster:
+                containers = ', '.join(cluster['containers']['names'])
+                container_count = cluster['containers']['count']
+        action_summary_dict = {}
+        for action_type, action_data in cluster['action_summary'].items():
+            for action_resource, action_value in action_data.items():
+                action_var_name = 'action_summary_' + action_type + '_' + action_resource
+                action_summary_dict[action_var_name] = str(action_value["count"])
+        for date, metrics in cluster['summary']['data'].items():
+            if csvtype == "clusterNamespace":
+                clust_dict = {
+                        'namespace_name' : namespace_name,
+                        'timezone': date,
+                        'clusters': clusters,
+                        'cluster_count': cluster_count,
+                        'workloads': workloads,
+                        'workload_count': workload_count,
+                        'containers': containers,
+                        'container_count': container_count
+                        }
+            elif csvtype == "cluster":
+                clust_dict = {
+                        'cluster_name': cluster_name,
+                        'timezone': date,
+                        'namespaces': namespaces,
+                        'namespace_count': namespace_count,
+                        'workloads': workloads,
+                        'workload_count': workload_count
+                        }
+            recomm_dict = {}
+            for recomm_engine, recomm_enginedata in metrics.items():
+                for recomm_type, recomm_typedata in recomm_enginedata.items():
+                    if "current" in recomm_typedata:
+                        for recomm_current, recomm_currentmetrics in recomm_typedata["current"].items():
+                            for recomm_resource, recomm_resourcedata in recomm_currentmetrics.items():
+                                recomm_var_name = recomm_type + '_current_' + recomm_resource + '_' + recomm_current
+                                recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
+                    if "config" in recomm_typedata:
+                        for recomm_config, recomm_configmetrics in recomm_typedata["config"].items():
+                            for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
+                                recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config
+                                #recomm_var_format = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config + '_format'
+                                recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
+                                #recomm_dict[recomm_var_format] = str(recomm_resourcedata["format"])
+                    if "change" in recomm_typedata:
+                        for recomm_config, recomm_configmetrics in recomm_typedata["change"]["variation"].items():
+                            for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
+                                recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config + '_variation'
+                                recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
+                    if "action_summary" in recomm_typedata:
+                        for action_type, action_data in recomm_typedata["action_summary"].items():
+                            for action_resource, action_value in action_data.items():
+                                action_var_name = recomm_engine + '_' + recomm_type + '_' + action_type + '_' + action_resource
+                                recomm_dict[action_var_name] = str(action_value["count"])
+            clust_dict.update(recomm_dict)
+            clust_dict.update(action_summary_dict)
+            yield clust_dict
+
+# Appends the rows of the /summarize responses to the csv of the csvtype
+def write_cluster_data_csv(csvtype, responses, outputfile):
+    with open(outputfile, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CLUSTER_DATA_CSV_FIELDNAMES[csvtype])
+        for data in responses:
+            writer.writerows(cluster_data_rows(csvtype, data))
 
 def get_cluster_data_csv(csvtype, filename, outputfile):
     with open(filename, 'r') as f:
         data = json.load(f)
-    if csvtype == "cluster":
-        fieldnames = ['cluster_name', 'timezone', 'namespaces' , 'namespace_count', 'workloads', 'workload_count', 'short_term_current_cpu_requests', 'short_term_current_memory_requests', 'medium_term_current_cpu_requests', 'medium_term_current_memory_requests', 'long_term_current_cpu_requests', 'long_term_current_memory_requests', 'short_term_current_cpu_limits', 'short_term_current_memory_limits', 'medium_term_current_cpu_limits', 'medium_term_current_memory_limits', 'long_term_current_cpu_limits', 'long_term_current_memory_limits', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'cost_short_term_idle_cpu', 'cost_short_term_critical_cpu', 'cost_short_term_optimizable_cpu', 'cost_short_term_optimized_cpu', 'cost_short_term_error_cpu', 'cost_short_term_no_data_cpu', 'cost_short_term_total_cpu', 'cost_short_term_idle_memory', 'cost_short_term_critical_memory', 'cost_short_term_optimizable_memory', 'cost_short_term_optimized_memory', 'cost_short_term_error_memory', 'cost_short_term_no_data_memory', 'cost_short_term_total_memory', 'cost_short_term_error_general', 'cost_short_term_no_data_general', 'cost_short_term_total_general', 'cost_medium_term_idle_cpu', 'cost_medium_term_critical_cpu', 'cost_medium_term_optimizable_cpu', 'cost_medium_term_optimized_cpu', 'cost_medium_term_error_cpu', 'cost_medium_term_no_data_cpu', 'cost_medium_term_total_cpu', 'cost_medium_term_idle_memory', 'cost_medium_term_critical_memory', 'cost_medium_term_optimizable_memory', 'cost_medium_term_optimized_memory', 'cost_medium_term_error_memory', 'cost_medium_term_no_data_memory', 'cost_medium_term_total_memory', 'cost_medium_term_error_general', 'cost_medium_term_no_data_general', 'cost_medium_term_total_general', 'cost_long_term_idle_cpu', 'cost_long_term_critical_cpu', 'cost_long_term_optimizable_cpu', 'cost_long_term_optimized_cpu', 'cost_long_term_error_cpu', 'cost_long_term_no_data_cpu', 'cost_long_term_total_cpu', 'cost_long_term_idle_memory', 'cost_long_term_critical_memory', 'cost_long_term_optimizable_memory', 'cost_long_term_optimized_memory', 'cost_long_term_error_memory', 'cost_long_term_no_data_memory', 'cost_long_term_total_memory', 'cost_long_term_error_general', 'cost_long_term_no_data_general', 'cost_long_term_total_general', 'action_summary_no_data_general' ]
-    elif csvtype == "clusterNamespace":
-        fieldnames = ['namespace_name', 'timezone', 'clusters' , 'cluster_count' , 'workloads', 'workload_count', 'containers', 'container_count',  'short_term_current_cpu_requests', 'short_term_current_memory_requests', 'medium_term_current_cpu_requests', 'medium_term_current_memory_requests', 'long_term_current_cpu_requests', 'long_term_current_memory_requests', 'short_term_current_cpu_limits', 'short_term_current_memory_limits', 'medium_term_current_cpu_limits', 'medium_term_current_memory_limits', 'long_term_current_cpu_limits', 'long_term_current_memory_limits', 'cost_short_term_cpu_requests', 'cost_short_term_memory_requests', 'cost_short_term_cpu_limits', 'cost_short_term_memory_limits', 'cost_medium_term_cpu_requests', 'cost_medium_term_memory_requests', 'cost_medium_term_cpu_limits', 'cost_medium_term_memory_limits', 'cost_long_term_cpu_requests', 'cost_long_term_memory_requests', 'cost_long_term_cpu_limits', 'cost_long_term_memory_limits', 'cost_short_term_cpu_requests_variation', 'cost_short_term_memory_requests_variation', 'cost_short_term_cpu_limits_variation', 'cost_short_term_memory_limits_variation', 'cost_medium_term_cpu_requests_variation' , 'cost_medium_term_memory_requests_variation', 'cost_medium_term_cpu_limits_variation' , 'cost_medium_term_memory_limits_variation', 'cost_long_term_cpu_requests_variation' , 'cost_long_term_memory_requests_variation', 'cost_long_term_cpu_limits_variation' , 'cost_long_term_memory_limits_variation', 'cost_short_term_idle_cpu', 'cost_short_term_critical_cpu', 'cost_short_term_optimizable_cpu', 'cost_short_term_optimized_cpu', 'cost_short_term_error_cpu', 'cost_short_term_no_data_cpu', 'cost_short_term_total_cpu', 'cost_short_term_idle_memory', 'cost_short_term_critical_memory', 'cost_short_term_optimizable_memory', 'cost_short_term_optimized_memory', 'cost_short_term_error_memory', 'cost_short_term_no_data_memory', 'cost_short_term_total_memory', 'cost_short_term_error_general', 'cost_short_term_no_data_general', 'cost_short_term_total_general', 'cost_medium_term_idle_cpu', 'cost_medium_term_critical_cpu', 'cost_medium_term_optimizable_cpu', 'cost_medium_term_optimized_cpu', 'cost_medium_term_error_cpu', 'cost_medium_term_no_data_cpu', 'cost_medium_term_total_cpu', 'cost_medium_term_idle_memory', 'cost_medium_term_critical_memory', 'cost_medium_term_optimizable_memory', 'cost_medium_term_optimized_memory', 'cost_medium_term_error_memory', 'cost_medium_term_no_data_memory', 'cost_medium_term_total_memory', 'cost_medium_term_error_general', 'cost_medium_term_no_data_general', 'cost_medium_term_total_general', 'cost_long_term_idle_cpu', 'cost_long_term_critical_cpu', 'cost_long_term_optimizable_cpu', 'cost_long_term_optimized_cpu', 'cost_long_term_error_cpu', 'cost_long_term_no_data_cpu', 'cost_long_term_total_cpu', 'cost_long_term_idle_memory', 'cost_long_term_critical_memory', 'cost_long_term_optimizable_memory', 'cost_long_term_optimized_memory', 'cost_long_term_error_memory', 'cost_long_term_no_data_memory', 'cost_long_term_total_memory', 'cost_long_term_error_general', 'cost_long_term_no_data_general', 'cost_long_term_total_general', 'action_summary_no_data_general' ]
-    with open(outputfile, 'a', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        for cluster in data:
-            if not cluster:
-                continue
-            if csvtype == "cluster":
-                cluster_name = cluster['cluster_name']
-                namespaces = ', '.join(cluster['namespaces']['names'])
-                namespace_count = cluster['namespaces']['count']
-                workloads = ', '.join(cluster['workloads']['names'])
-                workload_count = cluster['workloads']['count']
-            elif csvtype == "clusterNamespace":
-                namespace_name = cluster['namespace']
-                clusters = ''
-                cluster_count = ''
-                if 'clusters' in cluster:
-                    clusters = ', '.join(cluster['clusters']['names'])
-                    cluster_count = cluster['clusters']['count']
-                elif 'cluster_name' in cluster:
-                    clusters = cluster['cluster_name']
-                workloads = ''
-                workload_count = ''
-                if 'workloads' in cluster:
-                    workloads = ', '.join(cluster['workloads']['names'])
-                    workload_count = cluster['workloads']['count']
-
-                containers = ''
-                container_count = ''
-                if 'containers' in cluster:
-                    containers = ', '.join(cluster['containers']['names'])
-                    container_count = cluster['containers']['count']
-            action_summary_dict = {}
-            for action_type, action_data in cluster['action_summary'].items():
-                for action_resource, action_value in action_data.items():
-                    action_var_name = 'action_summary_' + action_type + '_' + action_resource
-                    action_summary_dict[action_var_name] = str(action_value["count"])
-            for date, metrics in cluster['summary']['data'].items():
-                if csvtype == "clusterNamespace":
-                    clust_dict = {
-                            'namespace_name' : namespace_name,
-                            'timezone': date,
-                            'clusters': clusters,
-                            'cluster_count': cluster_count,
-                            'workloads': workloads,
-                            'workload_count': workload_count,
-                            'containers': containers,
-                            'container_count': container_count
-                            }
-                elif csvtype == "cluster":
-                    clust_dict = {
-                            'cluster_name': cluster_name,
-                            'timezone': date,
-                            'namespaces': namespaces,
-                            'namespace_count': namespace_count,
-                            'workloads': workloads,
-                            'workload_count': workload_count
-                            }
-                recomm_dict = {}
-                for recomm_engine, recomm_enginedata in metrics.items():
-                    for recomm_type, recomm_typedata in recomm_enginedata.items():
-                        if "current" in recomm_typedata:
-                            for recomm_current, recomm_currentmetrics in recomm_typedata["current"].items():
-                                for recomm_resource, recomm_resourcedata in recomm_currentmetrics.items():
-                                    recomm_var_name = recomm_type + '_current_' + recomm_resource + '_' + recomm_current
-                                    recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                        if "config" in recomm_typedata:
-                            for recomm_config, recomm_configmetrics in recomm_typedata["config"].items():
-                                for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                    recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config
-                                    #recomm_var_format = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config + '_format'
-                                    recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                                    #recomm_dict[recomm_var_format] = str(recomm_resourcedata["format"])
-                        if "change" in recomm_typedata:
-                            for recomm_config, recomm_configmetrics in recomm_typedata["change"]["variation"].items():
-                                for recomm_resource, recomm_resourcedata in recomm_configmetrics.items():
-                                    recomm_var_name = recomm_engine + '_' + recomm_type + '_' + recomm_resource + '_' + recomm_config + '_variation'
-                                    recomm_dict[recomm_var_name] = str(recomm_resourcedata["amount"])
-                        if "action_summary" in recomm_typedata:
-                            for action_type, action_data in recomm_typedata["action_summary"].items():
-                                for action_resource, action_value in action_data.items():
-                                    action_var_name = recomm_engine + '_' + recomm_type + '_' + action_type + '_' + action_resource
-                                    recomm_dict[action_var_name] = str(action_value["count"])
-                clust_dict.update(recomm_dict)
-                clust_dict.update(action_summary_dict)
-                writer.writerow(clust_dict)
+    write_cluster_data_csv(csvtype, [data], outputfile)
 
 def get_value_fromcsv(filename, recommendation_type):
     with open(filename, 'r') as file: